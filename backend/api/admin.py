@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from .models import (
     UserAchievement, Achievement, Question, ReadingExercise, 
-    UserProgress, CustomUser, Notification 
+    UserProgress, CustomUser, Notification, BackgroundJob, QuestionGenerationJob
 )
 
 class QuestionInline(admin.TabularInline):
@@ -57,4 +57,15 @@ class UserAchievementAdmin(admin.ModelAdmin):
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('recipient', 'actor', 'verb', 'read', 'created_at')
-    list_filter = ('read', 'created_at')
\ No newline at end of file
+    list_filter = ('read', 'created_at')
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_after', 'locked_by', 'created_at')
+    list_filter = ('status', 'name')
+    search_fields = ('idempotency_key', 'last_error')
+
+@admin.register(QuestionGenerationJob)
+class QuestionGenerationJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'requested_by', 'status', 'created_at', 'finished_at')
+    list_filter = ('status',)
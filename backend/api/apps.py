@@ -5,4 +5,5 @@ class ApiConfig(AppConfig):
     name = "api"
 
     def ready(self):
-        import api.signals
\ No newline at end of file
+        import api.signals
+        import api.tasks
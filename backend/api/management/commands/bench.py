@@ -0,0 +1,84 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark endpointów API: współbieżna mieszanka wywołań, p50/p95/p99, przepustowość '
+        'i liczba zapytań SQL na żądanie. submit_progress zapisuje wyniki - używaj bazy testowej.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Łączna liczba mierzonych wywołań')
+        parser.add_argument('--concurrency', type=int, default=4, help='Liczba równoległych wątków klienta')
+        parser.add_argument('--mix', default='', help=(
+            'Wagi endpointów, np. exercise_list=4,leaderboard=3,today_challenge=2,submit_progress=1 '
+            f'(dostępne: {", ".join(benchmark.ENDPOINTS)})'
+        ))
+        parser.add_argument('--users', type=int, default=10, help='Liczba użytkowników bench_* wykonujących wywołania')
+        parser.add_argument('--warmup', type=int, default=1, help='Wywołania rozgrzewkowe na endpoint (poza pomiarem)')
+        parser.add_argument('--seed', type=int, default=0, help='Ziarno kolejności wywołań i danych')
+        parser.add_argument('--base-url', help='Adres działającego serwera (np. http://localhost:8000); domyślnie w procesie')
+        parser.add_argument('--output', help='Zapisz raport JSON do pliku')
+        parser.add_argument('--baseline', help='Porównaj z wcześniejszym raportem JSON')
+
+    def handle(self, *args, **options):
+        try:
+            mix = benchmark.parse_mix(options['mix'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not mix:
+            raise CommandError('Mieszanka endpointów jest pusta.')
+
+        try:
+            report = benchmark.run(
+                mix=mix,
+                request_count=max(options['requests'], 1),
+                concurrency=options['concurrency'],
+                users=max(options['users'], 1),
+                warmup=max(options['warmup'], 0),
+                seed=options['seed'],
+                base_url=options['base_url'],
+            )
+        except benchmark.BenchmarkSetupError as e:
+            raise CommandError(str(e))
+
+        self._print_report(report)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(benchmark.dumps(report) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Raport zapisano w {options["output"]}'))
+
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as f:
+                baseline = json.load(f)
+            self._print_comparison(benchmark.compare(baseline, report))
+
+    def _print_report(self, report):
+        self.stdout.write(
+            f'{"endpoint":<18} {"n":>6} {"err":>4} {"rps":>8} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"SQL/req":>8}'
+        )
+        rows = list(report['endpoints'].items()) + [('RAZEM', report['total'])]
+        for name, stats in rows:
+            queries = stats['queries_per_request']
+            self.stdout.write(
+                f'{name:<18} {stats["count"]:>6} {stats["errors"]:>4} {stats["throughput_rps"] or 0:>8.1f} '
+                f'{stats["p50_ms"] or 0:>9.2f} {stats["p95_ms"] or 0:>9.2f} {stats["p99_ms"] or 0:>9.2f} '
+                f'{"-" if queries is None else f"{queries:.1f}":>8}'
+            )
+
+    def _print_comparison(self, comparison):
+        self.stdout.write('\nZmiana względem raportu bazowego:')
+        for name, metrics in comparison.items():
+            changes = []
+            for metric, (before, after, change) in metrics.items():
+                if change is None:
+                    continue
+                text = f'{metric} {before} -> {after} ({change:+.1f}%)'
+                worse = change < 0 if metric == 'throughput_rps' else change > 0
+                changes.append(self.style.WARNING(text) if worse and abs(change) >= 10 else text)
+            self.stdout.write(f'{name}: ' + ', '.join(changes))
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services import benchmark, microbenchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Mikrobenchmarki serwisów dla historii różnej długości (domyślnie 10, 1000, 100000 prób): '
+        'czas, liczba zapytań i skalowanie. Dane pomocnicze są wycofywane.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default=','.join(str(size) for size in microbenchmarks.DEFAULT_SIZES),
+                            help='Długości historii użytkownika, np. 10,1000,100000')
+        parser.add_argument('--repeat', type=int, default=microbenchmarks.DEFAULT_REPEAT,
+                            help='Liczba mierzonych wywołań na funkcję i rozmiar')
+        parser.add_argument('--case', action='append', dest='cases',
+                            help=f'Tylko wybrane funkcje (można powtarzać): {", ".join(c.name for c in microbenchmarks.CASES)}')
+        parser.add_argument('--output', help='Zapisz raport JSON do pliku')
+        parser.add_argument('--check', action='store_true',
+                            help='Zakończ błędem, jeśli funkcja ze ścieżki zgłoszenia skaluje się z historią')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted({int(size) for size in options['sizes'].split(',') if size.strip()})
+        except ValueError:
+            raise CommandError('--sizes: oczekiwano liczb oddzielonych przecinkami.')
+        if not sizes or sizes[0] < 1:
+            raise CommandError('--sizes: długości historii muszą być dodatnie.')
+
+        known = {case.name for case in microbenchmarks.CASES}
+        unknown = set(options['cases'] or []) - known
+        if unknown:
+            raise CommandError(f'Nieznane funkcje: {", ".join(sorted(unknown))}')
+
+        report = microbenchmarks.run(
+            sizes=sizes, repeat=max(options['repeat'], 1), cases=options['cases'],
+            progress=lambda message: self.stdout.write(message),
+        )
+        suspects = self._print_report(report, sizes)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(benchmark.dumps(report) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Raport zapisano w {options["output"]}'))
+
+        if suspects and options['check']:
+            raise CommandError(f'Koszt zależny od długości historii: {", ".join(suspects)}')
+
+    def _print_report(self, report, sizes):
+        header = ''.join(f'{f"{size} [ms/SQL]":>20}' for size in sizes)
+        self.stdout.write(f'\n{"funkcja":<50}{header}{"wykładnik":>11}')
+
+        suspects = []
+        for name, case in report['cases'].items():
+            cells = ''.join(
+                f'{case["results"][str(size)]["p50_ms"]:>13.2f} / {case["results"][str(size)]["queries"]:<4}'
+                for size in sizes
+            )
+            scaling = case['scaling']
+            exponent = '-' if scaling['latency_exponent'] is None else f'{scaling["latency_exponent"]:.2f}'
+            line = f'{name:<50}{cells}{exponent:>11}'
+            if scaling['suspect_o_history']:
+                suspects.append(name)
+                line = self.style.WARNING(line + '  <- zależy od historii')
+            self.stdout.write(line)
+        return suspects
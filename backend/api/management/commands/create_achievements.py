@@ -1,53 +1,21 @@
 from django.core.management.base import BaseCommand
 from api.models import Achievement
+from api.services.achievement_logic import RULES
 
 class Command(BaseCommand):
-    help = 'Tworzy podstawowe osiągnięcia'
+    help = 'Tworzy osiągnięcia zadeklarowane w services/achievement_logic.py'
 
     def handle(self, *args, **kwargs):
-        achievements_data = [
-            {
-                'slug': 'wpm_300',
-                'title': 'Speedster',
-                'description': 'Osiągnij prędkość 300 WPM',
-                'icon_name': '⚡'
-            },
-            {
-                'slug': 'wpm_800',
-                'title': 'Supersonic',
-                'description': 'Osiągnij prędkość 800 WPM',
-                'icon_name': '🚀'
-            },
-            {
-                'slug': 'accuracy_100',
-                'title': 'Snajper',
-                'description': 'Osiągnij 100% dokładności',
-                'icon_name': '🎯'
-            },
-            {
-                'slug': 'marathoner',
-                'title': 'Maratończyk',
-                'description': 'Ukończ tekst dłuższy niż 800 słów',
-                'icon_name': '🏃'
-            },
-            {
-                'slug': 'daily_challenger',
-                'title': 'Bohater Dnia',
-                'description': 'Ukończ wyzwanie dnia',
-                'icon_name': '🔥'
-            },
-        ]
-
-        for data in achievements_data:
+        for achievement_rule in RULES:
             ach, created = Achievement.objects.get_or_create(
-                slug=data['slug'],
+                slug=achievement_rule.slug,
                 defaults={
-                    'title': data['title'],
-                    'description': data['description'],
-                    'icon': data.get('icon', '🏆')
+                    'title': achievement_rule.title,
+                    'description': achievement_rule.description,
+                    'icon_name': achievement_rule.icon_name,
                 }
             )
             if created:
                 self.stdout.write(self.style.SUCCESS(f'Utworzono: {ach.title}'))
             else:
-                self.stdout.write(self.style.WARNING(f'Już istnieje: {ach.title}'))
\ No newline at end of file
+                self.stdout.write(self.style.WARNING(f'Już istnieje: {ach.title}'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api.services.challenge_service import purge_old_challenges
+
+
+class Command(BaseCommand):
+    help = 'Usuwa wyzwania dnia z minionych dni (uruchamiać raz dziennie, np. z crona)'
+
+    def handle(self, *args, **kwargs):
+        deleted_count = purge_old_challenges()
+        self.stdout.write(self.style.SUCCESS(f'Usunięto {deleted_count} starych wyzwań.'))
@@ -0,0 +1,72 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api.services import job_queue
+
+
+def _worker_main(worker_id, batch_size, poll_interval, stop_event, drain):
+    # Proces potomny otwiera własne połączenie z bazą przy pierwszym zapytaniu.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    job_queue.run_worker(
+        worker_id=worker_id,
+        batch_size=batch_size,
+        poll_interval=poll_interval,
+        stop_event=stop_event,
+        drain=drain,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Uruchamia pulę procesów wykonujących zadania z kolejki w tle (BackgroundJob)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2, help='Liczba procesów workerów')
+        parser.add_argument('--batch-size', type=int, default=10, help='Ile zadań worker przejmuje naraz')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Przerwa (s), gdy kolejka jest pusta')
+        parser.add_argument('--drain', action='store_true', help='Zakończ, gdy kolejka będzie pusta')
+
+    def handle(self, *args, **options):
+        processes = max(options['processes'], 1)
+        base_id = job_queue.default_worker_id()
+
+        if processes == 1:
+            processed = job_queue.run_worker(
+                worker_id=f'{base_id}/0',
+                batch_size=options['batch_size'],
+                poll_interval=options['poll_interval'],
+                drain=options['drain'],
+            )
+            self.stdout.write(self.style.SUCCESS(f'Wykonano {processed} zadań.'))
+            return
+
+        # Połączenia nie mogą być współdzielone między procesami po fork().
+        connections.close_all()
+
+        stop_event = multiprocessing.Event()
+        workers = [
+            multiprocessing.Process(
+                target=_worker_main,
+                args=(f'{base_id}/{i}', options['batch_size'], options['poll_interval'], stop_event, options['drain']),
+                daemon=True,
+            )
+            for i in range(processes)
+        ]
+
+        def stop(signum, frame):
+            self.stdout.write(self.style.WARNING('Zatrzymywanie workerów (kończą bieżące zadania)...'))
+            stop_event.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        for worker in workers:
+            worker.start()
+        self.stdout.write(self.style.SUCCESS(f'Uruchomiono {processes} workerów.'))
+
+        for worker in workers:
+            worker.join()
+
+        self.stdout.write(self.style.SUCCESS('Workery zakończyły pracę.'))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services import synthetic_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Generuje deterministyczny, duży zbiór danych syntetycznych (użytkownicy, ćwiczenia, pytania, '
+        'próby, obserwacje, powiadomienia). Skala 1.0 = 100 tys. użytkowników i ok. 2 mln prób.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=0.01, help='Współczynnik skali (1.0 = 100 tys. użytkowników)')
+        parser.add_argument('--seed', type=int, default=0, help='Ziarno generatora - te same dane dla tego samego ziarna')
+        parser.add_argument('--batch-size', type=int, default=synthetic_dataset.DEFAULT_BATCH_SIZE,
+                            help='Rozmiar partii bulk_create')
+        parser.add_argument('--reset', action='store_true', help='Usuń wcześniej wygenerowane dane seed_*')
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0:
+            raise CommandError('Skala musi być dodatnia.')
+
+        started = time.monotonic()
+
+        def progress(message):
+            self.stdout.write(f'[{time.monotonic() - started:7.1f}s] {message}')
+
+        try:
+            counts = synthetic_dataset.generate(
+                scale=options['scale'],
+                seed=options['seed'],
+                batch_size=max(options['batch_size'], 1),
+                reset=options['reset'],
+                progress=progress,
+            )
+        except synthetic_dataset.SeedDataExists as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wygenerowano dane dla {counts["users"]} użytkowników i {counts["exercises"]} ćwiczeń '
+            f'w {time.monotonic() - started:.1f}s.'
+        ))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from api.models import CustomUser
+from api.services import stats_logic, ranking_index
+
+FLOAT_TOLERANCE = 0.05
+
+
+class Command(BaseCommand):
+    help = 'Porównuje bieżące sumy statystyk użytkowników z pełną historią i opcjonalnie je naprawia'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', dest='username', help='Sprawdź tylko tego użytkownika')
+        parser.add_argument('--fix', action='store_true', help='Zapisz statystyki przeliczone z historii')
+
+    def _differs(self, stored, expected):
+        if isinstance(expected, float) or isinstance(stored, float):
+            return abs(stored - expected) > FLOAT_TOLERANCE
+        return stored != expected
+
+    def handle(self, *args, **options):
+        users = CustomUser.objects.all()
+        if options['username']:
+            users = users.filter(username=options['username'])
+
+        mismatched = 0
+        for user in users.iterator():
+            expected = stats_logic.compute_user_stats(user)
+            diffs = {
+                field: (getattr(user, field), value)
+                for field, value in expected.items()
+                if self._differs(getattr(user, field), value)
+            }
+            if not diffs:
+                continue
+
+            mismatched += 1
+            details = ', '.join(f'{field}: {old} -> {new}' for field, (old, new) in diffs.items())
+            self.stdout.write(self.style.WARNING(f'{user.username}: {details}'))
+
+            if options['fix']:
+                stats_logic.update_user_stats(user)
+
+        if options['fix'] and mismatched:
+            ranking_index.ranking_index.invalidate()
+            self.stdout.write(self.style.SUCCESS(f'Naprawiono statystyki {mismatched} użytkowników.'))
+        elif mismatched:
+            self.stdout.write(self.style.WARNING(f'Rozbieżności u {mismatched} użytkowników (uruchom z --fix).'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Statystyki są spójne z historią.'))
@@ -0,0 +1,98 @@
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from .services import request_profiler
+
+
+class RequestProfilingMiddleware:
+    """
+    Mierzy wylosowane żądania (REQUEST_PROFILING_SAMPLE_RATE): czas całkowity, liczbę
+    i czas zapytań SQL. Zapisuje profil w request_profiler.profile_store, a nagłówek
+    Server-Timing dodaje tylko przy DEBUG albo dla obsługi. Żądania poza próbką
+    przechodzą bez narzutu poza jednym losowaniem.
+
+    Działa synchronicznie i asynchronicznie, więc pod ASGI nie wymusza przełączania
+    wątków dla widoków async; tylko żądania z próbki przechodzą dwa razy do wątku
+    widoków synchronicznych, żeby objąć licznikiem jego połączenia z bazą.
+    Odpowiedzi strumieniowe (SSE) są pomijane - ich czas do zwrócenia nagłówków nic
+    nie mówi o czasie trwania strumienia.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        timer = request_profiler.QueryTimer()
+        started = time.perf_counter()
+        with self._timed_connections(timer):
+            response = self.get_response(request)
+        return self._finish(request, response, timer, started)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        # Połączenia z bazą są per wątek, a widoki synchroniczne (DRF) pod ASGI działają
+        # we wspólnym wątku sync_to_async(thread_sensitive=True) - tam instalujemy licznik.
+        timer = request_profiler.QueryTimer()
+        started = time.perf_counter()
+        stack = await sync_to_async(self._timed_connections, thread_sensitive=True)(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close, thread_sensitive=True)()
+        return self._finish(request, response, timer, started)
+
+    @staticmethod
+    def _sampled():
+        rate = request_profiler.sample_rate()
+        return rate > 0 and (rate >= 1 or random.random() < rate)
+
+    @staticmethod
+    def _timed_connections(timer):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+        return stack
+
+    def _finish(self, request, response, timer, started):
+        if response.streaming:
+            return response
+
+        total_ms = (time.perf_counter() - started) * 1000
+        sql_ms = timer.seconds * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        request_profiler.profile_store.record(
+            match.view_name if match else request_profiler.UNRESOLVED_VIEW,
+            request.method, request.path, response.status_code, total_ms, sql_ms, timer.count,
+        )
+        if self._shows_server_timing(request):
+            response['Server-Timing'] = request_profiler.server_timing(total_ms, sql_ms, timer.count)
+        return response
+
+    @staticmethod
+    def _shows_server_timing(request):
+        # Nagłówek zdradza liczbę zapytań i czasy - tylko przy DEBUG albo dla obsługi.
+        # Użytkownika JWT DRF przypisuje też do request podczas widoku.
+        if not getattr(settings, 'REQUEST_PROFILING_SERVER_TIMING', True):
+            return False
+        if settings.DEBUG:
+            return True
+        user = getattr(request, 'user', None)
+        return bool(user is not None and user.is_staff)
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_remove_achievement_icon_achievement_icon_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='total_ranking_points',
+            field=models.IntegerField(db_index=True, default=0, help_text='Suma punktów z ZALICZONYCH prób (accuracy >= 60%)'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:25
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_running_sums(apps, schema_editor):
+    CustomUser = apps.get_model('api', 'CustomUser')
+    UserProgress = apps.get_model('api', 'UserProgress')
+
+    CustomUser.objects.update(
+        total_ranking_points=0,
+        ranking_exercises_completed=0,
+        ranking_wpm_sum=0,
+        ranking_accuracy_sum=0,
+        average_wpm=0,
+        average_accuracy=0,
+    )
+
+    per_user = UserProgress.objects.filter(
+        exercise__is_ranked=True,
+        counted_for_ranking=True,
+        accuracy__gte=60,
+    ).values('user_id').annotate(
+        total_points=Sum('ranking_points'),
+        count=Count('id'),
+        sum_wpm=Sum('wpm'),
+        sum_accuracy=Sum('accuracy'),
+    )
+
+    for row in per_user.iterator():
+        CustomUser.objects.filter(pk=row['user_id']).update(
+            total_ranking_points=row['total_points'] or 0,
+            ranking_exercises_completed=row['count'],
+            ranking_wpm_sum=row['sum_wpm'] or 0,
+            ranking_accuracy_sum=row['sum_accuracy'] or 0,
+            average_wpm=round(row['sum_wpm'] / row['count'], 1),
+            average_accuracy=round(row['sum_accuracy'] / row['count'], 1),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0031_customuser_total_ranking_points_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='ranking_accuracy_sum',
+            field=models.FloatField(default=0, help_text='Suma accuracy z ZALICZONYCH prób (do liczenia średniej)'),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='ranking_wpm_sum',
+            field=models.BigIntegerField(default=0, help_text='Suma WPM z ZALICZONYCH prób (do liczenia średniej)'),
+        ),
+        migrations.RunPython(backfill_running_sums, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_customuser_running_stats_sums'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-created_at'], name='notif_recipient_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('read', False)), fields=['recipient', '-created_at'], name='notif_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprogress',
+            index=models.Index(condition=models.Q(('counted_for_ranking', True)), fields=['user', 'exercise', '-completed_at'], name='progress_ranked_attempt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprogress',
+            index=models.Index(condition=models.Q(('completed_daily_challenge', True)), fields=['user', 'exercise', '-completed_at'], name='progress_daily_done_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprogress',
+            index=models.Index(condition=models.Q(('counted_for_ranking', True), ('ranking_points__gt', 0)), fields=['user', '-completed_at'], name='progress_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:40
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_unread_counts(apps, schema_editor):
+    CustomUser = apps.get_model('api', 'CustomUser')
+    Notification = apps.get_model('api', 'Notification')
+
+    per_user = Notification.objects.filter(read=False).values('recipient_id').annotate(count=Count('id'))
+
+    for row in per_user.iterator():
+        CustomUser.objects.filter(pk=row['recipient_id']).update(unread_notifications=row['count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0034_background_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0, help_text='Licznik nieprzeczytanych powiadomień (zdenormalizowany)'),
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:49
+
+import hashlib
+import re
+
+from django.db import migrations, models
+
+# Zamrożona kopia api/services/text_analytics.py z chwili tej migracji - późniejsze
+# zmiany analizy nie mogą zmieniać tego, co liczy historyczna migracja.
+_TOKEN_RE = re.compile(r'\S+')
+_NON_WORD_RE = re.compile(r'[^\w]', re.UNICODE)
+_SENTENCE_END_RE = re.compile(r'[.!?…]+["\'”»)\]]*$')
+_VOWEL_RE = re.compile(r'[aąeęioóuy]')
+_SOFTENING_I_RE = re.compile(r'i(?=[aąeęoóuy])')
+
+HARD_WORD_SYLLABLES = 4
+BATCH_SIZE = 500
+
+
+def _content_hash(text):
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def _count_syllables(word):
+    word = word.lower()
+    return len(_VOWEL_RE.findall(word)) - len(_SOFTENING_I_RE.findall(word))
+
+
+def _analyze(text):
+    """(word_count, sentence_count, avg_word_length, readability_score)"""
+    tokens = words = letters = sentences = hard_words = 0
+    in_sentence = False
+
+    for match in _TOKEN_RE.finditer(text or ''):
+        token = match.group()
+        tokens += 1
+        cleaned = _NON_WORD_RE.sub('', token)
+        if cleaned:
+            words += 1
+            letters += len(cleaned)
+            in_sentence = True
+            if _count_syllables(cleaned) >= HARD_WORD_SYLLABLES:
+                hard_words += 1
+        if in_sentence and _SENTENCE_END_RE.search(token):
+            sentences += 1
+            in_sentence = False
+
+    if in_sentence:
+        sentences += 1
+
+    if not words:
+        return tokens, 0, 0.0, 0.0
+
+    return (
+        tokens,
+        sentences,
+        round(letters / words, 2),
+        round(0.4 * (words / sentences + 100 * hard_words / words), 2),
+    )
+
+
+def backfill_text_stats(apps, schema_editor):
+    ReadingExercise = apps.get_model('api', 'ReadingExercise')
+    fields = ['word_count', 'sentence_count', 'avg_word_length', 'readability_score', 'text_hash']
+
+    batch = []
+    for exercise in ReadingExercise.objects.only('id', 'text').iterator(chunk_size=BATCH_SIZE):
+        (exercise.word_count, exercise.sentence_count,
+         exercise.avg_word_length, exercise.readability_score) = _analyze(exercise.text)
+        exercise.text_hash = _content_hash(exercise.text)
+        batch.append(exercise)
+        if len(batch) >= BATCH_SIZE:
+            ReadingExercise.objects.bulk_update(batch, fields)
+            batch = []
+
+    if batch:
+        ReadingExercise.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0035_customuser_unread_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='readingexercise',
+            name='avg_word_length',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='readingexercise',
+            name='readability_score',
+            field=models.FloatField(default=0, editable=False, help_text='Indeks FOG-PL (przybliżona liczba lat nauki potrzebna do zrozumienia tekstu)'),
+        ),
+        migrations.AddField(
+            model_name='readingexercise',
+            name='sentence_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='readingexercise',
+            name='text_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_text_stats, migrations.RunPython.noop),
+    ]
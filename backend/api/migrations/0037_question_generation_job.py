@@ -0,0 +1,32 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:51
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0036_readingexercise_text_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionGenerationJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('params', models.JSONField(help_text='Parametry generowania (treść, temat, liczby pytań)')),
+                ('status', models.CharField(choices=[('pending', 'Oczekuje'), ('running', 'W trakcie'), ('done', 'Zakończone'), ('failed', 'Nieudane')], default='pending', max_length=10)),
+                ('result', models.JSONField(blank=True, help_text='Wygenerowane pytania', null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
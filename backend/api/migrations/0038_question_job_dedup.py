@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0037_question_generation_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questiongenerationjob',
+            name='force_refresh',
+            field=models.BooleanField(default=False, help_text='Pomiń wynik z cache'),
+        ),
+        migrations.AddField(
+            model_name='questiongenerationjob',
+            name='params_hash',
+            field=models.CharField(blank=True, help_text='Skrót znormalizowanych parametrów', max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='questiongenerationjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'running'])), fields=('params_hash',), name='unique_active_question_job'),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
@@ -8,6 +10,7 @@ from django.utils.text import slugify
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from .wpm_milestones import DEFAULT_WPM_LIMIT, get_next_wpm_limit, MIN_PASS_ACCURACY
+from .services import text_analytics
 
 class CustomUser(AbstractUser):
 
@@ -36,15 +39,19 @@ class CustomUser(AbstractUser):
     mode = models.CharField(max_length=20, choices=MODE_CHOICES, default='rsvp')
     chunk_size = models.IntegerField(default=3)
     
-    total_ranking_points = models.IntegerField(default=0, help_text="Suma punktów z ZALICZONYCH prób (accuracy >= 60%)")
+    total_ranking_points = models.IntegerField(default=0, db_index=True, help_text="Suma punktów z ZALICZONYCH prób (accuracy >= 60%)")
     ranking_exercises_completed = models.IntegerField(default=0, help_text="Liczba ZALICZONYCH prób rankingowych")
     average_wpm = models.FloatField(default=0, help_text="Średnie WPM z ZALICZONYCH prób")
     average_accuracy = models.FloatField(default=0, help_text="Średnia accuracy z ZALICZONYCH prób")
+    ranking_wpm_sum = models.BigIntegerField(default=0, help_text="Suma WPM z ZALICZONYCH prób (do liczenia średniej)")
+    ranking_accuracy_sum = models.FloatField(default=0, help_text="Suma accuracy z ZALICZONYCH prób (do liczenia średniej)")
 
     current_streak = models.IntegerField(default=0, help_text="Aktualna seria codziennych treningów")
     max_streak = models.IntegerField(default=0, help_text="Najdłuższa osiągnięta seria")
     last_streak_date = models.DateField(null=True, blank=True, help_text="Data ostatniego treningu")
 
+    unread_notifications = models.PositiveIntegerField(default=0, help_text="Licznik nieprzeczytanych powiadomień (zdenormalizowany)")
+
     def __str__(self):
         return self.username or self.email or f"User {self.id}"
 
@@ -65,6 +72,15 @@ class ReadingExercise(models.Model):
     
     created_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
     word_count = models.IntegerField(default=0, editable=False)
+    sentence_count = models.IntegerField(default=0, editable=False)
+    avg_word_length = models.FloatField(default=0, editable=False)
+    readability_score = models.FloatField(
+        default=0, editable=False,
+        help_text="Indeks FOG-PL (przybliżona liczba lat nauki potrzebna do zrozumienia tekstu)"
+    )
+    text_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+
+    TEXT_STATS_FIELDS = ('word_count', 'sentence_count', 'avg_word_length', 'readability_score', 'text_hash')
     
     def __str__(self):
         return self.title
@@ -79,8 +95,29 @@ class ReadingExercise(models.Model):
         else:
             return 6
         
+    def refresh_text_stats(self):
+        """
+        Przelicza statystyki tekstu, jeśli zmienił się jego skrót.
+        Zwraca True, gdy coś zostało przeliczone.
+        """
+        text_hash = text_analytics.content_hash(self.text)
+        if text_hash == self.text_hash:
+            return False
+
+        stats = text_analytics.analyze(self.text)
+        self.word_count = stats.word_count
+        self.sentence_count = stats.sentence_count
+        self.avg_word_length = stats.avg_word_length
+        self.readability_score = stats.readability_score
+        self.text_hash = text_hash
+        return True
+
     def save(self, *args, **kwargs):
-        self.word_count = len(self.text.split()) if self.text else 0
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.refresh_text_stats()
+        elif 'text' in update_fields and self.refresh_text_stats():
+            kwargs['update_fields'] = set(update_fields) | set(self.TEXT_STATS_FIELDS)
         super().save(*args, **kwargs)
 
 class DailyChallenge(models.Model):
@@ -149,6 +186,23 @@ class UserProgress(models.Model):
     
     class Meta:
         ordering = ['-completed_at']
+        indexes = [
+            models.Index(
+                fields=['user', 'exercise', '-completed_at'],
+                condition=models.Q(counted_for_ranking=True),
+                name='progress_ranked_attempt_idx',
+            ),
+            models.Index(
+                fields=['user', 'exercise', '-completed_at'],
+                condition=models.Q(completed_daily_challenge=True),
+                name='progress_daily_done_idx',
+            ),
+            models.Index(
+                fields=['user', '-completed_at'],
+                condition=models.Q(counted_for_ranking=True, ranking_points__gt=0),
+                name='progress_feed_idx',
+            ),
+        ]
     
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
@@ -226,8 +280,106 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', '-created_at'], name='notif_recipient_created_idx'),
+            models.Index(
+                fields=['recipient', '-created_at'],
+                condition=models.Q(read=False),
+                name='notif_unread_idx',
+            ),
+        ]
 
     def __str__(self):
         if self.target:
             return f"{self.actor} {self.verb} {self.target}"
-        return f"{self.actor} {self.verb}"
\ No newline at end of file
+        return f"{self.actor} {self.verb}"
+
+
+class BackgroundJob(models.Model):
+    """
+    Trwała kolejka zadań w tle (np. osiągnięcia po zgłoszeniu wyniku).
+    Zadania wykonuje `manage.py run_workers` - patrz services/job_queue.py.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Oczekuje'),
+        (STATUS_RUNNING, 'W trakcie'),
+        (STATUS_DONE, 'Zakończone'),
+        (STATUS_FAILED, 'Nieudane'),
+    ]
+
+    name = models.CharField(max_length=100, help_text="Nazwa zarejestrowanego zadania")
+    payload = models.JSONField(default=dict, blank=True)
+    idempotency_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    last_error = models.TextField(blank=True)
+
+    run_after = models.DateTimeField(default=timezone.now, help_text="Nie wykonuj przed tym czasem (ponowienia)")
+    locked_until = models.DateTimeField(null=True, blank=True, help_text="Koniec czasu widoczności dla workera")
+    locked_by = models.CharField(max_length=100, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(
+                fields=['run_after', 'id'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='job_ready_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} [{self.status}] #{self.pk}"
+
+
+class QuestionGenerationJob(models.Model):
+    """
+    Zlecenie wygenerowania pytań AI. Widok zwraca od razu `id`, a pytania
+    zapisuje worker (zadanie 'ai.generate_questions' w api/tasks.py).
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Oczekuje'),
+        (STATUS_RUNNING, 'W trakcie'),
+        (STATUS_DONE, 'Zakończone'),
+        (STATUS_FAILED, 'Nieudane'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    requested_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='question_jobs')
+    params = models.JSONField(help_text="Parametry generowania (treść, temat, liczby pytań)")
+    params_hash = models.CharField(max_length=64, null=True, blank=True, help_text="Skrót znormalizowanych parametrów")
+    force_refresh = models.BooleanField(default=False, help_text="Pomiń wynik z cache")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    result = models.JSONField(null=True, blank=True, help_text="Wygenerowane pytania")
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # Co najwyżej jedno aktywne zlecenie na zestaw parametrów - pozostali dołączają do niego.
+            models.UniqueConstraint(
+                fields=['params_hash'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='unique_active_question_job',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Pytania AI [{self.status}] {self.id}"
@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ExerciseCursorPagination(CursorPagination):
+    """
+    Stronicowanie kursorem dla listy ćwiczeń.
+    Kolejność pochodzi z widoku (parametr sort_by), więc kursor działa
+    dla każdej dostępnej opcji sortowania.
+    """
+    page_size = 30
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def get_ordering(self, request, queryset, view):
+        return view.get_ordering()
+
+
+class NotificationCursorPagination(CursorPagination):
+    """Stronicowanie powiadomień od najnowszych (indeks recipient, -created_at)."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
@@ -1,19 +1,24 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from .models import DailyChallenge, Notification, Friendship, ReadingExercise, UserProgress, Question, Achievement, UserAchievement, ExerciseCollection
+from .models import DailyChallenge, Notification, Friendship, ReadingExercise, UserProgress, Question, Achievement, UserAchievement, ExerciseCollection, QuestionGenerationJob
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Sum
+from django.db import models
+from django.db.models import Sum, Max
 from django.db import transaction
 from .wpm_milestones import DEFAULT_WPM_LIMIT
+from .services.challenge_service import invalidate_challenge_cache
+from .services import text_analytics
 
 from dj_rest_auth.serializers import UserDetailsSerializer
 
 
 User = get_user_model()
 
+RANKED_MAX_WORDS = 1000
+
 class CustomUserDetailsSerializer(UserDetailsSerializer):
     has_usable_password = serializers.SerializerMethodField()
     avatar = serializers.ImageField(required=False, allow_null=True)
@@ -145,6 +150,71 @@ class QuestionSerializer(serializers.ModelSerializer):
         model = Question
         fields = ['id', 'text', 'correct_answer', 'question_type', 'option_1', 'option_2', 'option_3', 'option_4']
 
+EXERCISE_PRELOAD_KEY = 'exercise_preload'
+
+
+def preload_exercise_context(exercises, request):
+    """
+    Liczy pola zależne od użytkownika dla CAŁEJ listy ćwiczeń stałą liczbą zapytań
+    (zamiast kilku zapytań na każde ćwiczenie).
+    """
+    exercise_ids = [exercise.id for exercise in exercises]
+    today = timezone.now().date()
+
+    scheduled_dates = {}
+    today_daily_ids = set()
+    challenges = DailyChallenge.objects.filter(
+        exercise_id__in=exercise_ids
+    ).order_by('-date').values_list('exercise_id', 'date')
+    for exercise_id, date in challenges:
+        scheduled_dates.setdefault(exercise_id, date)
+        if date == today:
+            today_daily_ids.add(exercise_id)
+
+    favorite_ids = set()
+    last_ranked_at = {}
+    if request and request.user.is_authenticated:
+        favorite_ids = set(ReadingExercise.favorited_by.through.objects.filter(
+            customuser_id=request.user.id,
+            readingexercise_id__in=exercise_ids
+        ).values_list('readingexercise_id', flat=True))
+
+        ranked_ids = [exercise.id for exercise in exercises if exercise.is_ranked]
+        if ranked_ids:
+            last_ranked_at = dict(UserProgress.objects.filter(
+                user=request.user,
+                exercise_id__in=ranked_ids,
+                counted_for_ranking=True
+            ).order_by().values('exercise_id').annotate(
+                last=Max('completed_at')
+            ).values_list('exercise_id', 'last'))
+
+    return {
+        'exercise_ids': set(exercise_ids),
+        'favorite_ids': favorite_ids,
+        'scheduled_dates': scheduled_dates,
+        'today_daily_ids': today_daily_ids,
+        'last_ranked_at': last_ranked_at,
+    }
+
+
+class ReadingExerciseListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        exercises = list(data.all() if isinstance(data, models.Manager) else data)
+
+        preload = preload_exercise_context(exercises, self.context.get('request'))
+        root_context = self.root._context
+        existing = root_context.get(EXERCISE_PRELOAD_KEY)
+        if existing:
+            for key, value in preload.items():
+                existing[key].update(value)
+        else:
+            root_context[EXERCISE_PRELOAD_KEY] = preload
+
+        return super().to_representation(exercises)
+
+
 class ReadingExerciseSerializer(serializers.ModelSerializer):
     created_by = serializers.ReadOnlyField(source='created_by.username')
     created_by_id = serializers.ReadOnlyField(source='created_by.id') 
@@ -161,17 +231,29 @@ class ReadingExerciseSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ReadingExercise
+        list_serializer_class = ReadingExerciseListSerializer
         fields = [
             'id', 'title', 'text', 'created_at', 'is_public', 'is_ranked', 
             'is_daily_candidate',
             'created_by', 'created_by_id', 'word_count', 'questions', 
+            'sentence_count', 'avg_word_length', 'readability_score',
             'is_favorite', 'created_by_is_admin', 'user_attempt_status',
             'daily_date', 'scheduled_date', 'is_today_daily' 
         ]
         read_only_fields = ('created_by', 'created_by_id', 'favorited_by')
 
+    def _get_preload(self, obj):
+        """Zwraca wstępnie policzony kontekst listy, jeśli obejmuje to ćwiczenie."""
+        preload = self.context.get(EXERCISE_PRELOAD_KEY)
+        if preload and obj.id in preload['exercise_ids']:
+            return preload
+        return None
+
     def get_is_today_daily(self, obj):
         """Zwraca True, jeśli to ćwiczenie jest DZIŚ wyzwaniem dnia"""
+        if preload := self._get_preload(obj):
+            return obj.id in preload['today_daily_ids']
+
         today = timezone.now().date()
         is_daily = DailyChallenge.objects.filter(date=today, exercise=obj).exists()
         return is_daily
@@ -180,7 +262,9 @@ class ReadingExerciseSerializer(serializers.ModelSerializer):
     def get_is_favorite(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return request.user in obj.favorited_by.all()
+            if preload := self._get_preload(obj):
+                return obj.id in preload['favorite_ids']
+            return obj.favorited_by.filter(pk=request.user.pk).exists()
         return False
     
     def get_created_by_is_admin(self, obj):
@@ -189,6 +273,9 @@ class ReadingExerciseSerializer(serializers.ModelSerializer):
         return False 
     
     def get_scheduled_date(self, obj):
+        if preload := self._get_preload(obj):
+            return preload['scheduled_dates'].get(obj.id)
+
         challenge = DailyChallenge.objects.filter(exercise=obj).first()
         return challenge.date if challenge else None
     
@@ -201,18 +288,22 @@ class ReadingExerciseSerializer(serializers.ModelSerializer):
             return 'non_ranked'
             
         user = request.user
+
+        if preload := self._get_preload(obj):
+            last_ranked_at = preload['last_ranked_at'].get(obj.id)
+        else:
+            last_ranked = UserProgress.objects.filter(
+                user=user,
+                exercise=obj,
+                counted_for_ranking=True
+            ).order_by('-completed_at').first()
+            last_ranked_at = last_ranked.completed_at if last_ranked else None
         
-        last_ranked = UserProgress.objects.filter(
-            user=user,
-            exercise=obj,
-            counted_for_ranking=True
-        ).order_by('-completed_at').first()
-        
-        if not last_ranked:
+        if not last_ranked_at:
             return 'rankable'
             
         one_month_ago = timezone.now() - timedelta(days=30)
-        if last_ranked.completed_at >= one_month_ago:
+        if last_ranked_at >= one_month_ago:
             return 'training_cooldown'
         else:
             return 'rankable'
@@ -221,14 +312,20 @@ class ReadingExerciseSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         
         # FIX #7: Limit słów dla rankingowych
-        text_content = data.get('text', getattr(self.instance, 'text', ''))
-        word_count = len(text_content.split()) if text_content else 0
         is_ranked = data.get('is_ranked', getattr(self.instance, 'is_ranked', False))
-
-        if is_ranked and word_count > 1000:
-             raise serializers.ValidationError(
-                f"Ćwiczenie rankingowe nie może mieć więcej niż 1000 słów (obecnie: {word_count})."
-            )
+        if is_ranked:
+            if 'text' in data:
+                # Liczymy tylko do pierwszego słowa ponad limit; dokładnie - tylko dla komunikatu.
+                too_long = text_analytics.count_words(data['text'], stop_after=RANKED_MAX_WORDS + 1) > RANKED_MAX_WORDS
+                word_count = text_analytics.count_words(data['text']) if too_long else None
+            else:
+                word_count = getattr(self.instance, 'word_count', 0)
+                too_long = word_count > RANKED_MAX_WORDS
+
+            if too_long:
+                raise serializers.ValidationError(
+                    f"Ćwiczenie rankingowe nie może mieć więcej niż {RANKED_MAX_WORDS} słów (obecnie: {word_count})."
+                )
 
         if not user.is_staff:
             if data.get('is_public', False):
@@ -271,6 +368,9 @@ class ReadingExerciseSerializer(serializers.ModelSerializer):
             instance.is_daily_candidate = validated_data.get('is_daily_candidate', instance.is_daily_candidate)
         
         instance.save() 
+
+        scheduled_dates = DailyChallenge.objects.filter(exercise=instance).values_list('date', flat=True)
+        invalidate_challenge_cache(*scheduled_dates)
         
         if questions_data is not None:
             instance.questions.all().delete()
@@ -288,6 +388,43 @@ class ReadingExerciseSerializer(serializers.ModelSerializer):
 
         return instance
     
+class ReadingExerciseSummarySerializer(ReadingExerciseSerializer):
+    """
+    Lekka reprezentacja ćwiczenia do list (bez pełnego tekstu i pytań).
+    Pełny tekst zwraca tylko widok szczegółów.
+    """
+    EXCERPT_CHARS = 300
+
+    questions = None
+    daily_date = None
+    excerpt = serializers.SerializerMethodField()
+
+    class Meta(ReadingExerciseSerializer.Meta):
+        fields = [
+            'id', 'title', 'excerpt', 'created_at', 'is_public', 'is_ranked',
+            'is_daily_candidate',
+            'created_by', 'created_by_id', 'word_count',
+            'is_favorite', 'created_by_is_admin', 'user_attempt_status',
+            'scheduled_date', 'is_today_daily'
+        ]
+        read_only_fields = fields
+
+    def get_excerpt(self, obj):
+        # Początek tekstu ma EXCERPT_CHARS + 1 znaków - nadmiarowy znak mówi, czy tekst ucięto
+        # i czy cięcie wypadło w środku słowa.
+        head = getattr(obj, 'text_head', None)
+        if head is None:
+            head = obj.text[:self.EXCERPT_CHARS + 1]
+
+        if len(head) <= self.EXCERPT_CHARS:
+            return head.strip()
+
+        excerpt = head[:self.EXCERPT_CHARS]
+        if not head[self.EXCERPT_CHARS].isspace():
+            excerpt = excerpt.rsplit(None, 1)[0]
+        return excerpt.strip() + '…'
+
+
 class UserProgressSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserProgress
@@ -352,4 +489,11 @@ class NotificationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Notification
-        fields = ['id', 'actor', 'verb', 'read', 'created_at']
\ No newline at end of file
+        fields = ['id', 'actor', 'verb', 'read', 'created_at']
+
+
+class QuestionGenerationJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuestionGenerationJob
+        fields = ['id', 'status', 'result', 'error', 'created_at', 'finished_at']
+        read_only_fields = fields
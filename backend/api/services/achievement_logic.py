@@ -1,63 +1,160 @@
 import logging
-from ..models import CustomUser, UserProgress, Achievement, UserAchievement
+import threading
+import time
+
+from django.db import transaction
+
+from ..models import CustomUser, UserProgress, Achievement, UserAchievement, Notification
+from ..wpm_milestones import MIN_PASS_ACCURACY
+from . import notification_service
 
 logger = logging.getLogger(__name__)
 
-def _award_achievement(user: CustomUser, achievement_slug: str) -> Achievement | None:
+CATALOG_RELOAD_INTERVAL_SECONDS = 60
+
+
+class AchievementRule:
     """
-    Wewnętrzna funkcja pomocnicza.
-    Próbuje przyznać użytkownikowi osiągnięcie.
+    Deklaracja osiągnięcia: dane katalogowe + warunek na (user, progress).
+    Dane katalogowe służą do zasiania tabeli Achievement (`manage.py create_achievements`).
     """
-    try:
-        achievement_to_award = Achievement.objects.get(slug=achievement_slug)
-        
-        obj, created = UserAchievement.objects.get_or_create(
-            user=user, 
-            achievement=achievement_to_award
-        )
+    def __init__(self, slug, title, description, icon_name, predicate):
+        self.slug = slug
+        self.title = title
+        self.description = description
+        self.icon_name = icon_name
+        self.predicate = predicate
+
+    def matches(self, user: CustomUser, progress: UserProgress) -> bool:
+        return bool(self.predicate(user, progress))
+
+
+RULES: list[AchievementRule] = []
+
+
+def rule(slug, title, description, icon_name='🏆'):
+    """Dekorator rejestrujący warunek osiągnięcia."""
+    def decorator(predicate):
+        RULES.append(AchievementRule(slug, title, description, icon_name, predicate))
+        return predicate
+    return decorator
+
+
+@rule('wpm_300', 'Speedster', 'Osiągnij prędkość 300 WPM', '⚡')
+def _wpm_300(user, progress):
+    return progress.wpm >= 300
+
+
+@rule('wpm_800', 'Supersonic', 'Osiągnij prędkość 800 WPM', '🚀')
+def _wpm_800(user, progress):
+    return progress.wpm >= 800
+
+
+@rule('accuracy_100', 'Snajper', 'Osiągnij 100% dokładności', '🎯')
+def _accuracy_100(user, progress):
+    return progress.accuracy == 100
+
+
+@rule('marathoner', 'Maratończyk', 'Ukończ tekst dłuższy niż 800 słów', '🏃')
+def _marathoner(user, progress):
+    return progress.exercise.word_count > 800
+
+
+@rule('daily_challenger', 'Bohater Dnia', 'Ukończ wyzwanie dnia', '🔥')
+def _daily_challenger(user, progress):
+    return progress.completed_daily_challenge
+
+
+class _Catalog:
+    """
+    Katalog osiągnięć (slug -> Achievement) ładowany raz na proces.
+    Unieważniany sygnałem przy zmianie tabeli Achievement; jeśli reguła wskaże
+    slug spoza katalogu, katalog jest doładowywany (najwyżej raz na minutę).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._achievements = None
+        self._loaded_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._achievements = None
+
+    def get(self, required_slugs=()):
+        with self._lock:
+            stale = self._achievements is None or (
+                any(slug not in self._achievements for slug in required_slugs)
+                and time.monotonic() - self._loaded_at > CATALOG_RELOAD_INTERVAL_SECONDS
+            )
+            if stale:
+                self._achievements = Achievement.objects.in_bulk()
+                self._loaded_at = time.monotonic()
+            return self._achievements
+
+
+catalog = _Catalog()
+
+
+def invalidate_catalog():
+    catalog.invalidate()
+
+
+def qualifies_for_achievements(progress: UserProgress) -> bool:
+    """Osiągnięcia są tylko za zaliczone próby, które dały punkty rankingowe."""
+    return (
+        progress.accuracy >= MIN_PASS_ACCURACY
+        and progress.counted_for_ranking
+        and progress.ranking_points > 0
+    )
 
-        if created:
-            logger.info(f"Przyznano osiągnięcie '{achievement_slug}' użytkownikowi {user.username}")
-            return achievement_to_award 
-        
-        return None
-        
-    except Achievement.DoesNotExist:
-        logger.warning(f"OSTRZEŻENIE: Próba przyznania nieistniejącego osiągnięcia (slug): {achievement_slug}")
-        return None
-    except Exception as e:
-        logger.error(f"Błąd podczas przyznawania osiągnięcia '{achievement_slug}' dla {user.username}: {e}")
-        return None
 
 def check_for_new_achievements(user: CustomUser, progress: UserProgress) -> list[Achievement]:
     """
     Sprawdza i przyznaje osiągnięcia na podstawie zakończonego ćwiczenia.
     Zwraca listę nowo przyznanych osiągnięć.
-    UWAGA: Ta funkcja jest wywoływana tylko, gdy accuracy >= 60%.
+
+    Koszt: blokada wiersza użytkownika + jedno zapytanie o posiadane osiągnięcia
+    + po jednym bulk_create dla UserAchievement i Notification + licznik
+    nieprzeczytanych (tylko jeśli jest co przyznać).
+
+    Sprawdzenia dla kolejnych zgłoszeń tego samego użytkownika działają w równoległych
+    workerach - bez blokady oba mogłyby uznać to samo osiągnięcie za nowe i wysłać
+    dwa powiadomienia (unikalność w bazie odrzuciłaby tylko drugi wiersz).
     """
-    newly_awarded = []
-    
-    if progress.accuracy < 60:
-        return newly_awarded
-    
-    if progress.wpm >= 300:
-        if new_ach := _award_achievement(user, 'wpm_300'):
-            newly_awarded.append(new_ach)
-            
-    if progress.wpm >= 800:
-        if new_ach := _award_achievement(user, 'wpm_800'):
-            newly_awarded.append(new_ach)
-
-    if progress.accuracy == 100:
-        if new_ach := _award_achievement(user, 'accuracy_100'):
-            newly_awarded.append(new_ach)
-    
-    if progress.exercise.word_count > 800:
-        if new_ach := _award_achievement(user, 'marathoner'):
-            newly_awarded.append(new_ach)
-            
-    if progress.completed_daily_challenge:
-        if new_ach := _award_achievement(user, 'daily_challenger'):
-            newly_awarded.append(new_ach)
-
-    return newly_awarded
\ No newline at end of file
+    if not qualifies_for_achievements(progress):
+        return []
+
+    matched = [r.slug for r in RULES if r.matches(user, progress)]
+    if not matched:
+        return []
+
+    achievements = catalog.get(required_slugs=matched)
+    for slug in matched:
+        if slug not in achievements:
+            logger.warning(f"OSTRZEŻENIE: Próba przyznania nieistniejącego osiągnięcia (slug): {slug}")
+    candidates = [slug for slug in matched if slug in achievements]
+
+    with transaction.atomic(savepoint=False):
+        # Blokada do końca transakcji: odczyt posiadanych i zapis są wtedy jedną operacją.
+        list(CustomUser.objects.select_for_update().filter(pk=user.pk).values_list('pk', flat=True))
+
+        owned = set(
+            UserAchievement.objects.filter(user=user, achievement_id__in=candidates)
+            .values_list('achievement_id', flat=True)
+        )
+        new_slugs = [slug for slug in candidates if slug not in owned]
+        if not new_slugs:
+            return []
+
+        UserAchievement.objects.bulk_create(
+            [UserAchievement(user=user, achievement_id=slug) for slug in new_slugs],
+            ignore_conflicts=True,
+        )
+        # bulk_create nie wysyła post_save, więc powiadomienia tworzymy tutaj (jednym INSERT-em).
+        notification_service.bulk_notify([
+            Notification(recipient=user, actor=user, verb=f"odblokował osiągnięcie: {achievements[slug].title}")
+            for slug in new_slugs
+        ])
+
+    logger.info(f"Przyznano osiągnięcia {new_slugs} użytkownikowi {user.username}")
+    return [achievements[slug] for slug in new_slugs]
@@ -0,0 +1,384 @@
+"""
+Benchmark endpointów API (`manage.py bench`).
+
+Wykonuje zadaną mieszankę uwierzytelnionych (JWT) wywołań API w kilku wątkach,
+przez testowego klienta Django (w procesie) albo przez HTTP do działającego
+serwera (`base_url`). Dla każdego endpointu liczy p50/p95/p99, przepustowość,
+kody odpowiedzi i - w trybie w procesie - liczbę zapytań SQL na żądanie.
+
+Raport to JSON o stałym kształcie i posortowanych kluczach, więc raporty
+z dwóch commitów można porównać zwykłym diffem albo przez `compare()`.
+
+Uwaga: `submit_progress` zapisuje wyniki - uruchamiać na bazie testowej/seedowanej.
+"""
+import json
+import logging
+import random
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+
+import requests
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..models import CustomUser, Question, ReadingExercise
+
+logger = logging.getLogger(__name__)
+
+REPORT_VERSION = 1
+BENCH_USERNAME_PREFIX = 'bench_'
+API_PREFIX = '/api/'
+
+
+class BenchmarkSetupError(RuntimeError):
+    """Brak danych potrzebnych do benchmarku (np. ćwiczeń rankingowych z pytaniami)."""
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    latency: float
+    status: int
+    queries: int = None
+
+
+@dataclass
+class Fixture:
+    """Dane wspólne dla wszystkich wywołań: tokeny użytkowników i ćwiczenia do wysyłania wyników."""
+    tokens: list
+    exercises: list = field(default_factory=list)
+
+
+def _exercise_list(fixture, rng):
+    return 'get', 'exercises/', None
+
+
+def _leaderboard(fixture, rng):
+    return 'get', 'ranking/leaderboard/', None
+
+
+def _today_challenge(fixture, rng):
+    return 'get', 'challenge/today/', None
+
+
+def _submit_progress(fixture, rng):
+    exercise = rng.choice(fixture.exercises)
+    wpm = rng.randint(180, 700)
+    # Ok. 80% poprawnych odpowiedzi.
+    answers = {
+        str(question_id): answer if rng.random() < 0.8 else 'zła odpowiedź'
+        for question_id, answer in exercise['answers']
+    }
+    payload = {
+        'exercise': exercise['id'],
+        'reading_time_ms': max(int(exercise['word_count'] * 60000 / wpm), 1),
+        'answers': answers,
+    }
+    return 'post', 'submit-progress/', payload
+
+
+ENDPOINTS = {
+    'exercise_list': _exercise_list,
+    'leaderboard': _leaderboard,
+    'today_challenge': _today_challenge,
+    'submit_progress': _submit_progress,
+}
+
+DEFAULT_MIX = {'exercise_list': 4, 'leaderboard': 3, 'today_challenge': 2, 'submit_progress': 1}
+
+
+def parse_mix(value):
+    """'exercise_list=4,leaderboard=1' -> {'exercise_list': 4, 'leaderboard': 1}"""
+    if not value:
+        return dict(DEFAULT_MIX)
+
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in ENDPOINTS:
+            raise ValueError(f"Nieznany endpoint '{name}'. Dostępne: {', '.join(ENDPOINTS)}")
+        try:
+            mix[name] = float(weight) if weight else 1.0
+        except ValueError:
+            raise ValueError(f"Niepoprawna waga dla '{name}': {weight}")
+        if mix[name] < 0:
+            raise ValueError(f"Waga dla '{name}' nie może być ujemna")
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def percentile(sorted_values, pct):
+    """Percentyl z interpolacją liniową (jak numpy.percentile) dla posortowanej listy."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def build_fixture(users=10, mix=None):
+    """Użytkownicy `bench_*` (tworzeni w razie potrzeby) i ćwiczenia rankingowe z pytaniami."""
+    existing = {
+        user.username: user
+        for user in CustomUser.objects.filter(username__startswith=BENCH_USERNAME_PREFIX)
+    }
+    bench_users = []
+    for i in range(users):
+        username = f'{BENCH_USERNAME_PREFIX}{i}'
+        user = existing.get(username)
+        if user is None:
+            user = CustomUser(username=username, email=f'{username}@bench.local')
+            user.set_unusable_password()
+            user.save()
+        bench_users.append(user)
+
+    fixture = Fixture(tokens=[str(RefreshToken.for_user(user).access_token) for user in bench_users])
+
+    if (mix or DEFAULT_MIX).get('submit_progress'):
+        exercises = list(
+            ReadingExercise.objects.filter(is_ranked=True, questions__isnull=False)
+            .distinct().values('id', 'word_count')[:50]
+        )
+        if not exercises:
+            raise BenchmarkSetupError(
+                "Brak ćwiczeń rankingowych z pytaniami - uruchom `manage.py seed_scale` albo usuń submit_progress z --mix."
+            )
+        answers = {}
+        for question_id, exercise_id, correct_answer in Question.objects.filter(
+            exercise_id__in=[e['id'] for e in exercises]
+        ).values_list('id', 'exercise_id', 'correct_answer'):
+            answers.setdefault(exercise_id, []).append((question_id, correct_answer))
+        for exercise in exercises:
+            exercise['answers'] = answers.get(exercise['id'], [])
+        fixture.exercises = exercises
+
+    return fixture
+
+
+class InProcessTransport:
+    """Testowy klient Django - widzi zapytania SQL (licznik per wątek, bo połączenia są per wątek)."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = Client(HTTP_HOST='localhost', raise_request_exception=False)
+        return client
+
+    def request(self, method, path, payload, token):
+        client = self._client()
+        kwargs = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        if payload is not None:
+            kwargs.update(data=json.dumps(payload), content_type='application/json')
+
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, method)(API_PREFIX + path, **kwargs)
+            latency = time.perf_counter() - started
+        return response.status_code, latency, len(captured.captured_queries)
+
+    def close(self):
+        connection.close()
+
+
+class HttpTransport:
+    """Wywołania HTTP do działającego serwera (liczba zapytań SQL nie jest znana)."""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def request(self, method, path, payload, token):
+        started = time.perf_counter()
+        try:
+            response = self._session().request(
+                method.upper(), f'{self.base_url}{API_PREFIX}{path}', json=payload,
+                headers={'Authorization': f'Bearer {token}'}, timeout=self.timeout,
+            )
+            status = response.status_code
+        except requests.RequestException as e:
+            logger.warning(f"BENCH: błąd połączenia ({path}): {e}")
+            status = 0
+        return status, time.perf_counter() - started, None
+
+    def close(self):
+        session = getattr(self._local, 'session', None)
+        if session is not None:
+            session.close()
+
+
+def _schedule(mix, request_count, seed):
+    rng = random.Random(seed)
+    names = list(mix)
+    return rng.choices(names, weights=[mix[name] for name in names], k=request_count)
+
+
+def _run_worker(transport, fixture, plan, next_index, lock, seed, samples):
+    rng = random.Random(seed)
+    try:
+        while True:
+            with lock:
+                index = next_index[0]
+                if index >= len(plan):
+                    return
+                next_index[0] += 1
+            name = plan[index]
+            method, path, payload = ENDPOINTS[name](fixture, rng)
+            token = fixture.tokens[index % len(fixture.tokens)]
+            status, latency, queries = transport.request(method, path, payload, token)
+            samples.append(Sample(name, latency, status, queries))
+    finally:
+        transport.close()
+
+
+class _SameThread:
+    """Transport bez zamykania połączenia po zakończeniu (dla wykonania w wątku wywołującym)."""
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def request(self, *args):
+        return self._transport.request(*args)
+
+    def close(self):
+        pass
+
+
+def run(mix=None, request_count=200, concurrency=4, users=10, warmup=1, seed=0, base_url=None):
+    """Wykonuje benchmark i zwraca raport (dict gotowy do zapisania jako JSON)."""
+    mix = mix or dict(DEFAULT_MIX)
+    fixture = build_fixture(users=users, mix=mix)
+    transport = HttpTransport(base_url) if base_url else InProcessTransport()
+
+    # Rozgrzewka (cache, pierwsze połączenia) - poza pomiarem.
+    warmup_rng = random.Random(seed)
+    for name in mix:
+        for _ in range(warmup):
+            method, path, payload = ENDPOINTS[name](fixture, warmup_rng)
+            transport.request(method, path, payload, fixture.tokens[0])
+
+    plan = _schedule(mix, request_count, seed)
+    samples, next_index, lock = [], [0], threading.Lock()
+    concurrency = max(1, min(concurrency, len(plan) or 1))
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        # W wątku wywołującym - ważne w testach (transakcja testu jest widoczna tylko dla tego połączenia).
+        _run_worker(_SameThread(transport), fixture, plan, next_index, lock, seed, samples)
+    else:
+        threads = [
+            threading.Thread(
+                target=_run_worker,
+                args=(transport, fixture, plan, next_index, lock, seed + i, samples),
+                name=f'bench-{i}',
+            )
+            for i in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+
+    return build_report(samples, elapsed, {
+        'mode': 'http' if base_url else 'in_process',
+        'base_url': base_url,
+        'mix': mix,
+        'requests': request_count,
+        'concurrency': concurrency,
+        'users': users,
+        'seed': seed,
+    })
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def summarize(samples, elapsed):
+    """Statystyki dla listy próbek jednego endpointu (albo wszystkich)."""
+    latencies = sorted(sample.latency for sample in samples)
+    queries = [sample.queries for sample in samples if sample.queries is not None]
+    statuses = {}
+    for sample in samples:
+        statuses[str(sample.status)] = statuses.get(str(sample.status), 0) + 1
+
+    return {
+        'count': len(samples),
+        'errors': sum(1 for sample in samples if sample.status == 0 or sample.status >= 500),
+        'status_codes': statuses,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed > 0 else None,
+        'mean_ms': _ms(sum(latencies) / len(latencies)) if latencies else None,
+        'p50_ms': _ms(percentile(latencies, 50)),
+        'p95_ms': _ms(percentile(latencies, 95)),
+        'p99_ms': _ms(percentile(latencies, 99)),
+        'max_ms': _ms(latencies[-1]) if latencies else None,
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+        'queries_max': max(queries) if queries else None,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def build_report(samples, elapsed, config):
+    by_endpoint = {}
+    for sample in samples:
+        by_endpoint.setdefault(sample.endpoint, []).append(sample)
+
+    return {
+        'version': REPORT_VERSION,
+        'created_at': timezone.now().isoformat(),
+        'git_revision': git_revision(),
+        'config': config,
+        'elapsed_s': round(elapsed, 3),
+        'total': summarize(samples, elapsed),
+        'endpoints': {name: summarize(group, elapsed) for name, group in sorted(by_endpoint.items())},
+    }
+
+
+def dumps(report):
+    return json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False)
+
+
+COMPARED_METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'queries_per_request')
+
+
+def compare(baseline, report):
+    """
+    Różnice względem raportu bazowego: {endpoint: {metryka: (przed, po, zmiana_%)}}.
+    Endpointy obecne tylko w jednym z raportów są pomijane.
+    """
+    result = {}
+    for name, current in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if previous is None:
+            continue
+        result[name] = {}
+        for metric in COMPARED_METRICS:
+            before, after = previous.get(metric), current.get(metric)
+            change = None
+            if before and after is not None:
+                change = round((after - before) / before * 100, 1)
+            result[name][metric] = (before, after, change)
+    return result
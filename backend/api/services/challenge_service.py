@@ -1,4 +1,6 @@
 from ..models import DailyChallenge, ReadingExercise
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 from django.db.models import Q
 import random
@@ -6,35 +8,69 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-def get_today_challenge():
+CACHE_KEY_TEMPLATE = "daily_challenge:{date}"
+CACHE_TIMEOUT_SECONDS = 60 * 60 * 24
+
+
+def _cache_key(day):
+    return CACHE_KEY_TEMPLATE.format(date=day.isoformat())
+
+
+def invalidate_challenge_cache(*days):
     """
-    1. Czyści stare wyzwania (z wczoraj i starsze).
-    2. Sprawdza/Tworzy wyzwanie na dziś.
+    Usuwa z cache wyzwania dla podanych dni.
+    Wykonywane po zatwierdzeniu transakcji, żeby inny worker nie zapisał
+    do cache starego stanu pomiędzy zmianą a commitem.
     """
-    today = timezone.now().date()
+    keys = [_cache_key(day) for day in days if day]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
 
+
+def purge_old_challenges(today=None):
+    """
+    Czyści stare wyzwania (z wczoraj i starsze).
+    Uruchamiane z zadania cyklicznego (manage.py purge_daily_challenges),
+    a nie przy każdym odczycie.
+    """
+    today = today or timezone.now().date()
     deleted_count, _ = DailyChallenge.objects.filter(date__lt=today).delete()
     if deleted_count > 0:
         logger.info(f"Wyczyszczono {deleted_count} starych wyzwań daily.")
+    return deleted_count
 
-    
+
+def get_today_challenge():
     """
-    expired_exercises = ReadingExercise.objects.filter(scheduled_date__lt=today)
-    for ex in expired_exercises:
-        ex.scheduled_date = None
-        ex.is_daily_candidate = False # Przestań traktować jako kandydata, bo termin minął
-        ex.save()
-        logger.warning(f"Zresetowano przeterminowane ćwiczenie: {ex.title}")
+    Zwraca ćwiczenie będące dziś wyzwaniem dnia.
+    Wynik jest trzymany we wspólnym cache pod kluczem daty, więc gorące ścieżki
+    nie wykonują żadnych zapytań. Przy braku wpisu w cache:
+    1. Czyta wyzwanie na dziś z bazy.
+    2. Jeśli go nie ma - losuje i zapisuje nowe.
+
+    Wpis trafia do cache dopiero po zatwierdzeniu transakcji - po rollbacku
+    (np. nieudanego zgłoszenia) cache nie może wskazywać na niezapisany DailyChallenge.
     """
+    today = timezone.now().date()
+    key = _cache_key(today)
 
-    
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    chosen_exercise = _load_or_create_challenge(today)
+    if chosen_exercise:
+        transaction.on_commit(lambda: cache.set(key, chosen_exercise, CACHE_TIMEOUT_SECONDS))
+    return chosen_exercise
+
+
+def _load_or_create_challenge(today):
     try:
         daily_entry = DailyChallenge.objects.select_related('exercise').get(date=today)
         return daily_entry.exercise
     except DailyChallenge.DoesNotExist:
         pass 
 
-    
     pool = list(ReadingExercise.objects.filter(
         is_ranked=True, 
         is_daily_candidate=True
@@ -63,7 +99,7 @@ def get_today_challenge():
             chosen_exercise.is_daily_candidate = False
             if hasattr(chosen_exercise, 'scheduled_date'):
                 chosen_exercise.scheduled_date = None
-            chosen_exercise.save()
+            chosen_exercise.save(update_fields=['is_daily_candidate'])
             
             logger.info(f"Wylosowano wyzwanie: {chosen_exercise.title}")
 
@@ -75,7 +111,9 @@ def get_today_challenge():
             chosen_exercise = random.choice(fallback_pool)
 
     if chosen_exercise:
-        DailyChallenge.objects.create(date=today, exercise=chosen_exercise)
-        return chosen_exercise
+        daily_entry, _ = DailyChallenge.objects.select_related('exercise').get_or_create(
+            date=today, defaults={'exercise': chosen_exercise}
+        )
+        return daily_entry.exercise
         
     return None
\ No newline at end of file
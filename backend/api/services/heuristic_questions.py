@@ -0,0 +1,209 @@
+"""
+Lokalny (offline) generator pytań - alternatywa dla modelu AI bez sieci i limitów.
+
+Z tekstu wybierane są zdania o największej wadze terminów (TF), a w każdym
+zdaniu najważniejszy termin staje się luką:
+- pytanie otwarte: zdanie z luką, odpowiedź = usunięty termin,
+- pytanie zamknięte: to samo + 3 dystraktory - inne terminy z tekstu tego
+  samego rodzaju (liczba / nazwa własna / zwykłe słowo) o podobnej długości.
+
+Zdania są reprezentowane jako rzadkie wektory terminów (Counter), a wagi terminów
+to TF-ISF: częstość w tekście razy log odwrotności liczby zdań z terminem - termin
+obecny w co drugim zdaniu nic nie wnosi. Ocena zdania to iloczyn skalarny jego
+wektora z wagami. Liczby i nazwy własne są preferowane jako luki. Wynik jest
+deterministyczny dla danego tekstu (ziarno losowania opcji z jego skrótu).
+"""
+import math
+import random
+import re
+from collections import Counter
+
+from . import text_analytics
+
+BLANK = "_____"
+MIN_SENTENCE_WORDS = 6
+MAX_SENTENCE_WORDS = 40
+MIN_TERM_LENGTH = 4
+
+_SENTENCE_RE = re.compile(r'[^.!?…]+[.!?…]*')
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+STOPWORDS = frozenset("""
+    a aby ale albo ani aż bardzo bez bo bowiem by był była było były będzie będą być co czy czyli dla do
+    dlatego gdy gdyż gdzie go i ich im iż ja jak jako je jego jej jest jeszcze jeśli jednak już każdy
+    kiedy kto która które którego której który których lub ma mają mi między mnie może można mu na nad
+    nam nas nie nich nim niż no o od oraz po pod ponad ponieważ przed przez przy również się są ta tak
+    także tam te tego tej ten też to tu tylko tym u w we według więc wszystko wśród z za ze że żeby
+    jednym jedna jeden około swoje swój swoich swoim roku latach lata temu wiele często bardziej
+""".split())
+
+
+def _kind(term):
+    if term.isdigit():
+        return 'number'
+    if term[:1].isupper():
+        return 'proper'
+    return 'word'
+
+
+class _Sentence:
+    def __init__(self, index, text):
+        self.index = index
+        self.text = text.strip()
+        self.tokens = [(m.group(), m.span()) for m in _WORD_RE.finditer(self.text)]
+        self.vector = Counter(
+            token.casefold() for token, _ in self.tokens
+            if _is_term(token)
+        )
+
+    @property
+    def word_count(self):
+        return len(self.tokens)
+
+
+def _is_term(token):
+    return (token.isdigit() and len(token) >= 2) or (
+        len(token) >= MIN_TERM_LENGTH and token.casefold() not in STOPWORDS and not token.isdigit()
+    )
+
+
+def _split_sentences(text):
+    return [
+        _Sentence(index, match.group())
+        for index, match in enumerate(_SENTENCE_RE.finditer(text))
+        if match.group().strip()
+    ]
+
+
+KIND_BONUS = {'number': 2.0, 'proper': 1.5, 'word': 1.0}
+
+
+def _weights(sentences):
+    """Wagi TF-ISF terminów całego tekstu."""
+    tf, sf = Counter(), Counter()
+    for sentence in sentences:
+        tf.update(sentence.vector)
+        sf.update(sentence.vector.keys())
+    total = len(sentences)
+    return {term: count * math.log(1 + total / sf[term]) for term, count in tf.items()}
+
+
+def _score(sentence, weights):
+    """Iloczyn skalarny wektora zdania z wagami terminów, znormalizowany długością zdania."""
+    if not sentence.vector:
+        return 0.0
+    return sum(weights[term] * count for term, count in sentence.vector.items()) / math.sqrt(sentence.word_count)
+
+
+def _ranked_terms(sentence, weights, vocabulary):
+    """Terminy zdania od najlepszego kandydata na lukę: waga, rodzaj terminu, długość."""
+    return sorted(
+        sentence.vector,
+        key=lambda term: (weights[term] * KIND_BONUS[_kind(vocabulary[term])], len(term)),
+        reverse=True,
+    )
+
+
+def _surface(sentence, term):
+    """Pierwsze wystąpienie terminu w zdaniu w oryginalnej postaci (z wielkością liter) i jego pozycja."""
+    for token, span in sentence.tokens:
+        if token.casefold() == term:
+            return token, span
+    return None, None
+
+
+def _distractors(answer, sentence, vocabulary, rng, count=3):
+    """Terminy z tekstu tego samego rodzaju co odpowiedź, spoza zdania, o najbliższej długości."""
+    answer_key = answer.casefold()
+    kind = _kind(answer)
+    candidates = [
+        surface for key, surface in vocabulary.items()
+        if key != answer_key and key not in sentence.vector and _kind(surface) == kind
+    ]
+    if len(candidates) < count:
+        # Za mało terminów tego rodzaju - dobieramy dowolne inne terminy.
+        candidates += [
+            surface for key, surface in vocabulary.items()
+            if key != answer_key and key not in sentence.vector and surface not in candidates
+        ]
+
+    rng.shuffle(candidates)
+    candidates.sort(key=lambda surface: abs(len(surface) - len(answer)))
+    return candidates[:count]
+
+
+def _question(sentence, term, vocabulary, rng, question_type):
+    answer, span = _surface(sentence, term)
+    if answer is None:
+        return None
+
+    cloze = f"{sentence.text[:span[0]]}{BLANK}{sentence.text[span[1]:]}"
+    question = {
+        'question_type': question_type,
+        'text': f"Uzupełnij lukę: {cloze}",
+        'correct_answer': answer,
+        'option_1': None, 'option_2': None, 'option_3': None, 'option_4': None,
+    }
+
+    if question_type == 'choice':
+        distractors = _distractors(answer, sentence, vocabulary, rng)
+        if len(distractors) < 3:
+            return None
+        options = [answer] + distractors
+        rng.shuffle(options)
+        question.update({f'option_{i}': option for i, option in enumerate(options, start=1)})
+
+    return question
+
+
+def generate(text, open_count, choice_count):
+    """
+    Zwraca listę pytań w tym samym kształcie co generator AI: najpierw
+    `open_count` otwartych, potem `choice_count` zamkniętych. Pytanie zamknięte,
+    dla którego tekst nie ma 3 dystraktorów, staje się otwartym; pytań jest mniej
+    tylko wtedy, gdy tekst jest za krótki, by zbudować tyle różnych luk.
+    """
+    sentences = _split_sentences(text)
+    weights = _weights(sentences)
+    vocabulary = {}
+    for sentence in sentences:
+        for token, _ in sentence.tokens:
+            if _is_term(token):
+                vocabulary.setdefault(token.casefold(), token)
+
+    candidates = [s for s in sentences if MIN_SENTENCE_WORDS <= s.word_count <= MAX_SENTENCE_WORDS and s.vector]
+    if not candidates:
+        candidates = [s for s in sentences if s.vector]
+    candidates.sort(key=lambda s: _score(s, weights), reverse=True)
+
+    rng = random.Random(text_analytics.content_hash(text))
+    wanted = ['open'] * open_count + ['choice'] * choice_count
+    questions = {'open': [], 'choice': []}
+    used_terms = set()
+
+    # Kolejne "rundy": najpierw najlepszy termin każdego zdania, potem (dla krótkich
+    # tekstów) kolejne luki w tych samych zdaniach.
+    for _ in range(3):
+        for sentence in candidates:
+            if not wanted:
+                break
+            terms = [t for t in _ranked_terms(sentence, weights, vocabulary) if t not in used_terms]
+            if not terms:
+                continue
+            term = terms[0]
+
+            question_type = wanted[0]
+            question = _question(sentence, term, vocabulary, rng, question_type)
+            if question is None and question_type == 'choice':
+                # Za mało terminów na dystraktory (krótki tekst) - luka otwarta zamiast
+                # zamkniętej, żeby nie zwracać mniej pytań, niż zamówiono.
+                question = _question(sentence, term, vocabulary, rng, 'open')
+            if question is None:
+                continue
+
+            wanted.remove(question_type)
+            used_terms.add(term)
+            questions[question['question_type']].append((sentence.index, question))
+
+    return [q for _, q in sorted(questions['open'], key=lambda item: item[0])] + \
+           [q for _, q in sorted(questions['choice'], key=lambda item: item[0])]
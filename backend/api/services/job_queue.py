@@ -0,0 +1,248 @@
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VISIBILITY_TIMEOUT_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_BACKOFF_SECONDS = 10
+
+_handlers = {}
+_non_atomic = set()
+_failure_handlers = {}
+
+
+class UnknownJob(LookupError):
+    pass
+
+
+class LostLease(Exception):
+    """Czas widoczności minął i zadanie przejął inny worker."""
+
+
+def register(name, atomic=True, on_failure=None):
+    """
+    Dekorator rejestrujący funkcję jako zadanie w tle.
+    Funkcja dostaje payload jako argumenty nazwane i musi być idempotentna
+    (zadanie może zostać wykonane ponownie po awarii workera).
+
+    `atomic=False` - handler działa poza transakcją zadania (np. długie wywołanie
+    zewnętrznego API, przy którym nie chcemy trzymać blokady zapisu bazy);
+    swoje zapisy musi wtedy zatwierdzać sam.
+
+    `on_failure(error=..., **payload)` - wywoływane raz, gdy zadanie wyczerpie
+    wszystkie próby (np. żeby oznaczyć zlecenie widoczne dla użytkownika jako nieudane).
+    """
+    def decorator(func):
+        _handlers[name] = func
+        if atomic:
+            _non_atomic.discard(name)
+        else:
+            _non_atomic.add(name)
+        if on_failure is None:
+            _failure_handlers.pop(name, None)
+        else:
+            _failure_handlers[name] = on_failure
+        return func
+    return decorator
+
+
+def get_handler(name):
+    try:
+        return _handlers[name]
+    except KeyError:
+        raise UnknownJob(name) from None
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def is_sync():
+    return _setting('JOB_QUEUE_SYNC', False)
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(name, payload=None, idempotency_key=None, max_attempts=None):
+    """Dodaje jedno zadanie - patrz enqueue_many()."""
+    enqueue_many([(name, payload, idempotency_key)], max_attempts=max_attempts)
+
+
+def enqueue_many(jobs, max_attempts=None):
+    """
+    Dodaje zadania (krotki: nazwa, payload, klucz idempotencji) jednym INSERT-em.
+
+    Wiersze zapisują się w BIEŻĄCEJ transakcji, więc worker zobaczy je dopiero
+    po commicie, a przy rollbacku znikną razem z resztą zmian.
+    Zadanie z kluczem, który już istnieje w kolejce, jest pomijane.
+    """
+    if max_attempts is None:
+        max_attempts = _setting('JOB_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+
+    objects = []
+    for name, payload, idempotency_key in jobs:
+        get_handler(name)
+        objects.append(BackgroundJob(
+            name=name,
+            payload=payload or {},
+            idempotency_key=idempotency_key or f"{name}:{uuid.uuid4().hex}",
+            max_attempts=max_attempts,
+        ))
+
+    if not objects:
+        return
+
+    BackgroundJob.objects.bulk_create(objects, ignore_conflicts=True)
+
+    if is_sync():
+        keys = [job.idempotency_key for job in objects]
+        transaction.on_commit(lambda: run_jobs_with_keys(keys))
+
+
+def _claimable(now):
+    return Q(status=BackgroundJob.STATUS_PENDING) | Q(
+        status=BackgroundJob.STATUS_RUNNING, locked_until__lt=now
+    )
+
+
+def _try_claim(job_id, worker_id, now):
+    """
+    Optymistyczne przejęcie zadania warunkowym UPDATE-em (działa także na SQLite,
+    które nie wspiera SELECT ... FOR UPDATE SKIP LOCKED).
+    """
+    visibility = timedelta(seconds=_setting('JOB_VISIBILITY_TIMEOUT_SECONDS', DEFAULT_VISIBILITY_TIMEOUT_SECONDS))
+
+    return BackgroundJob.objects.filter(_claimable(now), pk=job_id).update(
+        status=BackgroundJob.STATUS_RUNNING,
+        locked_until=now + visibility,
+        locked_by=worker_id,
+        attempts=F('attempts') + 1,
+    ) == 1
+
+
+def claim_batch(worker_id, limit=10):
+    """
+    Przejmuje do `limit` gotowych zadań. Zadania 'running', którym minął czas
+    widoczności (worker padł), wracają do puli.
+    """
+    now = timezone.now()
+    candidate_ids = list(
+        BackgroundJob.objects.filter(_claimable(now), run_after__lte=now)
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:limit]
+    )
+
+    claimed = [job_id for job_id in candidate_ids if _try_claim(job_id, worker_id, now)]
+    return list(BackgroundJob.objects.filter(pk__in=claimed).order_by('run_after', 'id'))
+
+
+def _schedule_retry(job, error):
+    now = timezone.now()
+    backoff = _setting('JOB_RETRY_BACKOFF_SECONDS', DEFAULT_RETRY_BACKOFF_SECONDS)
+
+    if job.attempts >= job.max_attempts:
+        changes = {'status': BackgroundJob.STATUS_FAILED, 'finished_at': now}
+        logger.error(f"Zadanie {job} nieudane po {job.attempts} próbach: {error}")
+    else:
+        delay = backoff * 2 ** (job.attempts - 1)
+        changes = {'status': BackgroundJob.STATUS_PENDING, 'run_after': now + timedelta(seconds=delay)}
+        logger.warning(f"Zadanie {job} nieudane (próba {job.attempts}), ponowienie za {delay}s: {error}")
+
+    updated = BackgroundJob.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        locked_until=None, last_error=str(error)[:2000], **changes
+    )
+
+    failure_handler = _failure_handlers.get(job.name)
+    if updated and failure_handler and changes['status'] == BackgroundJob.STATUS_FAILED:
+        try:
+            failure_handler(error=error, **job.payload)
+        except Exception:
+            logger.exception(f"Błąd obsługi nieudanego zadania {job}")
+
+
+def execute(job):
+    """
+    Wykonuje przejęte zadanie. Handler i oznaczenie 'done' są w jednej transakcji,
+    więc zmiany w bazie zrobione przez handler zapisują się dokładnie raz
+    (poza handlerami zarejestrowanymi z atomic=False).
+    Zwraca True, jeśli zadanie się powiodło.
+    """
+    try:
+        handler = get_handler(job.name)
+        atomic = job.name not in _non_atomic
+
+        if not atomic:
+            handler(**job.payload)
+
+        with transaction.atomic():
+            if atomic:
+                handler(**job.payload)
+
+            finished = BackgroundJob.objects.filter(
+                pk=job.pk, locked_by=job.locked_by, status=BackgroundJob.STATUS_RUNNING
+            ).update(
+                status=BackgroundJob.STATUS_DONE,
+                finished_at=timezone.now(),
+                locked_until=None,
+                last_error='',
+            )
+            if not finished:
+                raise LostLease(job.pk)
+
+        return True
+
+    except LostLease:
+        logger.warning(f"Zadanie {job} przejął inny worker - zmiany wycofane.")
+        return False
+    except Exception as e:
+        logger.exception(f"Błąd zadania {job}")
+        _schedule_retry(job, e)
+        return False
+
+
+def run_jobs_with_keys(keys, worker_id='sync'):
+    """Tryb synchroniczny: od razu wykonuje zadania o podanych kluczach."""
+    now = timezone.now()
+    job_ids = BackgroundJob.objects.filter(idempotency_key__in=keys).values_list('id', flat=True)
+
+    for job_id in job_ids:
+        if _try_claim(job_id, worker_id, now):
+            execute(BackgroundJob.objects.get(pk=job_id))
+
+
+def run_worker(worker_id=None, batch_size=10, poll_interval=1.0, stop_event=None, drain=False):
+    """
+    Pętla workera: przejmuje partie zadań i je wykonuje.
+    `drain=True` kończy pracę, gdy kolejka jest pusta (np. w cronie).
+    Zwraca liczbę wykonanych zadań.
+    """
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+
+    while stop_event is None or not stop_event.is_set():
+        jobs = claim_batch(worker_id, limit=batch_size)
+
+        for job in jobs:
+            execute(job)
+            processed += 1
+
+        if not jobs:
+            if drain:
+                break
+            time.sleep(poll_interval)
+
+    return processed
@@ -0,0 +1,234 @@
+"""
+Mikrobenchmarki warstwy serwisów (`manage.py bench_services`).
+
+Każda funkcja jest mierzona dla użytkownika z historią N prób (domyślnie 10,
+1 000 i 100 000), a raport pokazuje, jak rosną czas i liczba zapytań SQL.
+Funkcje ze ścieżki zgłoszenia wyniku (`hot_path`) nie powinny zależeć od
+długości historii - wzrost liczby zapytań albo wykładnik skalowania czasu
+powyżej SCALING_EXPONENT_LIMIT oznacza podejrzenie O(historii).
+
+Wszystko działa w jednej transakcji wycofywanej na końcu, a każde wywołanie
+w osobnym savepoincie - historia ma stały rozmiar, a w bazie nie zostaje ślad.
+"""
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import Achievement, CustomUser, Question, ReadingExercise, UserProgress
+from . import (
+    achievement_logic, benchmark, challenge_service, ranking_index, ranking_logic,
+    stats_logic, submission_service, synthetic_dataset,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (10, 1_000, 100_000)
+DEFAULT_REPEAT = 20
+SCALING_EXPONENT_LIMIT = 0.25
+POOL_EXERCISES = 50
+USERNAME_PREFIX = 'microbench_'
+
+
+@dataclass
+class Case:
+    name: str
+    hot_path: bool
+    prepare: object  # (context) -> funkcja bez argumentów wykonywana w pomiarze
+
+
+@dataclass
+class Context:
+    user: CustomUser
+    exercise: ReadingExercise
+    last_progress: UserProgress
+    history: int
+
+
+def _determine_ranking_eligibility(ctx):
+    def run():
+        progress = UserProgress(user=ctx.user, exercise=ctx.exercise, wpm=320, accuracy=80.0)
+        ranking_logic.determine_ranking_eligibility(progress)
+    return run
+
+
+def _update_user_stats(ctx):
+    return lambda: stats_logic.update_user_stats(ctx.user)
+
+
+def _check_for_new_achievements(ctx):
+    return lambda: achievement_logic.check_for_new_achievements(ctx.user, ctx.last_progress)
+
+
+def _get_today_challenge(ctx):
+    return challenge_service.get_today_challenge
+
+
+def _get_today_challenge_cold(ctx):
+    def run():
+        cache.delete(_today_challenge_cache_key())
+        challenge_service.get_today_challenge()
+    return run
+
+
+def _process_exercise_submission(ctx):
+    reading_time_ms = int(ctx.exercise.word_count * 60000 / 320)
+    return lambda: submission_service.process_exercise_submission(ctx.user, ctx.exercise, reading_time_ms, 80.0)
+
+
+CASES = [
+    Case('ranking_logic.determine_ranking_eligibility', True, _determine_ranking_eligibility),
+    Case('achievement_logic.check_for_new_achievements', True, _check_for_new_achievements),
+    Case('challenge_service.get_today_challenge', True, _get_today_challenge),
+    Case('challenge_service.get_today_challenge[cold]', False, _get_today_challenge_cold),
+    Case('submission_service.process_exercise_submission', True, _process_exercise_submission),
+    # Pełne przeliczenie z historii - ścieżka naprawcza, z założenia O(historii).
+    Case('stats_logic.update_user_stats', False, _update_user_stats),
+]
+
+
+def _today_challenge_cache_key():
+    return challenge_service.CACHE_KEY_TEMPLATE.format(date=timezone.now().date().isoformat())
+
+
+def _warm_challenge_cache():
+    # get_today_challenge zapisuje cache dopiero po commicie, a pomiar trwa w wycofywanej
+    # transakcji - rozgrzewamy wpis ręcznie, tak jak wyglądałby na produkcji.
+    cache.set(_today_challenge_cache_key(), challenge_service.get_today_challenge(), challenge_service.CACHE_TIMEOUT_SECONDS)
+
+
+def _create_pool():
+    """Ćwiczenia rankingowe z pytaniami, na które rozkłada się historia (jedno jest kandydatem na wyzwanie dnia)."""
+    exercises = [
+        ReadingExercise(
+            title=f'{USERNAME_PREFIX}{i}', text='słowo ' * 400, is_ranked=True, is_daily_candidate=(i == 1),
+        )
+        for i in range(POOL_EXERCISES)
+    ]
+    for exercise in exercises:
+        exercise.refresh_text_stats()
+    ReadingExercise.objects.bulk_create(exercises)
+    Question.objects.bulk_create([
+        Question(exercise=exercise, text='Pytanie?', correct_answer='tak') for exercise in exercises
+    ])
+
+    for achievement_rule in achievement_logic.RULES:
+        Achievement.objects.get_or_create(slug=achievement_rule.slug, defaults={
+            'title': achievement_rule.title, 'description': achievement_rule.description,
+            'icon_name': achievement_rule.icon_name,
+        })
+    achievement_logic.invalidate_catalog()
+    return exercises
+
+
+def _create_history(size, pool):
+    """
+    Użytkownik z `size` próbami rozłożonymi po ćwiczeniach z puli (najnowsza próba
+    każdego ćwiczenia liczy się do rankingu), ze statystykami przeliczonymi z historii.
+    """
+    user = CustomUser.objects.create(username=f'{USERNAME_PREFIX}{size}', email=f'{USERNAME_PREFIX}{size}@bench.local')
+    now = timezone.now()
+    rows = []
+    for i in range(size):
+        exercise = pool[i % len(pool)]
+        completed_at = connection.ops.adapt_datetimefield_value(now - timedelta(minutes=size - i))
+        counted = i >= size - len(pool)
+        points = 250 if counted else 0
+        rows.append((user.pk, exercise.pk, 320, 80.0, completed_at, counted, i // len(pool) + 1, points, False))
+    synthetic_dataset.insert_rows(UserProgress, synthetic_dataset.PROGRESS_FIELDS, rows)
+    stats_logic.update_user_stats(user)
+
+    last_progress = UserProgress.objects.select_related('exercise').filter(user=user).order_by('-completed_at').first()
+    return Context(user=user, exercise=pool[0], last_progress=last_progress, history=size)
+
+
+def _measure(run, repeat, warmup=1):
+    latencies, queries = [], []
+    for i in range(warmup + repeat):
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        if i >= warmup:
+            latencies.append(elapsed)
+            queries.append(len(captured.captured_queries))
+
+    latencies.sort()
+    queries.sort()
+    return {
+        'p50_ms': round(benchmark.percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(benchmark.percentile(latencies, 95) * 1000, 3),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'queries': queries[len(queries) // 2],
+        'queries_max': queries[-1],
+    }
+
+
+def scaling(case, results):
+    """
+    Jak rośnie koszt między najmniejszą a największą historią:
+    wykładnik k w czas ~ historia^k (0 - stały, 1 - liniowy) i przyrost zapytań.
+    """
+    sizes = sorted(results, key=int)
+    smallest, largest = results[sizes[0]], results[sizes[-1]]
+    size_ratio = int(sizes[-1]) / int(sizes[0]) if len(sizes) > 1 else 1
+
+    exponent = None
+    if size_ratio > 1 and smallest['p50_ms'] > 0:
+        exponent = round(math.log(max(largest['p50_ms'], 1e-6) / smallest['p50_ms']) / math.log(size_ratio), 3)
+    query_growth = largest['queries'] - smallest['queries']
+
+    return {
+        'latency_exponent': exponent,
+        'query_growth': query_growth,
+        'suspect_o_history': case.hot_path and (
+            query_growth > 0 or (exponent is not None and exponent > SCALING_EXPONENT_LIMIT)
+        ),
+    }
+
+
+def run(sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT, cases=None, progress=None):
+    """Wykonuje mikrobenchmarki i zwraca raport; dane pomocnicze są wycofywane."""
+    report_progress = progress or logger.info
+    cases = [case for case in CASES if cases is None or case.name in cases]
+    results = {case.name: {} for case in cases}
+
+    try:
+        with transaction.atomic():
+            pool = _create_pool()
+            for size in sorted(sizes):
+                started = time.perf_counter()
+                ctx = _create_history(size, pool)
+                report_progress(f'Historia {size} prób przygotowana w {time.perf_counter() - started:.1f}s')
+                for case in cases:
+                    _warm_challenge_cache()
+                    results[case.name][str(size)] = _measure(case.prepare(ctx), repeat)
+            transaction.set_rollback(True)
+    finally:
+        # Stan w pamięci/cache mógł wskazywać na wycofane wiersze.
+        cache.delete(_today_challenge_cache_key())
+        achievement_logic.invalidate_catalog()
+        ranking_index.ranking_index.invalidate()
+
+    return {
+        'version': benchmark.REPORT_VERSION,
+        'created_at': timezone.now().isoformat(),
+        'git_revision': benchmark.git_revision(),
+        'config': {'sizes': sorted(sizes), 'repeat': repeat},
+        'cases': {
+            case.name: {
+                'hot_path': case.hot_path,
+                'results': results[case.name],
+                'scaling': scaling(case, results[case.name]),
+            }
+            for case in cases
+        },
+    }
@@ -0,0 +1,253 @@
+"""
+Pub/sub dla strumienia powiadomień (SSE, views.notification_stream).
+
+Broker trzyma w pamięci procesu subskrypcje otwartych połączeń (kolejki asyncio).
+Zdarzenia między procesami przenosi wymienny backend (NOTIFICATION_BUS_BACKEND):
+
+- LocalBackend - tylko w obrębie procesu (testy, runserver, jeden worker),
+- DatabasePollingBackend - powiadomienia z bieżącego procesu dostarcza od razu,
+  a jeden wątek na proces odpytuje tabelę Notification o nowe wiersze (jedno
+  zapytanie na cykl dla wszystkich połączeń), żeby złapać też te tworzone przez
+  `run_workers` i inne workery serwera.
+
+Bezczynny klient to tylko trzymane połączenie - żadnych zapytań per klient.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+from ..models import Notification
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = 'api.services.notification_bus.LocalBackend'
+DEFAULT_POLL_SECONDS = 2.0
+# Jak długo luka w numeracji id wstrzymuje kursor (transakcja zatwierdzona później).
+GAP_GRACE_SECONDS = 30
+QUEUE_SIZE = 100
+
+
+class Subscription:
+    def __init__(self, user_id, loop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning(f"Kolejka strumienia użytkownika {self.user_id} pełna - pomijam zdarzenie.")
+
+    def push(self, event):
+        """Bezpieczne wątkowo - może być wołane z sygnału w dowolnym wątku."""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+
+class NotificationBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            backend_path = getattr(settings, 'NOTIFICATION_BUS_BACKEND', DEFAULT_BACKEND)
+            self._backend = import_string(backend_path)(self)
+        return self._backend
+
+    async def subscribe(self, user_id) -> Subscription:
+        """Rejestruje połączenie; po powrocie żadne nowe powiadomienie go nie ominie."""
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        try:
+            # Backend może czytać bazę (kursor), więc poza pętlą zdarzeń.
+            await sync_to_async(self.backend.on_subscribe, thread_sensitive=True)()
+        except BaseException:
+            self.unsubscribe(subscription)
+            raise
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.user_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[subscription.user_id]
+
+    def subscribed_user_ids(self):
+        with self._lock:
+            return list(self._subscriptions)
+
+    def has_subscribers(self, user_id):
+        with self._lock:
+            return user_id in self._subscriptions
+
+    def deliver(self, user_id, event):
+        """Przekazuje zdarzenie do połączeń tego procesu."""
+        with self._lock:
+            subscribers = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscribers:
+            subscription.push(event)
+
+    def publish(self, notification):
+        """Wołane po zapisaniu powiadomienia (po commicie)."""
+        self.backend.publish(notification)
+
+
+def serialize_notification(notification):
+    from ..serializers import NotificationSerializer
+    return NotificationSerializer(notification).data
+
+
+class LocalBackend:
+    """Zastępczy backend: dostarcza zdarzenia tylko w bieżącym procesie."""
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def on_subscribe(self):
+        pass
+
+    def publish(self, notification):
+        if self.broker.has_subscribers(notification.recipient_id):
+            self.broker.deliver(notification.recipient_id, serialize_notification(notification))
+
+
+class DatabasePollingBackend:
+    """
+    Backend między procesami bez dodatkowej infrastruktury: wiersz Notification
+    jest wiadomością. Wątek odpytuje bazę tylko wtedy, gdy proces ma subskrybentów,
+    i kończy się, gdy ostatni się rozłączy (on_subscribe uruchamia go ponownie).
+    on_subscribe ustawia kursor od razu, więc nic utworzonego po subskrypcji nie
+    przepada, a publish() dostarcza powiadomienia z tego procesu bez czekania na
+    cykl - poller pomija potem te id.
+
+    Kursor nie może po prostu iść za największym widzianym id: transakcja, która
+    dostała mniejsze id, może zatwierdzić się później (np. na PostgreSQL). Dlatego
+    pamiętamy wiersze widziane powyżej kursora, a luki w numeracji wstrzymują kursor
+    najwyżej GAP_GRACE_SECONDS - potem uznajemy je za wycofane lub usunięte.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.poll_seconds = getattr(settings, 'NOTIFICATION_BUS_POLL_SECONDS', DEFAULT_POLL_SECONDS)
+        self._last_id = None
+        self._seen = set()
+        self._gaps = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def on_subscribe(self):
+        with self._lock:
+            if self._last_id is None:
+                self._init_cursor()
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='notification-bus-poller', daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=None):
+        """Zatrzymuje wątek odpytujący (np. przy zamykaniu procesu albo w testach)."""
+        self._stop.set()
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def is_running(self):
+        with self._lock:
+            return self._thread is not None and self._thread.is_alive()
+
+    def publish(self, notification):
+        # Subskrybenci tego procesu dostają powiadomienie od razu (po commicie); id trafia
+        # do widzianych, żeby poller go nie powtórzył. Inne procesy złapią wiersz z bazy.
+        if not self.broker.has_subscribers(notification.recipient_id):
+            return
+        with self._lock:
+            if self._last_id is not None:
+                if notification.id <= self._last_id or notification.id in self._seen:
+                    return  # już dostarczone przez poller
+                self._seen.add(notification.id)
+        self.broker.deliver(notification.recipient_id, serialize_notification(notification))
+
+    def _init_cursor(self):
+        self._last_id = Notification.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+    def _reset_cursor(self):
+        self._last_id = None
+        self._seen.clear()
+        self._gaps.clear()
+
+    def poll_once(self):
+        """Jedno zapytanie o wiersze powyżej kursora (z całej tabeli)."""
+        with self._lock:
+            if not self.broker.subscribed_user_ids():
+                # Bez subskrybentów nie odpytujemy bazy; po powrocie zaczynamy od bieżącego stanu.
+                self._reset_cursor()
+                return 0
+            if self._last_id is None:
+                # Zwykle ustawia go on_subscribe; tu tylko gdy backend woła się bezpośrednio.
+                self._init_cursor()
+                return 0
+            last_id = self._last_id
+
+        rows = list(Notification.objects.filter(id__gt=last_id).select_related('actor').order_by('id'))
+        with self._lock:
+            if self._last_id != last_id:
+                return 0  # kursor zresetowany w międzyczasie
+            fresh = [notification for notification in rows if notification.id not in self._seen]
+            self._seen.update(notification.id for notification in fresh)
+            self._advance_cursor(time.monotonic())
+
+        delivered = 0
+        for notification in fresh:
+            if self.broker.has_subscribers(notification.recipient_id):
+                self.broker.deliver(notification.recipient_id, serialize_notification(notification))
+                delivered += 1
+        return delivered
+
+    def _advance_cursor(self, now):
+        top = max(self._seen, default=self._last_id)
+        for missing in range(self._last_id + 1, top):
+            if missing not in self._seen:
+                self._gaps.setdefault(missing, now)
+
+        while True:
+            next_id = self._last_id + 1
+            if next_id in self._seen:
+                self._seen.discard(next_id)
+            elif next_id in self._gaps and now - self._gaps[next_id] >= GAP_GRACE_SECONDS:
+                del self._gaps[next_id]
+            else:
+                break
+            self._last_id = next_id
+
+    def _run(self):
+        while not self._stop.wait(self.poll_seconds):
+            with self._lock:
+                if not self.broker.subscribed_user_ids():
+                    self._reset_cursor()
+                    self._thread = None
+                    break
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("Błąd odpytywania powiadomień dla strumienia SSE")
+            finally:
+                close_old_connections()
+        close_old_connections()
+
+
+broker = NotificationBroker()
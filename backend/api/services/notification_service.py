@@ -0,0 +1,74 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from ..models import CustomUser, Notification
+from .notification_bus import broker
+
+
+def _shift_unread(user_ids, delta):
+    CustomUser.objects.filter(pk__in=user_ids).update(
+        unread_notifications=Greatest(F('unread_notifications') + delta, Value(0))
+    )
+
+
+def increment_unread(recipient_ids):
+    """
+    Zwiększa liczniki nieprzeczytanych powiadomień.
+    Odbiorcy z tą samą liczbą nowych powiadomień są aktualizowani jednym UPDATE-em.
+    """
+    by_delta = defaultdict(list)
+    for user_id, count in Counter(recipient_ids).items():
+        by_delta[count].append(user_id)
+
+    for delta, user_ids in by_delta.items():
+        _shift_unread(user_ids, delta)
+
+
+def decrement_unread(user_id, count=1):
+    _shift_unread([user_id], -count)
+
+
+def publish_created(notifications):
+    """Po commicie wysyła nowe powiadomienia do otwartych strumieni SSE."""
+    def publish():
+        for notification in notifications:
+            broker.publish(notification)
+    transaction.on_commit(publish)
+
+
+def bulk_notify(notifications: list[Notification]) -> list[Notification]:
+    """
+    Zapisuje powiadomienia jednym bulk_create i aktualizuje liczniki odbiorców.
+    bulk_create nie wysyła post_save, więc licznik trzeba podbić tutaj.
+    """
+    if not notifications:
+        return []
+
+    created = Notification.objects.bulk_create(notifications)
+    increment_unread([n.recipient_id for n in created if not n.read])
+    publish_created(created)
+    return created
+
+
+def mark_all_as_read(user: CustomUser) -> int:
+    """
+    Oznacza wszystkie powiadomienia jako przeczytane. Licznik zmniejsza się
+    o liczbę oznaczonych wierszy (a nie zeruje), żeby nie zgubić powiadomienia
+    utworzonego równolegle.
+    """
+    with transaction.atomic():
+        updated = Notification.objects.filter(recipient=user, read=False).update(read=True)
+        if updated:
+            decrement_unread(user.pk, updated)
+    return updated
+
+
+def recount_unread(user: CustomUser) -> int:
+    """Przelicza licznik od zera (naprawa po ręcznych zmianach w bazie)."""
+    count = Notification.objects.filter(recipient=user, read=False).count()
+    CustomUser.objects.filter(pk=user.pk).update(unread_notifications=count)
+    user.unread_notifications = count
+    return count
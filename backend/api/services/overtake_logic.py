@@ -0,0 +1,65 @@
+import logging
+from django.contrib.contenttypes.models import ContentType
+from ..models import CustomUser, Notification
+from . import ranking_index, notification_service
+
+logger = logging.getLogger(__name__)
+
+TOP_N = 10
+
+
+def get_overtaken_candidates_queryset(active_user: CustomUser, old_points: int, new_points: int):
+    """Użytkownicy z punktami w [old_points, new_points) - zakres po indeksie total_ranking_points."""
+    return (
+        CustomUser.objects
+        .filter(total_ranking_points__gte=max(old_points, 1), total_ranking_points__lt=new_points)
+        .exclude(pk=active_user.pk)
+        .order_by('-total_ranking_points', 'id')
+    )
+
+
+def notify_overtaken_users(active_user: CustomUser, old_points: int, new_points: int) -> list[CustomUser]:
+    """
+    Powiadamia użytkowników z TOP 10, których `active_user` właśnie wyprzedził,
+    czyli tych z punktami w przedziale [old_points, new_points).
+    Osoby, które już wcześniej były za nim, nie dostają powiadomienia.
+
+    Koszt: jedno zapytanie zakresowe po indeksie total_ranking_points
+    (najwyżej TOP_N wierszy) + jeden bulk_create powiadomień + jedno UPDATE licznika.
+    Zwraca listę wyprzedzonych użytkowników.
+    """
+    ranking_index.record_points(active_user)
+
+    if new_points <= old_points:
+        return []
+
+    if ranking_index.ranking_index.rank_for_points(new_points) > TOP_N:
+        return []
+
+    candidates = get_overtaken_candidates_queryset(active_user, old_points, new_points).only(
+        'id', 'username', 'total_ranking_points'
+    )[:TOP_N]
+    # Liczy się miejsce sprzed awansu: indeks ma już nowe punkty `active_user`, więc
+    # każdy wyprzedzony spadł o jedno miejsce (np. z 10. na 11. - to też wyprzedzenie w TOP 10).
+    overtaken = [
+        user for user in candidates
+        if ranking_index.ranking_index.rank_for_points(user.total_ranking_points) - 1 <= TOP_N
+    ]
+    if not overtaken:
+        return []
+
+    user_content_type = ContentType.objects.get_for_model(CustomUser)
+
+    notification_service.bulk_notify([
+        Notification(
+            recipient=other_user,
+            actor=active_user,
+            verb=f"awansował w rankingu TOP 10! ({new_points} pkt)",
+            content_type=user_content_type,
+            object_id=active_user.id
+        )
+        for other_user in overtaken
+    ])
+    logger.info(f"{active_user.username} wyprzedził w TOP 10: {[u.username for u in overtaken]}")
+
+    return overtaken
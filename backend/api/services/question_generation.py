@@ -0,0 +1,516 @@
+"""
+Generowanie pytań do tekstu przez model AI.
+
+Model jest wymienny (AI_QUESTION_MODEL w settings) - obiekt z metodą
+`generate(prompt) -> str`. Domyślnie GeminiModel; w testach lokalny model
+zastępczy, więc nic nie wychodzi do sieci.
+
+Żądanie HTTP tylko zakłada zlecenie (submit_job) - samo wywołanie modelu
+odbywa się w workerze (`manage.py run_workers`), więc nie blokuje wątków serwera.
+
+Wyniki są w cache pod skrótem znormalizowanych parametrów (treść, temat, liczby
+pytań). Identyczne zlecenia w toku są łączone: między procesami przez
+unikalność `params_hash` aktywnych zleceń, w obrębie procesu przez SingleFlight.
+`force_refresh` pomija cache (ale nadal dołącza do zlecenia w toku).
+
+Parametr `engine` wybiera silnik: 'ai' (model) albo 'heuristic' - lokalny
+generator (api/services/heuristic_questions.py), który działa w procesie
+w milisekundach, więc nie korzysta z cache, kolejki ani limitu AI.
+"""
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from ..models import QuestionGenerationJob
+from . import job_queue, rate_limiter, question_sections, text_analytics, heuristic_questions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = 'api.services.question_generation.GeminiModel'
+GEMINI_MODEL_NAME = 'gemini-2.5-flash-lite'
+
+MIN_TOTAL_QUESTIONS = 15
+MIN_CONTENT_LENGTH = 50
+
+DEFAULT_SECTION_WORDS = 1500
+DEFAULT_MAX_PARALLEL_SECTIONS = 4
+SECTION_OVERSAMPLE = 1
+
+ENGINE_AI = 'ai'
+ENGINE_HEURISTIC = 'heuristic'
+ENGINES = (ENGINE_AI, ENGINE_HEURISTIC)
+
+RESULT_CACHE_KEY_TEMPLATE = "ai_questions:v2:{key}"
+DEFAULT_RESULT_CACHE_SECONDS = 60 * 60 * 24 * 7
+
+
+class InvalidRequest(ValueError):
+    """Niepoprawne parametry zlecenia (400)."""
+
+
+class InvalidModelResponse(ValueError):
+    """Model zwrócił odpowiedź, której nie da się odczytać jako listy pytań (502)."""
+
+
+class ModelUnavailable(RuntimeError):
+    """Model AI nie jest skonfigurowany (503)."""
+
+
+@dataclass(frozen=True)
+class GenerationParams:
+    content: str
+    topic: str
+    open_count: int
+    choice_count: int
+
+    @property
+    def total_count(self):
+        return self.open_count + self.choice_count
+
+    def to_payload(self):
+        return asdict(self)
+
+    def cache_key(self):
+        """Skrót parametrów; różnice w białych znakach i wielkości liter tematu są pomijane."""
+        normalized = "\n".join([
+            " ".join(self.content.split()),
+            " ".join(self.topic.casefold().split()),
+            str(self.open_count),
+            str(self.choice_count),
+        ])
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def parse_params(data) -> GenerationParams:
+    """Waliduje dane z żądania; błędy jako InvalidRequest z komunikatem dla użytkownika."""
+    content = data.get('content', '')
+    topic = data.get('topic', 'Temat ogólny')
+
+    try:
+        total_count = int(data.get('total_count', 15))
+        open_count = int(data.get('open_count', 10))
+        choice_count = int(data.get('choice_count', 5))
+    except (ValueError, TypeError):
+        raise InvalidRequest("Liczba pytań musi być liczbą całkowitą.")
+
+    if total_count < MIN_TOTAL_QUESTIONS:
+        raise InvalidRequest(f"Minimalna łączna liczba pytań to {MIN_TOTAL_QUESTIONS}.")
+
+    if open_count + choice_count != total_count:
+        raise InvalidRequest(
+            f"Suma pytań ({open_count} otwartych + {choice_count} zamkniętych) nie zgadza się z sumą całkowitą ({total_count})."
+        )
+
+    if open_count < 0 or choice_count < 0:
+        raise InvalidRequest("Liczba pytań nie może być ujemna.")
+
+    if not content or len(content) < MIN_CONTENT_LENGTH:
+        raise InvalidRequest(
+            f"Materiał źródłowy (content) jest wymagany i musi mieć co najmniej {MIN_CONTENT_LENGTH} znaków."
+        )
+
+    return GenerationParams(content=content, topic=topic, open_count=open_count, choice_count=choice_count)
+
+
+def parse_force_refresh(data) -> bool:
+    value = data.get('force_refresh', False)
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def parse_engine(data) -> str:
+    engine = str(data.get('engine') or ENGINE_AI).strip().lower()
+    if engine not in ENGINES:
+        raise InvalidRequest(f"Nieznany silnik generowania pytań: {engine}. Dostępne: {', '.join(ENGINES)}.")
+    return engine
+
+
+def build_prompt(params: GenerationParams) -> str:
+    return f"""
+        Jesteś asystentem edukacyjnym. Twoim zadaniem jest wygenerowanie DOKŁADNIE:
+        - {params.open_count} pytań otwartych ('open')
+        - {params.choice_count} pytań zamkniętych ('choice')
+
+        ...razem {params.total_count} pytań z podanego materiału źródłowego.
+        Pytania mają dotyczyć tematu: "{params.topic}".
+
+        Zawsze zwracaj odpowiedź wyłącznie jako JEDNĄ tablicę obiektów JSON, bez żadnego dodatkowego tekstu (Markdown itp).
+        Użyj DOKŁADNIE tych kluczy: "question_type", "text", "correct_answer", "option_1", "option_2", "option_3", "option_4".
+
+        Format JSON:
+        [
+            {{
+                "question_type": "open",
+                "text": "Przykładowe pytanie otwarte?",
+                "correct_answer": "Krótka odpowiedź",
+                "option_1": null, "option_2": null, "option_3": null, "option_4": null
+            }},
+            {{
+                "question_type": "choice",
+                "text": "Przykładowe pytanie zamknięte?",
+                "correct_answer": "Opcja 1",
+                "option_1": "Opcja 1", "option_2": "Opcja 2", "option_3": "Opcja 3", "option_4": "Opcja 4"
+            }}
+        ]
+
+        Wymogi:
+        - Dla pytań 'open', odpowiedzi (correct_answer) muszą być BARDZO KRÓTKIE (1-3 słowa). Pola opcji muszą być null.
+        - Dla pytań 'choice', MUSISZ podać 4 opcje. Jedna z nich MUSI być identyczna z correct_answer.
+        - Zachowaj kolejność: najpierw wszystkie pytania otwarte, potem wszystkie zamknięte.
+
+        Oto materiał źródłowy:
+        ---
+        {params.content}
+        ---
+        """
+
+
+def parse_model_response(text) -> list:
+    """Zdejmuje ewentualne ogrodzenie Markdown (```json) i dekoduje listę pytań."""
+    cleaned_text = (text or '').strip()
+
+    if cleaned_text.startswith('```json'):
+        cleaned_text = cleaned_text[7:]
+    if cleaned_text.startswith('```'):
+        cleaned_text = cleaned_text[3:]
+    if cleaned_text.endswith('```'):
+        cleaned_text = cleaned_text[:-3]
+
+    try:
+        questions = json.loads(cleaned_text.strip())
+    except json.JSONDecodeError:
+        logger.error(f"AI ERROR: Błąd dekodowania JSON. Otrzymano: {text}")
+        raise InvalidModelResponse(
+            "AI zwróciło niepoprawny format danych. Spróbuj ponownie (zmniejsz ilość pytań lub zmień tekst)."
+        )
+
+    if not isinstance(questions, list):
+        raise InvalidModelResponse("AI zwróciło niepoprawny format danych (oczekiwano listy pytań).")
+    return questions
+
+
+class GeminiModel:
+    def __init__(self):
+        import google.generativeai as genai
+
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        self._model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+
+    def generate(self, prompt) -> str:
+        # Wspólny limit dla wszystkich procesów (AI_RATE_LIMIT_* w settings).
+        return rate_limiter.get_ai_limiter().call(self._model.generate_content, prompt).text
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """Instancja modelu z AI_QUESTION_MODEL, tworzona raz na proces."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            model_path = getattr(settings, 'AI_QUESTION_MODEL', DEFAULT_MODEL)
+            try:
+                _model = import_string(model_path)()
+            except Exception as e:
+                logger.error(f"AI: nie udało się utworzyć modelu {model_path}: {e}")
+                raise ModelUnavailable(
+                    "Model AI nie jest dostępny lub nie został poprawnie skonfigurowany (brak klucza API?)."
+                ) from e
+        return _model
+
+
+def reset_model():
+    """Zapomina instancję modelu (np. po zmianie AI_QUESTION_MODEL w testach)."""
+    global _model
+    with _model_lock:
+        _model = None
+
+
+def _generate_raw(params: GenerationParams) -> list:
+    """Jedno wywołanie modelu (przez wspólny limit) - surowa lista pytań."""
+    return parse_model_response(get_model().generate(build_prompt(params)))
+
+
+def _section_params(params, sections):
+    """Parametry dla sekcji: podział pytań wg długości, z zapasem na odrzucone duplikaty."""
+    weights = [text_analytics.count_words(section) for section in sections]
+    opens = question_sections.allocate(params.open_count, weights)
+    choices = question_sections.allocate(params.choice_count, weights)
+
+    return [
+        GenerationParams(
+            content=section,
+            topic=params.topic,
+            open_count=open_count + (SECTION_OVERSAMPLE if open_count else 0),
+            choice_count=choice_count + (SECTION_OVERSAMPLE if choice_count else 0),
+        )
+        for section, open_count, choice_count in zip(sections, opens, choices)
+        if open_count or choice_count
+    ]
+
+
+def _generate_sections(section_params) -> list:
+    """
+    Sekcje generowane równolegle (tempo i tak wyznacza wspólny limit AI), wyniki
+    w kolejności sekcji. Błąd pojedynczej sekcji jest pomijany, o ile którakolwiek się udała.
+    """
+    max_workers = min(len(section_params), getattr(settings, 'AI_MAX_PARALLEL_SECTIONS', DEFAULT_MAX_PARALLEL_SECTIONS))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-section') as executor:
+        futures = [executor.submit(_generate_raw, section) for section in section_params]
+
+    questions, errors = [], []
+    for future in futures:
+        try:
+            questions.extend(future.result())
+        except Exception as e:
+            errors.append(e)
+
+    if errors:
+        logger.warning(f"AI WARNING: {len(errors)} z {len(futures)} sekcji nie powiodło się: {errors[0]}")
+        if not questions:
+            raise errors[0]
+    return questions
+
+
+def generate_questions(params: GenerationParams) -> list:
+    """
+    Generuje dokładnie `open_count` pytań otwartych i `choice_count` zamkniętych.
+
+    Długi materiał (> AI_SECTION_WORDS słów) jest dzielony na sekcje generowane
+    równolegle, więc czas zależy od najdłuższej sekcji, a nie od całego tekstu.
+    Wynik jest oczyszczany z niepoprawnych pytań i prawie-duplikatów i przycinany
+    do zadanego podziału; brakujące pytania są dogenerowywane jednym dodatkowym wywołaniem.
+    """
+    max_words = getattr(settings, 'AI_SECTION_WORDS', DEFAULT_SECTION_WORDS)
+    sections = question_sections.split_sections(params.content, max_words)
+
+    if len(sections) == 1:
+        raw = _generate_raw(params)
+    else:
+        logger.info(f"AI: materiał podzielony na {len(sections)} sekcji")
+        raw = _generate_sections(_section_params(params, sections))
+
+    questions = question_sections.merge_questions(raw, params.open_count, params.choice_count)
+
+    missing_open, missing_choice = question_sections.missing_counts(questions, params.open_count, params.choice_count)
+    if missing_open or missing_choice:
+        logger.info(f"AI: dogenerowanie brakujących pytań ({missing_open} otwartych, {missing_choice} zamkniętych)")
+        top_up = GenerationParams(
+            content=max(sections, key=len),
+            topic=params.topic,
+            open_count=missing_open + (SECTION_OVERSAMPLE if missing_open else 0),
+            choice_count=missing_choice + (SECTION_OVERSAMPLE if missing_choice else 0),
+        )
+        try:
+            raw.extend(_generate_raw(top_up))
+        except (InvalidModelResponse, *_transient_errors()) as e:
+            # Wynik sekcji jest już gotowy - bez dogenerowania oddajemy go częściowy,
+            # zamiast ponawiać przez kolejkę całe zlecenie. Ponawiamy tylko, gdy nic nie ma.
+            if not questions:
+                raise
+            logger.warning(f"AI WARNING: dogenerowanie brakujących pytań nie powiodło się: {e}")
+        questions = question_sections.merge_questions(raw, params.open_count, params.choice_count)
+
+    if len(questions) != params.total_count:
+        logger.warning(f"AI WARNING: Zaządano {params.total_count} pytań, otrzymano {len(questions)}")
+    return questions
+
+
+def generate_heuristic_questions(params: GenerationParams) -> list:
+    """Pytania z lokalnego generatora, w tym samym kształcie i podziale co z modelu."""
+    # Bez merge_questions: luki w tym samym zdaniu wyglądałyby na prawie-duplikaty,
+    # a generator sam pilnuje, by każdy termin był odpowiedzią tylko raz.
+    questions = heuristic_questions.generate(params.content, params.open_count, params.choice_count)
+    if len(questions) != params.total_count:
+        logger.warning(f"HEURISTIC WARNING: Zaządano {params.total_count} pytań, otrzymano {len(questions)}")
+    return questions
+
+
+class SingleFlight:
+    """Równoległe wywołania z tym samym kluczem czekają na wynik pierwszego (w obrębie procesu)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+_in_flight = SingleFlight()
+
+
+def _result_cache_key(key):
+    return RESULT_CACHE_KEY_TEMPLATE.format(key=key)
+
+
+def get_cached_questions(params: GenerationParams):
+    return cache.get(_result_cache_key(params.cache_key()))
+
+
+def get_or_generate_questions(params: GenerationParams, force_refresh=False, engine=ENGINE_AI) -> list:
+    """Pytania z cache albo z modelu; równoległe identyczne wywołania dzielą jedno zapytanie."""
+    if engine == ENGINE_HEURISTIC:
+        return generate_heuristic_questions(params)
+
+    key = params.cache_key()
+
+    if not force_refresh:
+        cached = cache.get(_result_cache_key(key))
+        if cached is not None:
+            logger.info(f"AI: pytania z cache ({key[:12]})")
+            return cached
+
+    def generate_and_store():
+        questions = generate_questions(params)
+        ttl = getattr(settings, 'AI_QUESTION_CACHE_SECONDS', DEFAULT_RESULT_CACHE_SECONDS)
+        cache.set(_result_cache_key(key), questions, ttl)
+        return questions
+
+    return _in_flight.do(key, generate_and_store)
+
+
+def _active_job(params_hash):
+    return QuestionGenerationJob.objects.filter(
+        params_hash=params_hash,
+        status__in=[QuestionGenerationJob.STATUS_PENDING, QuestionGenerationJob.STATUS_RUNNING],
+    ).first()
+
+
+def submit_job(user, params: GenerationParams, force_refresh=False, engine=ENGINE_AI) -> QuestionGenerationJob:
+    """
+    Zakłada zlecenie i kolejkuje jego wykonanie (po commicie).
+    - silnik heurystyczny albo wynik w cache -> zlecenie od razu zakończone, bez workera,
+    - identyczne zlecenie jest w toku -> zwracamy je (wszyscy czekają na jeden wynik).
+    """
+    params_hash = params.cache_key()
+
+    if engine == ENGINE_HEURISTIC:
+        return QuestionGenerationJob.objects.create(
+            requested_by=user, params=params.to_payload(), params_hash=params_hash,
+            status=QuestionGenerationJob.STATUS_DONE, result=generate_heuristic_questions(params),
+            finished_at=timezone.now(),
+        )
+
+    if not force_refresh:
+        cached = get_cached_questions(params)
+        if cached is not None:
+            return QuestionGenerationJob.objects.create(
+                requested_by=user, params=params.to_payload(), params_hash=params_hash,
+                status=QuestionGenerationJob.STATUS_DONE, result=cached, finished_at=timezone.now(),
+            )
+
+    with transaction.atomic():
+        for _ in range(2):
+            existing = _active_job(params_hash)
+            if existing:
+                return existing
+            try:
+                with transaction.atomic():
+                    job = QuestionGenerationJob.objects.create(
+                        requested_by=user, params=params.to_payload(),
+                        params_hash=params_hash, force_refresh=force_refresh,
+                    )
+                break
+            except IntegrityError:
+                # Ktoś równolegle założył to samo zlecenie - dołączamy do niego.
+                continue
+        else:
+            return _active_job(params_hash)
+
+        job_queue.enqueue('ai.generate_questions', {'job_id': str(job.id)}, idempotency_key=f"ai.generate_questions:{job.id}")
+    return job
+
+
+def _finish(job_id, **changes):
+    QuestionGenerationJob.objects.filter(pk=job_id).update(finished_at=timezone.now(), **changes)
+
+
+def _transient_errors():
+    """Błędy, po których warto ponowić wywołanie później: limit, sieć, 429/5xx modelu."""
+    errors = [rate_limiter.RateLimitTimeout, requests.exceptions.ConnectionError, requests.exceptions.Timeout]
+    try:
+        from google.api_core import exceptions as google_exceptions
+    except ImportError:
+        pass
+    else:
+        errors += [google_exceptions.TooManyRequests, google_exceptions.ServerError]
+    return tuple(errors)
+
+
+def fail_job(job_id, error):
+    """Oznacza zlecenie jako nieudane po wyczerpaniu prób kolejki (on_failure zadania)."""
+    QuestionGenerationJob.objects.filter(
+        pk=job_id,
+        status__in=[QuestionGenerationJob.STATUS_PENDING, QuestionGenerationJob.STATUS_RUNNING],
+    ).update(
+        status=QuestionGenerationJob.STATUS_FAILED,
+        error=f"Wystąpił błąd podczas komunikacji z AI: {error}",
+        finished_at=timezone.now(),
+    )
+
+
+def run_job(job_id):
+    """
+    Wykonuje zlecenie i zapisuje wynik albo komunikat błędu.
+    Zlecenie już zakończone jest pomijane, więc ponowne wykonanie jest bezpieczne.
+    Błędy przejściowe są zgłaszane dalej - kolejka ponawia zadanie z opóźnieniem,
+    a zlecenie zostaje 'running' do skutku albo do fail_job() po ostatniej próbie.
+    """
+    started = QuestionGenerationJob.objects.filter(
+        pk=job_id,
+        status__in=[QuestionGenerationJob.STATUS_PENDING, QuestionGenerationJob.STATUS_RUNNING],
+    ).update(status=QuestionGenerationJob.STATUS_RUNNING)
+    if not started:
+        return
+
+    job = QuestionGenerationJob.objects.get(pk=job_id)
+    logger.info(f"AI: generowanie pytań dla zlecenia {job_id} (użytkownik {job.requested_by_id})")
+
+    try:
+        questions = get_or_generate_questions(GenerationParams(**job.params), force_refresh=job.force_refresh)
+    except (InvalidRequest, InvalidModelResponse, ModelUnavailable) as e:
+        _finish(job_id, status=QuestionGenerationJob.STATUS_FAILED, error=str(e))
+        return
+    except _transient_errors() as e:
+        logger.warning(f"AI: przejściowy błąd zlecenia {job_id}, ponowienie przez kolejkę: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"AI CRITICAL ERROR: {str(e)}")
+        _finish(job_id, status=QuestionGenerationJob.STATUS_FAILED, error=f"Wystąpił błąd podczas komunikacji z AI: {str(e)}")
+        return
+
+    _finish(job_id, status=QuestionGenerationJob.STATUS_DONE, result=questions, error='')
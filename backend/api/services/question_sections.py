@@ -0,0 +1,138 @@
+"""
+Podział długiego materiału na sekcje i scalanie pytań wygenerowanych dla sekcji
+(api/services/question_generation.py).
+
+- split_sections - sekcje po akapitach (a za długie akapity po zdaniach),
+- allocate - rozdział liczby pytań proporcjonalnie do długości sekcji,
+- merge_questions - odrzuca pytania o złym kształcie i prawie-duplikaty,
+  a potem przycina do dokładnego podziału open/choice.
+"""
+import math
+import re
+
+from . import text_analytics
+
+_PARAGRAPH_RE = re.compile(r'\n\s*\n')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?…])\s+')
+
+DUPLICATE_SIMILARITY = 0.8
+OPTION_KEYS = ('option_1', 'option_2', 'option_3', 'option_4')
+
+
+def _pack(pieces, max_words):
+    """Skleja kolejne kawałki w sekcje nie dłuższe niż `max_words` (o ile kawałek sam się mieści)."""
+    sections, current, current_words = [], [], 0
+    for piece, words in pieces:
+        if current and current_words + words > max_words:
+            sections.append(current)
+            current, current_words = [], 0
+        current.append(piece)
+        current_words += words
+    if current:
+        sections.append(current)
+    return sections
+
+
+def split_sections(content, max_words):
+    """Dzieli materiał na sekcje po ~`max_words` słów, nie tnąc zdań."""
+    if text_analytics.count_words(content, stop_after=max_words + 1) <= max_words:
+        return [content]
+
+    pieces = []
+    for paragraph in _PARAGRAPH_RE.split(content):
+        words = text_analytics.count_words(paragraph)
+        if not words:
+            continue
+        if words <= max_words:
+            pieces.append((paragraph.strip(), words))
+            continue
+        sentences = [(s, text_analytics.count_words(s)) for s in _SENTENCE_SPLIT_RE.split(paragraph) if s.strip()]
+        pieces.extend((" ".join(chunk), sum(text_analytics.count_words(s) for s in chunk))
+                      for chunk in _pack(sentences, max_words))
+
+    return ["\n\n".join(section) for section in _pack(pieces, max_words)]
+
+
+def allocate(total, weights):
+    """Rozdziela `total` proporcjonalnie do wag (metoda największych reszt)."""
+    weight_sum = sum(weights)
+    if total <= 0 or weight_sum <= 0:
+        return [0] * len(weights)
+
+    exact = [total * weight / weight_sum for weight in weights]
+    counts = [math.floor(value) for value in exact]
+    by_remainder = sorted(range(len(weights)), key=lambda i: exact[i] - counts[i], reverse=True)
+    for i in by_remainder[:total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def normalize_question(question):
+    """Zwraca pytanie w kształcie z promptu albo None, jeśli nie da się go użyć."""
+    if not isinstance(question, dict):
+        return None
+
+    question_type = question.get('question_type')
+    text = str(question.get('text') or '').strip()
+    correct_answer = str(question.get('correct_answer') or '').strip()
+    if question_type not in ('open', 'choice') or not text or not correct_answer:
+        return None
+
+    normalized = {'question_type': question_type, 'text': text, 'correct_answer': correct_answer}
+
+    if question_type == 'open':
+        normalized.update({key: None for key in OPTION_KEYS})
+        return normalized
+
+    options = [str(question.get(key) or '').strip() for key in OPTION_KEYS]
+    if not all(options) or correct_answer not in options:
+        return None
+    normalized.update(dict(zip(OPTION_KEYS, options)))
+    return normalized
+
+
+def _signature(text):
+    return frozenset(word.casefold() for word in text_analytics.iter_clean_words(text))
+
+
+def _is_duplicate(signature, seen):
+    for other in seen:
+        union = signature | other
+        if union and len(signature & other) / len(union) >= DUPLICATE_SIMILARITY:
+            return True
+    return False
+
+
+def merge_questions(questions, open_count, choice_count):
+    """
+    Scala pytania (w kolejności podania): bez niepoprawnych i prawie-duplikatów
+    (podobieństwo Jaccarda słów treści >= 0.8), najwyżej `open_count` otwartych
+    i `choice_count` zamkniętych - najpierw otwarte, potem zamknięte.
+    """
+    limits = {'open': open_count, 'choice': choice_count}
+    picked = {'open': [], 'choice': []}
+    seen = []
+
+    for question in questions:
+        question = normalize_question(question)
+        if question is None:
+            continue
+
+        bucket = picked[question['question_type']]
+        if len(bucket) >= limits[question['question_type']]:
+            continue
+
+        signature = _signature(question['text'])
+        if _is_duplicate(signature, seen):
+            continue
+
+        seen.append(signature)
+        bucket.append(question)
+
+    return picked['open'] + picked['choice']
+
+
+def missing_counts(questions, open_count, choice_count):
+    opens = sum(1 for q in questions if q['question_type'] == 'open')
+    choices = len(questions) - opens
+    return max(open_count - opens, 0), max(choice_count - choices, 0)
@@ -0,0 +1,410 @@
+import base64
+import binascii
+import itertools
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from ..models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 30
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_RADIUS = 50
+
+LEADERBOARD_FIELDS = (
+    'id', 'username', 'total_ranking_points',
+    'average_wpm', 'average_accuracy', 'ranking_exercises_completed',
+)
+
+
+class _Node:
+    __slots__ = ('key', 'priority', 'size', 'left', 'right')
+
+    def __init__(self, key):
+        self.key = key
+        self.priority = random.random()
+        self.size = 1
+        self.left = None
+        self.right = None
+
+
+def _size(node):
+    return node.size if node is not None else 0
+
+
+def _resize(node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+
+
+def _split(node, key):
+    """Dzieli drzewo na klucze < key i >= key."""
+    if node is None:
+        return None, None
+    if node.key < key:
+        left, right = _split(node.right, key)
+        node.right = left
+        _resize(node)
+        return node, right
+    left, right = _split(node.left, key)
+    node.left = right
+    _resize(node)
+    return left, node
+
+
+def _merge(left, right):
+    """Łączy drzewa, gdy wszystkie klucze `left` są mniejsze od kluczy `right`."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _resize(left)
+        return left
+    right.left = _merge(left, right.left)
+    _resize(right)
+    return right
+
+
+class _OrderedKeys:
+    """
+    Posortowany zbiór kluczy z dostępem po pozycji: drzewo treap z rozmiarami
+    poddrzew. Wstawienie, usunięcie, pozycja klucza i klucz na pozycji kosztują
+    O(log n) (oczekiwanie), zamiast O(n) przesuwania listy.
+    """
+
+    def __init__(self, sorted_keys=()):
+        self._root = self._build(sorted_keys)
+
+    @staticmethod
+    def _build(sorted_keys):
+        """Drzewo z posortowanych kluczy w O(n) (prawa krawędź na stosie)."""
+        spine = []
+        for key in sorted_keys:
+            node = _Node(key)
+            last = None
+            while spine and spine[-1].priority < node.priority:
+                last = spine.pop()
+            node.left = last
+            if spine:
+                spine[-1].right = node
+            spine.append(node)
+        root = spine[0] if spine else None
+
+        # Rozmiary poddrzew po zbudowaniu: przejście post-order bez rekurencji.
+        pending, order = [root] if root else [], []
+        while pending:
+            node = pending.pop()
+            order.append(node)
+            pending.extend(child for child in (node.left, node.right) if child is not None)
+        for node in reversed(order):
+            _resize(node)
+        return root
+
+    def __len__(self):
+        return _size(self._root)
+
+    def add(self, key):
+        left, right = _split(self._root, key)
+        self._root = _merge(_merge(left, _Node(key)), right)
+
+    def discard(self, key):
+        left, rest = _split(self._root, key)
+        middle, right = _split(rest, (key[0], key[1] + 1))
+        self._root = _merge(left, right)
+        return middle is not None
+
+    def count_less(self, key):
+        """Liczba kluczy mniejszych od `key` (= pozycja `key` po wstawieniu)."""
+        count, node = 0, self._root
+        while node is not None:
+            if node.key < key:
+                count += _size(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return count
+
+    def iter_from(self, position):
+        """Klucze od podanej pozycji, rosnąco."""
+        stack, node = [], self._root
+        while node is not None:
+            left_size = _size(node.left)
+            if position < left_size:
+                stack.append(node)
+                node = node.left
+            elif position == left_size:
+                stack.append(node)
+                break
+            else:
+                position -= left_size + 1
+                node = node.right
+
+        while stack:
+            node = stack.pop()
+            yield node.key
+            child = node.right
+            while child is not None:
+                stack.append(child)
+                child = child.left
+
+
+class RankingIndex:
+    """
+    Posortowany indeks rankingu trzymany w pamięci procesu.
+
+    Klucze mają postać (-punkty, user_id), więc indeks jest posortowany malejąco
+    po punktach. Ranga użytkownika to liczba osób z WIĘKSZĄ liczbą punktów + 1
+    (tak samo jak Rank() w SQL - remisy dzielą miejsce).
+
+    Indeks jest aktualizowany przyrostowo po każdej zmianie punktów w TYM procesie,
+    a co `ttl` sekund przeładowywany z bazy. Zmiany z innych workerów gunicorna
+    (i z `run_workers`) widać więc z opóźnieniem do `ttl` sekund. Rangi i punkty
+    zwracane razem (strona rankingu, okno around=me) pochodzą z jednego stanu
+    indeksu, więc zawsze są ze sobą zgodne, nawet jeśli baza jest już dalej.
+    """
+
+    def __init__(self, ttl=None):
+        self._ttl = ttl
+        self._lock = threading.RLock()
+        self._keys = _OrderedKeys()
+        self._points = {}
+        self._loaded_at = None
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, 'RANKING_INDEX_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+
+    def _ensure_loaded(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return
+
+        rows = CustomUser.objects.filter(
+            total_ranking_points__gt=0
+        ).values_list('id', 'total_ranking_points')
+
+        points = dict(rows)
+        self._points = points
+        self._keys = _OrderedKeys(sorted((-p, user_id) for user_id, p in points.items()))
+        self._loaded_at = time.monotonic()
+        logger.debug(f"Przeładowano indeks rankingu ({len(points)} użytkowników).")
+
+    def _rank_for_points(self, points):
+        return self._keys.count_less((-points,)) + 1
+
+    def _ranked_from(self, position):
+        """Wpisy (rank, user_id, punkty) od podanej pozycji; remisy dzielą rangę."""
+        previous = None
+        for offset, (neg_points, user_id) in enumerate(self._keys.iter_from(position), start=position):
+            if previous is not None and previous[2] == -neg_points:
+                rank = previous[0]
+            elif previous is None:
+                rank = self._rank_for_points(-neg_points)
+            else:
+                rank = offset + 1
+            previous = (rank, user_id, -neg_points)
+            yield previous
+
+    def invalidate(self):
+        """Wymusza przeładowanie indeksu z bazy przy następnym odczycie."""
+        with self._lock:
+            self._loaded_at = None
+
+    def update(self, user_id, points):
+        """
+        Przyrostowo aktualizuje pozycję użytkownika.
+        Użytkownicy z 0 punktów nie biorą udziału w rankingu.
+        """
+        with self._lock:
+            if self._loaded_at is None:
+                return
+
+            old_points = self._points.pop(user_id, None)
+            if old_points is not None:
+                self._keys.discard((-old_points, user_id))
+
+            if points > 0:
+                self._points[user_id] = points
+                self._keys.add((-points, user_id))
+
+    def rank_of(self, user_id):
+        """Zwraca rangę użytkownika lub None, jeśli nie ma go w rankingu."""
+        with self._lock:
+            self._ensure_loaded()
+            points = self._points.get(user_id)
+            if points is None:
+                return None
+            return self._rank_for_points(points)
+
+    def rank_for_points(self, points):
+        """Ranga, jaką miałby wynik o podanej liczbie punktów."""
+        with self._lock:
+            self._ensure_loaded()
+            return self._rank_for_points(points)
+
+    def around(self, user_id, radius):
+        """
+        Zwraca `radius` sąsiadów powyżej i poniżej użytkownika (razem z nim)
+        jako listę (rank, user_id, punkty). Pusta lista, jeśli nie jest w rankingu.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            points = self._points.get(user_id)
+            if points is None:
+                return []
+            position = self._keys.count_less((-points, user_id))
+            start = max(position - radius, 0)
+            return list(itertools.islice(self._ranked_from(start), position + radius + 1 - start))
+
+    def page(self, after=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        Do `limit` wpisów (rank, user_id, punkty) za kluczem `after` = (punkty, user_id)
+        ostatniego wpisu poprzedniej strony (None - od początku).
+        """
+        with self._lock:
+            self._ensure_loaded()
+            position = 0
+            if after is not None:
+                last_points, last_id = after
+                position = self._keys.count_less((-last_points, last_id + 1))
+            return list(itertools.islice(self._ranked_from(position), limit))
+
+    def top(self, limit=None):
+        """
+        Zwraca listę krotek (rank, user_id, punkty) posortowaną po randze.
+        `limit` obcina listę do podanej RANGI (przy remisie może być więcej wpisów).
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if limit is None:
+                return list(self._ranked_from(0))
+            return list(itertools.takewhile(lambda entry: entry[0] <= limit, self._ranked_from(0)))
+
+    def rank_subset(self, user_ids):
+        """
+        Ranking ograniczony do podanego zbioru użytkowników (np. znajomych).
+        Rangi są liczone tylko w obrębie tego zbioru.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            keys = sorted(
+                (-self._points[user_id], user_id)
+                for user_id in set(user_ids)
+                if user_id in self._points
+            )
+
+        result = []
+        for position, (neg_points, user_id) in enumerate(keys):
+            if result and result[-1][2] == -neg_points:
+                rank = result[-1][0]
+            else:
+                rank = position + 1
+            result.append((rank, user_id, -neg_points))
+        return result
+
+
+ranking_index = RankingIndex()
+
+
+def record_points(user: CustomUser):
+    """Wywoływane po każdej zmianie `total_ranking_points` użytkownika."""
+    ranking_index.update(user.id, user.total_ranking_points)
+
+
+def get_user_rank(user: CustomUser):
+    return ranking_index.rank_of(user.id)
+
+
+def get_top_ranked(limit=None):
+    """
+    Zwraca listę (rank, CustomUser) dla czołówki rankingu.
+    Dane użytkowników są pobierane jednym zapytaniem (in_bulk).
+    """
+    entries = ranking_index.top(limit)
+    users = CustomUser.objects.in_bulk([user_id for _, user_id, _ in entries])
+    return [(rank, users[user_id]) for rank, user_id, _ in entries if user_id in users]
+
+
+def get_ranked_subset(user_ids):
+    """Jak get_top_ranked, ale dla wybranego zbioru użytkowników."""
+    entries = ranking_index.rank_subset(user_ids)
+    users = CustomUser.objects.in_bulk([user_id for _, user_id, _ in entries])
+    return [(rank, users[user_id]) for rank, user_id, _ in entries if user_id in users]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(points, user_id):
+    raw = f"{points}:{user_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        points, user_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        return int(points), int(user_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def _leaderboard_row(values, rank):
+    return {
+        'id': values['id'],
+        'rank': rank,
+        'username': values['username'],
+        'total_points': values['total_ranking_points'],
+        'average_wpm': round(values['average_wpm']) if values['average_wpm'] else 0,
+        'average_accuracy': round(values['average_accuracy'], 1) if values['average_accuracy'] else 0,
+        'exercises_completed': values['ranking_exercises_completed'],
+    }
+
+
+def _leaderboard_rows(entries):
+    """
+    Wiersze rankingu dla wpisów indeksu (rank, user_id, punkty), w ich kolejności.
+    Punkty pochodzą z tego samego stanu indeksu co rangi; z bazy (values(), jedno
+    zapytanie) czytamy tylko nazwę i średnie. Usunięci w międzyczasie są pomijani.
+    """
+    values = {row['id']: row for row in CustomUser.objects.filter(
+        id__in=[user_id for _, user_id, _ in entries]
+    ).values(*LEADERBOARD_FIELDS)}
+    return [
+        _leaderboard_row({**values[user_id], 'total_ranking_points': points}, rank)
+        for rank, user_id, points in entries
+        if user_id in values
+    ]
+
+
+def get_leaderboard_page(cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Strona rankingu stronicowana kluczem (total_ranking_points DESC, id ASC),
+    czytana z indeksu w pamięci - rangi i punkty na stronie są ze sobą zgodne.
+
+    Zwraca (lista wierszy, kursor następnej strony lub None).
+    """
+    after = decode_cursor(cursor) if cursor else None
+    entries = ranking_index.page(after, page_size + 1)
+
+    next_cursor = None
+    if len(entries) > page_size:
+        entries = entries[:page_size]
+        _, last_id, last_points = entries[-1]
+        next_cursor = encode_cursor(last_points, last_id)
+
+    return _leaderboard_rows(entries), next_cursor
+
+
+def get_leaderboard_around(user: CustomUser, radius):
+    """Okno rankingu: `radius` osób nad i pod użytkownikiem."""
+    return _leaderboard_rows(ranking_index.around(user.id, radius))
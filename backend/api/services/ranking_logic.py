@@ -1,6 +1,7 @@
 from django.utils import timezone
+from django.db.models import Count, Q
 from datetime import timedelta
-from ..models import UserProgress, DailyChallenge
+from ..models import UserProgress
 from ..services.challenge_service import get_today_challenge 
 
 def _calculate_base_ranking_points(progress: UserProgress) -> int:
@@ -30,35 +31,73 @@ def _can_resubmit_for_ranking(last_ranked_attempt: UserProgress) -> bool:
     one_month_ago = timezone.now() - timedelta(days=30)
     return last_ranked_attempt.completed_at < one_month_ago
 
-def determine_ranking_eligibility(progress: UserProgress):
-    user = progress.user
+def get_last_ranked_attempt_queryset(user, exercise):
+    """Ostatnie próby liczone do rankingu (indeks progress_ranked_attempt_idx)."""
+    return UserProgress.objects.filter(
+        user=user,
+        exercise=exercise,
+        counted_for_ranking=True
+    ).order_by('-completed_at')
+
+def get_daily_completion_queryset(user, exercise, since):
+    """Zaliczenia wyzwania dnia od podanej chwili (indeks progress_daily_done_idx)."""
+    return UserProgress.objects.filter(
+        user=user,
+        exercise=exercise,
+        completed_daily_challenge=True,
+        completed_at__gte=since
+    )
+
+class PriorAttemptFacts:
+    """
+    Wszystko, co ścieżka zgłoszenia musi wiedzieć o wcześniejszych próbach
+    użytkownika dla danego ćwiczenia. Ładowane raz na zgłoszenie.
+    """
+    def __init__(self, attempt_count, last_ranked, completed_daily_today):
+        self.attempt_count = attempt_count
+        self.last_ranked = last_ranked
+        self.completed_daily_today = completed_daily_today
+
+def load_prior_attempt_facts(user, exercise) -> PriorAttemptFacts:
+    """Dwa zapytania: agregat po historii ćwiczenia + ostatnia próba rankingowa."""
+    today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    counts = UserProgress.objects.filter(user=user, exercise=exercise).aggregate(
+        attempt_count=Count('id'),
+        daily_done=Count('id', filter=Q(completed_daily_challenge=True, completed_at__gte=today_start)),
+    )
+    last_ranked = get_last_ranked_attempt_queryset(user, exercise).first()
+
+    return PriorAttemptFacts(
+        attempt_count=counts['attempt_count'],
+        last_ranked=last_ranked,
+        completed_daily_today=counts['daily_done'] > 0,
+    )
+
+def determine_ranking_eligibility(progress: UserProgress, facts: PriorAttemptFacts = None):
+    """
+    Ustawia counted_for_ranking / attempt_number na obiekcie 'progress'.
+    Zwraca starą próbę rankingową do dezaktywacji (lub None).
+    """
     exercise = progress.exercise
 
-    today = timezone.now().date()
-    today_challenge = DailyChallenge.objects.filter(date=today).first()
-    
-    is_today_challenge = (today_challenge and today_challenge.exercise.id == exercise.id)
+    if facts is None:
+        facts = load_prior_attempt_facts(progress.user, exercise)
 
-    if is_today_challenge:
-        already_completed_today = UserProgress.objects.filter(
-            user=user,
-            exercise=exercise,
-            completed_daily_challenge=True,
-            completed_at__date=today
-        ).exists()
+    progress.attempt_number = facts.attempt_count + 1
 
-        if not already_completed_today:
-            progress.counted_for_ranking = True
-            progress.completed_daily_challenge = True
-            return None 
+    today_challenge = get_today_challenge()
+    
+    is_today_challenge = (today_challenge and today_challenge.id == exercise.id)
+
+    if is_today_challenge and not facts.completed_daily_today:
+        progress.counted_for_ranking = True
+        progress.completed_daily_challenge = True
+        return None 
 
     one_month_ago = timezone.now() - timedelta(days=30)
     
-    last_ranked = UserProgress.objects.filter(
-        user=user,
-        exercise=exercise,
-        counted_for_ranking=True
-    ).order_by('-completed_at').first()
+    last_ranked = facts.last_ranked
 
     if last_ranked:
         if last_ranked.completed_at >= one_month_ago:
@@ -0,0 +1,251 @@
+"""
+Limiter zapytań do API modelu AI współdzielony między procesami.
+
+Stan (kubełek żetonów, zajęte sloty, oczekujący, metryki) leży w osobnym pliku
+SQLite, a każda zmiana odbywa się w transakcji BEGIN IMMEDIATE - więc wszystkie
+workery gunicorna i `run_workers` korzystają z jednego limitu.
+
+- rpm - stałe tempo uzupełniania żetonów (zapytań na minutę),
+- burst - pojemność kubełka (ile zapytań może pójść naraz po przestoju),
+- concurrency - maksymalna liczba równoległych wywołań.
+
+Slot ma termin ważności (lease), więc proces, który padł w trakcie wywołania,
+nie blokuje limitu na zawsze.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RPM = 15
+DEFAULT_BURST = 3
+DEFAULT_CONCURRENCY = 2
+DEFAULT_TIMEOUT_SECONDS = 120
+LEASE_SECONDS = 300
+MAX_POLL_SECONDS = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bucket (
+    name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    id TEXT PRIMARY KEY, name TEXT NOT NULL, expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS waiters (
+    id TEXT PRIMARY KEY, name TEXT NOT NULL, expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    name TEXT PRIMARY KEY,
+    acquired INTEGER NOT NULL DEFAULT 0,
+    timeouts INTEGER NOT NULL DEFAULT 0,
+    total_wait REAL NOT NULL DEFAULT 0,
+    max_wait REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+class RateLimitTimeout(TimeoutError):
+    """Nie udało się dostać slotu w zadanym czasie."""
+
+
+class RateLimiter:
+
+    def __init__(self, name, path, rpm, burst, concurrency, lease_seconds=LEASE_SECONDS):
+        self.name = name
+        self.path = str(path)
+        self.rpm = rpm
+        self.burst = max(burst, 1)
+        self.concurrency = max(concurrency, 1)
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+
+    @property
+    def refill_per_second(self):
+        return self.rpm / 60.0
+
+    def _connection(self):
+        # Osobne połączenie na wątek i proces (połączeń SQLite nie współdzielimy po fork).
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def _refill(self, conn, now):
+        row = conn.execute("SELECT tokens, updated_at FROM bucket WHERE name = ?", (self.name,)).fetchone()
+        if row is None:
+            tokens = float(self.burst)
+        else:
+            tokens = min(float(self.burst), row[0] + max(now - row[1], 0) * self.refill_per_second)
+        conn.execute(
+            "INSERT INTO bucket (name, tokens, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+            (self.name, tokens, now),
+        )
+        return tokens
+
+    def _try_take(self, lease_id, now):
+        """
+        Jedna próba: zwraca 0, jeśli slot przyznano, albo sugerowany czas
+        oczekiwania do następnej próby.
+        """
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+            tokens = self._refill(conn, now)
+            in_flight = conn.execute("SELECT COUNT(*) FROM leases WHERE name = ?", (self.name,)).fetchone()[0]
+
+            if in_flight >= self.concurrency:
+                return MAX_POLL_SECONDS
+            if tokens < 1:
+                return (1 - tokens) / self.refill_per_second if self.refill_per_second else MAX_POLL_SECONDS
+
+            conn.execute("UPDATE bucket SET tokens = tokens - 1 WHERE name = ?", (self.name,))
+            conn.execute(
+                "INSERT INTO leases (id, name, expires_at) VALUES (?, ?, ?)",
+                (lease_id, self.name, now + self.lease_seconds),
+            )
+            return 0
+
+    def _set_waiting(self, waiter_id, waiting, expires_at=None):
+        with self._transaction() as conn:
+            if waiting:
+                conn.execute(
+                    "INSERT INTO waiters (id, name, expires_at) VALUES (?, ?, ?)",
+                    (waiter_id, self.name, expires_at),
+                )
+            else:
+                conn.execute("DELETE FROM waiters WHERE id = ?", (waiter_id,))
+
+    def _record(self, waited, timed_out=False):
+        with self._transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO metrics (name) VALUES (?)", (self.name,))
+            if timed_out:
+                conn.execute("UPDATE metrics SET timeouts = timeouts + 1 WHERE name = ?", (self.name,))
+            else:
+                conn.execute(
+                    "UPDATE metrics SET acquired = acquired + 1, total_wait = total_wait + ?, "
+                    "max_wait = MAX(max_wait, ?) WHERE name = ?",
+                    (waited, waited, self.name),
+                )
+
+    def acquire(self, timeout=DEFAULT_TIMEOUT_SECONDS):
+        """
+        Czeka na żeton i wolny slot współbieżności; zwraca id slotu do release().
+        Rzuca RateLimitTimeout po `timeout` sekundach.
+        """
+        lease_id = uuid.uuid4().hex
+        started = time.time()
+        deadline = started + timeout
+
+        delay = self._try_take(lease_id, started)
+        if delay == 0:
+            self._record(0.0)
+            return lease_id
+
+        self._set_waiting(lease_id, True, expires_at=deadline)
+        try:
+            while True:
+                now = time.time()
+                if now >= deadline:
+                    self._record(now - started, timed_out=True)
+                    raise RateLimitTimeout(f"Limiter '{self.name}': brak wolnego slotu po {timeout}s.")
+
+                time.sleep(min(delay, MAX_POLL_SECONDS, deadline - now))
+
+                now = time.time()
+                delay = self._try_take(lease_id, now)
+                if delay == 0:
+                    self._record(now - started)
+                    return lease_id
+        finally:
+            self._set_waiting(lease_id, False)
+
+    def release(self, lease_id):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+
+    @contextmanager
+    def slot(self, timeout=DEFAULT_TIMEOUT_SECONDS):
+        lease_id = self.acquire(timeout)
+        try:
+            yield
+        finally:
+            self.release(lease_id)
+
+    def call(self, func, *args, **kwargs):
+        """Wywołuje `func` w ramach limitu."""
+        with self.slot():
+            return func(*args, **kwargs)
+
+    def metrics(self):
+        """Stan limitu i liczniki - wspólne dla wszystkich procesów."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+            conn.execute("DELETE FROM waiters WHERE expires_at < ?", (now,))
+            tokens = self._refill(conn, now)
+            in_flight = conn.execute("SELECT COUNT(*) FROM leases WHERE name = ?", (self.name,)).fetchone()[0]
+            queue_depth = conn.execute("SELECT COUNT(*) FROM waiters WHERE name = ?", (self.name,)).fetchone()[0]
+            row = conn.execute(
+                "SELECT acquired, timeouts, total_wait, max_wait FROM metrics WHERE name = ?", (self.name,)
+            ).fetchone() or (0, 0, 0.0, 0.0)
+
+        acquired, timeouts, total_wait, max_wait = row
+        return {
+            'rpm': self.rpm,
+            'burst': self.burst,
+            'concurrency': self.concurrency,
+            'tokens_available': round(tokens, 2),
+            'in_flight': in_flight,
+            'queue_depth': queue_depth,
+            'acquired': acquired,
+            'timeouts': timeouts,
+            'avg_wait_ms': round(1000 * total_wait / acquired, 1) if acquired else 0.0,
+            'max_wait_ms': round(1000 * max_wait, 1),
+        }
+
+    def reset(self):
+        """Czyści stan i metryki (testy, zmiana konfiguracji)."""
+        with self._transaction() as conn:
+            for table in ('bucket', 'leases', 'waiters', 'metrics'):
+                conn.execute(f"DELETE FROM {table} WHERE name = ?", (self.name,))
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_ai_limiter():
+    """Limiter wywołań modelu AI skonfigurowany z settings (jeden obiekt na proces i konfigurację)."""
+    config = (
+        str(getattr(settings, 'AI_RATE_LIMIT_DB', settings.BASE_DIR / '.ai_rate_limit.sqlite3')),
+        getattr(settings, 'AI_RATE_LIMIT_RPM', DEFAULT_RPM),
+        getattr(settings, 'AI_RATE_LIMIT_BURST', DEFAULT_BURST),
+        getattr(settings, 'AI_RATE_LIMIT_CONCURRENCY', DEFAULT_CONCURRENCY),
+    )
+    with _limiters_lock:
+        if config not in _limiters:
+            path, rpm, burst, concurrency = config
+            _limiters[config] = RateLimiter('ai', path, rpm=rpm, burst=burst, concurrency=concurrency)
+        return _limiters[config]
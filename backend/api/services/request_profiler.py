@@ -0,0 +1,139 @@
+"""
+Profilowanie żądań HTTP (api/middleware.py, `RequestProfilingMiddleware`).
+
+Dla wylosowanych żądań (REQUEST_PROFILING_SAMPLE_RATE) mierzymy czas całkowity,
+liczbę i czas zapytań SQL oraz nazwę widoku. Wynik trafia do nagłówka
+`Server-Timing` (tylko przy DEBUG i dla obsługi) i do pamięci procesu:
+- agregaty per widok (liczba, suma i maksimum czasu, suma zapytań),
+- REQUEST_PROFILING_SLOWEST_PER_VIEW najwolniejszych żądań per widok (kopiec,
+  więc pamięć jest ograniczona niezależnie od ruchu).
+
+Liczba widoków jest ograniczona MAX_VIEWS - nierozpoznane adresy (404) trafiają
+do jednego wpisu. Dane są per proces (jak liczniki wikipedia_cache).
+"""
+import heapq
+import itertools
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+DEFAULT_SAMPLE_RATE = 0.0
+DEFAULT_SLOWEST_PER_VIEW = 20
+MAX_VIEWS = 200
+UNRESOLVED_VIEW = '<nierozpoznany>'
+OTHER_VIEWS = '<inne>'
+
+
+def sample_rate():
+    return getattr(settings, 'REQUEST_PROFILING_SAMPLE_RATE', DEFAULT_SAMPLE_RATE)
+
+
+class QueryTimer:
+    """execute_wrapper liczący zapytania i ich łączny czas."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+def server_timing(total_ms, sql_ms, queries):
+    """Wartość nagłówka Server-Timing: czas całkowity, SQL i reszta aplikacji."""
+    return (
+        f'total;dur={total_ms:.1f}, '
+        f'db;dur={sql_ms:.1f};desc="SQL ({queries})", '
+        f'app;dur={max(total_ms - sql_ms, 0):.1f}'
+    )
+
+
+class _ViewProfile:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.sql_ms = 0.0
+        self.queries = 0
+        self.slowest = []  # kopiec min (total_ms, kolejny numer, wpis)
+
+
+class RequestProfileStore:
+    """Bezpieczny wątkowo magazyn profili żądań w pamięci procesu."""
+
+    def __init__(self, slowest_per_view=None, max_views=MAX_VIEWS):
+        self._slowest_per_view = slowest_per_view
+        self.max_views = max_views
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self.reset()
+
+    @property
+    def slowest_per_view(self):
+        if self._slowest_per_view is not None:
+            return self._slowest_per_view
+        return getattr(settings, 'REQUEST_PROFILING_SLOWEST_PER_VIEW', DEFAULT_SLOWEST_PER_VIEW)
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+    def record(self, view_name, method, path, status_code, total_ms, sql_ms, queries):
+        entry = {
+            'method': method,
+            'path': path,
+            'status': status_code,
+            'total_ms': round(total_ms, 3),
+            'sql_ms': round(sql_ms, 3),
+            'queries': queries,
+            'at': timezone.now().isoformat(),
+        }
+        limit = self.slowest_per_view
+        with self._lock:
+            profile = self._views.get(view_name)
+            if profile is None:
+                if len(self._views) >= self.max_views:
+                    view_name = OTHER_VIEWS
+                profile = self._views.setdefault(view_name, _ViewProfile())
+
+            profile.count += 1
+            profile.total_ms += total_ms
+            profile.max_ms = max(profile.max_ms, total_ms)
+            profile.sql_ms += sql_ms
+            profile.queries += queries
+
+            item = (total_ms, next(self._sequence), entry)
+            if len(profile.slowest) < limit:
+                heapq.heappush(profile.slowest, item)
+            elif limit and total_ms > profile.slowest[0][0]:
+                heapq.heapreplace(profile.slowest, item)
+
+    def snapshot(self):
+        """Widoki od największego łącznego czasu; najwolniejsze żądania malejąco."""
+        with self._lock:
+            views = {
+                name: {
+                    'count': profile.count,
+                    'avg_ms': round(profile.total_ms / profile.count, 3),
+                    'max_ms': round(profile.max_ms, 3),
+                    'avg_sql_ms': round(profile.sql_ms / profile.count, 3),
+                    'avg_queries': round(profile.queries / profile.count, 2),
+                    'total_ms': round(profile.total_ms, 3),
+                    'slowest': [entry for _, _, entry in sorted(profile.slowest, key=lambda item: item[:2], reverse=True)],
+                }
+                for name, profile in self._views.items()
+            }
+        return {
+            'sample_rate': sample_rate(),
+            'views': dict(sorted(views.items(), key=lambda item: item[1]['total_ms'], reverse=True)),
+        }
+
+
+profile_store = RequestProfileStore()
@@ -1,41 +1,111 @@
 from ..models import CustomUser, UserProgress
-from django.db.models import Sum, Avg, Count
+from ..wpm_milestones import MIN_PASS_ACCURACY
+from . import ranking_index
+from django.db.models import Sum, Count, F, FloatField, Case, When, Value
+from django.db.models.functions import Cast, Round
 
-def update_user_stats(user: CustomUser):
-    """ 
-    Przelicza i ZAPISUJE statystyki użytkownika.
-    Bierze pod uwagę TYLKO zaliczone próby (accuracy >= 60%).
+STATS_FIELDS = [
+    'total_ranking_points',
+    'ranking_exercises_completed',
+    'ranking_wpm_sum',
+    'ranking_accuracy_sum',
+    'average_wpm',
+    'average_accuracy',
+]
+
+
+def counts_towards_stats(progress: UserProgress) -> bool:
+    """Czy próba wchodzi do statystyk (zaliczona, rankingowa, liczona do rankingu)."""
+    return (
+        progress.counted_for_ranking
+        and progress.accuracy >= MIN_PASS_ACCURACY
+        and progress.exercise.is_ranked
+    )
+
+
+def _shifted_average(sum_field, delta, sign):
+    """Średnia po zmianie, liczona ze STARYCH wartości kolumn (jedno UPDATE)."""
+    return Case(
+        When(ranking_exercises_completed__gt=-sign, then=Round(
+            (Cast(F(sum_field), FloatField()) + delta) / (F('ranking_exercises_completed') + sign), 1
+        )),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _apply_delta(user: CustomUser, progress: UserProgress, sign: int):
+    CustomUser.objects.filter(pk=user.pk).update(
+        total_ranking_points=F('total_ranking_points') + sign * progress.ranking_points,
+        ranking_exercises_completed=F('ranking_exercises_completed') + sign,
+        ranking_wpm_sum=F('ranking_wpm_sum') + sign * progress.wpm,
+        ranking_accuracy_sum=F('ranking_accuracy_sum') + sign * progress.accuracy,
+        average_wpm=_shifted_average('ranking_wpm_sum', sign * progress.wpm, sign),
+        average_accuracy=_shifted_average('ranking_accuracy_sum', sign * progress.accuracy, sign),
+    )
+    user.refresh_from_db(fields=STATS_FIELDS)
+
+
+def record_attempt(user: CustomUser, progress: UserProgress) -> bool:
+    """
+    Dolicza próbę do sum bieżących użytkownika (atomowo, wyrażeniami F()).
+    Zwraca True, jeśli statystyki się zmieniły.
+    """
+    if not counts_towards_stats(progress):
+        return False
+    _apply_delta(user, progress, +1)
+    return True
+
+
+def revert_attempt(user: CustomUser, progress: UserProgress) -> bool:
     """
-    
+    Odejmuje próbę od sum (np. gdy stary wynik przestaje liczyć się do rankingu).
+    Przekazany obiekt musi mieć jeszcze stan SPRZED dezaktywacji.
+    """
+    if not counts_towards_stats(progress):
+        return False
+    _apply_delta(user, progress, -1)
+    return True
+
+
+def compute_user_stats(user: CustomUser) -> dict:
+    """Liczy statystyki od zera na podstawie całej historii (bez zapisu)."""
     successful_attempts = UserProgress.objects.filter(
         user=user,
-        exercise__is_ranked=True, 
-        accuracy__gte=60          
+        exercise__is_ranked=True,
+        counted_for_ranking=True,
+        accuracy__gte=MIN_PASS_ACCURACY
     )
-    
+
     stats = successful_attempts.aggregate(
         total_points=Sum('ranking_points'),
         count=Count('id'),
-        avg_wpm=Avg('wpm'),
-        avg_accuracy=Avg('accuracy')
+        sum_wpm=Sum('wpm'),
+        sum_accuracy=Sum('accuracy')
     )
-    
-    fields_to_update = [
-        'total_ranking_points', 
-        'ranking_exercises_completed', 
-        'average_wpm', 
-        'average_accuracy'
-    ]
-
-    if stats['count'] and stats['count'] > 0:
-        user.total_ranking_points = stats['total_points'] or 0
-        user.ranking_exercises_completed = stats['count']
-        user.average_wpm = round(stats['avg_wpm'], 1)
-        user.average_accuracy = round(stats['avg_accuracy'], 1)
-    else:
-        user.total_ranking_points = 0
-        user.ranking_exercises_completed = 0
-        user.average_wpm = 0
-        user.average_accuracy = 0
-        
-    user.save(update_fields=fields_to_update)
\ No newline at end of file
+
+    count = stats['count'] or 0
+    if count == 0:
+        return dict.fromkeys(STATS_FIELDS, 0)
+
+    return {
+        'total_ranking_points': stats['total_points'] or 0,
+        'ranking_exercises_completed': count,
+        'ranking_wpm_sum': stats['sum_wpm'] or 0,
+        'ranking_accuracy_sum': stats['sum_accuracy'] or 0,
+        'average_wpm': round(stats['sum_wpm'] / count, 1),
+        'average_accuracy': round(stats['sum_accuracy'] / count, 1),
+    }
+
+
+def update_user_stats(user: CustomUser):
+    """
+    Przelicza i ZAPISUJE statystyki użytkownika z pełnej historii.
+    Bierze pod uwagę TYLKO zaliczone próby (accuracy >= 60%).
+    Używane do naprawy/weryfikacji - ścieżka zgłoszeń korzysta z record_attempt().
+    """
+    for field, value in compute_user_stats(user).items():
+        setattr(user, field, value)
+
+    user.save(update_fields=STATS_FIELDS)
+    ranking_index.record_points(user)
@@ -2,12 +2,17 @@ from django.utils import timezone
 from datetime import timedelta
 from ..models import CustomUser
 
-def update_user_streak(user: CustomUser):
-    """Aktualizuje serię (streak) użytkownika"""
+STREAK_FIELDS = ['current_streak', 'max_streak', 'last_streak_date']
+
+def update_user_streak(user: CustomUser) -> bool:
+    """
+    Aktualizuje serię (streak) użytkownika (bez zapisu).
+    Zwraca True, jeśli seria się zmieniła i trzeba ją zapisać.
+    """
     today = timezone.now().date()
     
     if user.last_streak_date == today:
-        return 
+        return False
 
     if user.last_streak_date == (today - timedelta(days=1)):
         user.current_streak += 1
@@ -16,4 +21,4 @@ def update_user_streak(user: CustomUser):
 
     user.last_streak_date = today
     user.max_streak = max(user.current_streak, user.max_streak)
-    
\ No newline at end of file
+    return True
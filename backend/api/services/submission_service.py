@@ -1,14 +1,13 @@
 import traceback
+from django.db import transaction
 from django.utils import timezone
-from ..models import UserProgress, ReadingExercise
-from . import ranking_logic, wpm_logic, streak_logic, achievement_logic, stats_logic
+from ..models import CustomUser, UserProgress, ReadingExercise
+from . import ranking_logic, streak_logic, stats_logic, achievement_logic, ranking_index, job_queue
 from .challenge_service import get_today_challenge
 
 class SubmissionResult:
-    def __init__(self, progress, new_achievements, new_wpm_limit):
+    def __init__(self, progress):
         self.progress = progress
-        self.new_achievements = new_achievements
-        self.new_wpm_limit = new_wpm_limit
 
     def to_dict(self):
         return {
@@ -17,82 +16,87 @@ class SubmissionResult:
             "ranking_points": self.progress.ranking_points,
             "counted_for_ranking": self.progress.counted_for_ranking,
             "completed_daily_challenge": self.progress.completed_daily_challenge,
-            "new_achievements": [a.title for a in self.new_achievements],
-            "new_wpm_limit": self.new_wpm_limit
         }
 
+def _enqueue_side_effects(user, progress, points_before):
+    jobs = []
+
+    if user.total_ranking_points != points_before:
+        transaction.on_commit(lambda: ranking_index.record_points(user))
+        jobs.append((
+            'ranking.overtake',
+            {'user_id': user.id, 'old_points': points_before, 'new_points': user.total_ranking_points},
+            f'ranking.overtake:{progress.id}',
+        ))
+
+    if achievement_logic.qualifies_for_achievements(progress):
+        jobs.append(('submission.achievements', {'progress_id': progress.id}, f'submission.achievements:{progress.id}'))
+
+    if progress.accuracy >= 60:
+        jobs.append(('submission.wpm_milestone', {'progress_id': progress.id}, f'submission.wpm_milestone:{progress.id}'))
+
+    job_queue.enqueue_many(jobs)
+
 def process_exercise_submission(user, exercise, reading_time_ms, accuracy):
     """
     Główna logika przetwarzania wyniku ćwiczenia.
+
+    Całość działa w jednej transakcji, z blokadą wiersza użytkownika
+    (select_for_update) - dwa równoległe zgłoszenia (np. podwójne kliknięcie)
+    wykonują się po kolei, więc drugie widzi już pierwszą próbę rankingową.
+    Stan wcześniejszych prób jest ładowany raz (ranking_logic.load_prior_attempt_facts).
+
+    Efekty uboczne (osiągnięcia, limit WPM, powiadomienia o awansie) trafiają
+    do kolejki zadań w tej samej transakcji i wykonują się po commicie.
     """
     try:
         minutes = reading_time_ms / 60000.0
         wpm = 0
         if minutes > 0.0001 and exercise.word_count > 0:
             wpm = int(exercise.word_count / minutes)
-        
-        today_challenge = get_today_challenge()
-        is_daily_attempt = (today_challenge and today_challenge.id == exercise.id)
-        daily_bonus_earned = False
-
-        progress = UserProgress(
-            user=user,
-            exercise=exercise,
-            wpm=wpm,
-            accuracy=accuracy,
-            completed_at=timezone.now()
-        )
-
-        old_attempt_to_deactivate = ranking_logic.determine_ranking_eligibility(progress)
-
-        if is_daily_attempt:
-            today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            
-            already_completed_with_success = UserProgress.objects.filter(
+
+        with transaction.atomic():
+            user.refresh_from_db(from_queryset=CustomUser.objects.select_for_update())
+            points_before = user.total_ranking_points
+
+            today_challenge = get_today_challenge()
+            is_daily_attempt = bool(today_challenge and today_challenge.id == exercise.id)
+
+            progress = UserProgress(
                 user=user,
                 exercise=exercise,
-                completed_daily_challenge=True, 
-                completed_at__gte=today_start
-            ).exists()
-
-            if not already_completed_with_success:
-                progress.counted_for_ranking = True
-                
-                if accuracy >= 60:
-                    progress.completed_daily_challenge = True
-                    daily_bonus_earned = True
-            else:
+                wpm=wpm,
+                accuracy=accuracy,
+                completed_at=timezone.now()
+            )
+
+            facts = ranking_logic.load_prior_attempt_facts(user, exercise)
+            old_attempt_to_deactivate = ranking_logic.determine_ranking_eligibility(progress, facts)
+
+            if is_daily_attempt and facts.completed_daily_today:
+                # Wyzwanie zaliczone już dziś - kolejne podejścia to tylko trening.
                 progress.counted_for_ranking = False
-                progress.completed_daily_challenge = False
 
-        if progress.counted_for_ranking:
+            # Bonus +50 za wyzwanie dnia dolicza wyłącznie calculate_final_points.
             ranking_logic.calculate_final_points(progress)
-            
-            if daily_bonus_earned:
-                progress.ranking_points += 50 
 
-        progress.save()
+            progress.save()
 
-        if old_attempt_to_deactivate and not is_daily_attempt:
-            old_attempt_to_deactivate.counted_for_ranking = False
-            old_attempt_to_deactivate.save()
+            stats_logic.record_attempt(user, progress)
 
-        streak_logic.update_user_streak(user)
-        
-        new_achievements = []
-        new_wpm_limit = None
+            if old_attempt_to_deactivate and not is_daily_attempt:
+                stats_logic.revert_attempt(user, old_attempt_to_deactivate)
+                UserProgress.objects.filter(pk=old_attempt_to_deactivate.pk).update(counted_for_ranking=False)
+                old_attempt_to_deactivate.counted_for_ranking = False
 
-        if accuracy >= 60:
-            if progress.counted_for_ranking or is_daily_attempt:
-                 stats_logic.update_user_stats(user)
+            if streak_logic.update_user_streak(user):
+                user.save(update_fields=streak_logic.STREAK_FIELDS)
 
-            new_achievements = achievement_logic.check_for_new_achievements(user, progress)
-            
-            new_wpm_limit = wpm_logic.check_and_update_wpm_milestone(user, progress)
+            _enqueue_side_effects(user, progress, points_before)
 
-        return SubmissionResult(progress, new_achievements, new_wpm_limit)
+        return SubmissionResult(progress)
 
     except Exception as e:
         print("BŁĄD KRYTYCZNY W SUBMISSION SERVICE:")
         traceback.print_exc()
-        raise e
\ No newline at end of file
+        raise e
@@ -0,0 +1,437 @@
+"""
+Deterministyczny generator dużego zbioru danych syntetycznych (`manage.py seed_scale`).
+
+Przy skali 1.0: 100 tys. użytkowników, 10 tys. ćwiczeń z pytaniami, ok. 2 mln
+prób (UserProgress), ok. 1 mln obserwacji i ok. 500 tys. powiadomień.
+Ten sam `seed` i `scale` dają te same dane (znaczniki czasu liczone są od
+północy dnia generowania).
+
+Rozkłady:
+- tempo czytania użytkownika - log-normalny wokół 250 WPM, pojedyncze próby
+  rozrzucone wokół tempa użytkownika,
+- trafność - z liczby poprawnych odpowiedzi na pytania ćwiczenia (jak w SubmitProgress),
+- liczba prób na użytkownika - log-normalna (długi ogon bardzo aktywnych),
+- popularność ćwiczeń i obserwowanych - rozkład Zipfa (stopień obserwacji z długim ogonem).
+
+Punkty i `counted_for_ranking` liczone są regułami z ranking_logic (ponowny
+wynik liczy się po 30 dniach, stary jest dezaktywowany). Wyzwania dnia nie są
+symulowane. Użytkownicy, ćwiczenia i pytania są wstawiane przez bulk_create
+w partiach, a tabele z milionami wierszy (próby, obserwacje, powiadomienia)
+przez executemany gotowych krotek (insert_rows). Nic nie przechodzi przez
+save() ani sygnały, dlatego na końcu zdenormalizowane pola CustomUser
+(statystyki rankingowe, serie, licznik nieprzeczytanych) są przeliczane zbiorczo.
+"""
+import logging
+import math
+import random
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+from types import SimpleNamespace
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from ..models import CustomUser, Friendship, Notification, Question, ReadingExercise, UserProgress
+from ..wpm_milestones import DEFAULT_WPM_LIMIT, MIN_PASS_ACCURACY, WPM_MILESTONES
+from . import ranking_index, ranking_logic, stats_logic, streak_logic
+
+logger = logging.getLogger(__name__)
+
+USERNAME_PREFIX = 'seed_'
+EXERCISE_TITLE_PREFIX = '[seed] '
+
+USERS_AT_SCALE_1 = 100_000
+EXERCISES_AT_SCALE_1 = 10_000
+ATTEMPTS_PER_USER = 20
+FOLLOWS_PER_USER = 10
+FOLLOW_NOTIFICATION_RATIO = 0.5
+HISTORY_DAYS = 365
+RANKED_RATIO = 0.6
+DAILY_CANDIDATE_RATIO = 0.1
+DEFAULT_BATCH_SIZE = 5000
+
+RESUBMIT_AFTER_SECONDS = 30 * 86400
+
+PROGRESS_FIELDS = (
+    'user', 'exercise', 'wpm', 'accuracy', 'completed_at',
+    'counted_for_ranking', 'attempt_number', 'ranking_points', 'completed_daily_challenge',
+)
+PROGRESS_COUNTED = PROGRESS_FIELDS.index('counted_for_ranking')
+FRIENDSHIP_FIELDS = ('follower', 'followed', 'created_at')
+NOTIFICATION_FIELDS = ('recipient', 'actor', 'verb', 'read', 'created_at', 'content_type', 'object_id')
+
+_WORDS = (
+    "czytanie tekst szybkość zrozumienie pamięć słowo zdanie akapit książka autor historia nauka "
+    "umysł oko wzrok uwaga skupienie trening ćwiczenie wynik tempo rytm metoda technika przegląd "
+    "rozdział temat pojęcie definicja przykład analiza wniosek badanie eksperyment teoria praktyka "
+    "język gramatyka znaczenie kontekst informacja wiedza źródło dokument artykuł raport notatka "
+    "miasto rzeka góra morze las pole droga dom szkoła uczeń nauczyciel lekcja zadanie odpowiedź "
+    "czas dzień noc rok wiek epoka król państwo wojna pokój prawo gospodarka handel przemysł energia "
+    "komórka organizm roślina zwierzę gatunek ewolucja środowisko klimat pogoda woda powietrze ziemia"
+).split()
+_FILLERS = "i w na z do że się jest był jak to oraz przez dla od po".split()
+
+
+class SeedDataExists(RuntimeError):
+    """W bazie są już dane z poprzedniego seedowania (użyj reset)."""
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Wyłącza auto_now_add na czas bulk_create, żeby zachować wygenerowane daty."""
+    previous = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in zip(fields, previous):
+            field.auto_now_add = value
+
+
+def _counts(scale):
+    users = max(int(USERS_AT_SCALE_1 * scale), 2)
+    exercises = max(int(EXERCISES_AT_SCALE_1 * scale), 1)
+    return users, exercises
+
+
+def _lognormal_with_mean(rng, mean, sigma):
+    return rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+
+
+def _zipf_cum_weights(n, exponent):
+    total, cumulative = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1 / rank ** exponent
+        cumulative.append(total)
+    return cumulative
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def insert_rows(model, field_names, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Wstawia partiami (executemany) krotki wartości gotowych do zapisu w bazie.
+
+    Dla tabel z milionami wierszy: bulk_create tworzy instancję modelu i przygotowuje
+    każde pole osobno, co przy SQLite kosztuje kilkukrotnie więcej niż samo wstawienie.
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    with connection.cursor() as cursor:
+        for chunk in _chunks(rows, batch_size):
+            cursor.executemany(sql, chunk)
+    return len(rows)
+
+
+class _Generator:
+    def __init__(self, scale, seed, batch_size, progress):
+        self.rng = random.Random(seed)
+        self.scale = scale
+        self.batch_size = batch_size
+        self.report = progress or logger.info
+        self.anchor = timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.min))
+        # Znaczniki czasu od razu bez strefy, w strefie połączenia - wtedy
+        # adapt_datetimefield_value nie przelicza strefy dla każdego wiersza.
+        self._db_anchor = timezone.make_naive(self.anchor, connection.timezone)
+        self.user_count, self.exercise_count = _counts(scale)
+
+    # --- użytkownicy ------------------------------------------------------
+
+    def create_users(self):
+        rng = self.rng
+        password = make_password(None)
+        users, self.skills = [], []
+        for i in range(self.user_count):
+            wpm = min(max(_lognormal_with_mean(rng, 260, 0.35), 80), 1400)
+            accuracy = rng.betavariate(8, 2)
+            self.skills.append((wpm, accuracy))
+            limit = next((m for m in sorted(WPM_MILESTONES) if m >= wpm * 1.1), max(WPM_MILESTONES))
+            users.append(CustomUser(
+                username=f'{USERNAME_PREFIX}{i:06d}',
+                email=f'{USERNAME_PREFIX}{i:06d}@seed.local',
+                password=password,
+                speed=int(wpm),
+                max_wpm_limit=max(limit, DEFAULT_WPM_LIMIT),
+                has_completed_calibration=True,
+                mode=rng.choice(('rsvp', 'highlight', 'chunking')),
+                date_joined=self.anchor - timedelta(days=rng.randint(0, HISTORY_DAYS)),
+            ))
+        CustomUser.objects.bulk_create(users, batch_size=self.batch_size)
+        self.user_ids = [user.pk for user in users]
+        self.report(f'Użytkownicy: {len(users)}')
+
+    # --- ćwiczenia i pytania ---------------------------------------------
+
+    def _text(self, words):
+        rng = self.rng
+        sentences, count = [], 0
+        while count < words:
+            length = rng.randint(6, 18)
+            body = rng.choices(_WORDS, k=length)
+            for position in range(1, length - 1, 4):
+                body[position] = rng.choice(_FILLERS)
+            sentences.append(" ".join(body).capitalize() + ".")
+            count += length
+        return " ".join(sentences)
+
+    def create_exercises(self):
+        rng = self.rng
+        exercises = []
+        for i in range(self.exercise_count):
+            words = int(min(max(_lognormal_with_mean(rng, 450, 0.5), 120), 2000))
+            exercise = ReadingExercise(
+                title=f'{EXERCISE_TITLE_PREFIX}Tekst {i:05d}',
+                text=self._text(words),
+                is_public=rng.random() < 0.9,
+                is_ranked=rng.random() < RANKED_RATIO,
+                created_at=self.anchor - timedelta(days=HISTORY_DAYS + rng.randint(0, 365)),
+            )
+            exercise.is_daily_candidate = exercise.is_ranked and rng.random() < DAILY_CANDIDATE_RATIO
+            exercise.refresh_text_stats()
+            exercises.append(exercise)
+
+        with explicit_timestamps(ReadingExercise._meta.get_field('created_at')):
+            ReadingExercise.objects.bulk_create(exercises, batch_size=self.batch_size)
+        self.exercises = exercises
+
+        questions = []
+        for exercise in exercises:
+            if not exercise.is_ranked:
+                continue
+            for n in range(exercise.get_recommended_questions()):
+                answer = rng.choice(_WORDS)
+                if n % 2:
+                    options = rng.sample([w for w in _WORDS if w != answer], 3) + [answer]
+                    rng.shuffle(options)
+                    questions.append(Question(
+                        exercise_id=exercise.pk, text=f'Które słowo pojawia się w tekście? ({n + 1})',
+                        question_type='choice', correct_answer=answer,
+                        option_1=options[0], option_2=options[1], option_3=options[2], option_4=options[3],
+                    ))
+                else:
+                    questions.append(Question(
+                        exercise_id=exercise.pk, text=f'Uzupełnij słowo z tekstu ({n + 1})',
+                        question_type='open', correct_answer=answer,
+                    ))
+        Question.objects.bulk_create(questions, batch_size=self.batch_size)
+        self.report(f'Ćwiczenia: {len(exercises)}, pytania: {len(questions)}')
+
+    # --- próby -----------------------------------------------------------
+
+    def _timestamp(self, seconds_ago):
+        return connection.ops.adapt_datetimefield_value(self._db_anchor - timedelta(seconds=seconds_ago))
+
+    def _attempts_for_user(self, user_id, skill, exercise_weights):
+        """Wiersze PROGRESS_FIELDS dla jednego użytkownika i jego seria (jak po kolejnych zgłoszeniach)."""
+        rng = self.rng
+        base_wpm, accuracy_skill = skill
+        count = min(int(_lognormal_with_mean(rng, ATTEMPTS_PER_USER, 1.0)), 50 * ATTEMPTS_PER_USER)
+        if not count:
+            return [], (0, 0, None)
+
+        # Od najstarszej próby - w tej kolejności zgłaszałby je użytkownik.
+        offsets = sorted((rng.randrange(HISTORY_DAYS * 86400) for _ in range(count)), reverse=True)
+        picked = rng.choices(self.exercises, cum_weights=exercise_weights, k=count)
+
+        rows, attempts, last_ranked = [], {}, {}
+        for offset, exercise in zip(offsets, picked):
+            questions = exercise.get_recommended_questions() if exercise.is_ranked else 0
+            if questions:
+                correct = sum(1 for _ in range(questions) if rng.random() < accuracy_skill)
+                accuracy = round(correct / questions * 100, 2)
+            else:
+                accuracy = 0.0
+            wpm = max(int(base_wpm * rng.lognormvariate(0, 0.12)), 1)
+
+            attempt_number = attempts.get(exercise.pk, 0) + 1
+            attempts[exercise.pk] = attempt_number
+
+            counted, points = False, 0
+            if exercise.is_ranked:
+                # Reguły ranking_logic.determine_ranking_eligibility: ponowny wynik po 30 dniach
+                # liczy się do rankingu, a poprzedni przestaje.
+                previous = last_ranked.get(exercise.pk)
+                if previous is None or previous[1] - offset >= RESUBMIT_AFTER_SECONDS:
+                    counted = True
+                    if previous is not None:
+                        previous[0][PROGRESS_COUNTED] = False
+                    points = ranking_logic._calculate_base_ranking_points(
+                        SimpleNamespace(wpm=wpm, accuracy=accuracy, exercise=exercise)
+                    )
+
+            row = [user_id, exercise.pk, wpm, accuracy, self._timestamp(offset), counted, attempt_number, points, False]
+            if counted:
+                last_ranked[exercise.pk] = (row, offset)
+            rows.append(row)
+
+        today = self.anchor.date()
+        days = sorted({today - timedelta(days=-(-offset // 86400)) for offset in offsets})
+        return rows, _streak_from_dates(days)
+
+    def create_progress(self):
+        # Ćwiczenia w losowej kolejności popularności (Zipf), niezależnie od kolejności tworzenia.
+        order = list(self.exercises)
+        self.rng.shuffle(order)
+        exercise_weights = _zipf_cum_weights(len(order), 0.8)
+        self.exercises = order
+
+        self.streaks = {}
+        buffer, total = [], 0
+        for user_id, skill in zip(self.user_ids, self.skills):
+            rows, self.streaks[user_id] = self._attempts_for_user(user_id, skill, exercise_weights)
+            buffer.extend(rows)
+            if len(buffer) >= self.batch_size:
+                total += insert_rows(UserProgress, PROGRESS_FIELDS, buffer, self.batch_size)
+                buffer = []
+        total += insert_rows(UserProgress, PROGRESS_FIELDS, buffer, self.batch_size)
+        self.report(f'Próby (UserProgress): {total}')
+
+    # --- graf obserwacji i powiadomienia ----------------------------------
+
+    def create_friendships(self):
+        rng = self.rng
+        popularity = list(self.user_ids)
+        rng.shuffle(popularity)
+        weights = _zipf_cum_weights(len(popularity), 0.9)
+        user_type_id = ContentType.objects.get_for_model(CustomUser).pk
+        unread_after = 7 * 86400
+
+        friendships, notifications = [], []
+        for follower_id in self.user_ids:
+            degree = min(int(_lognormal_with_mean(rng, FOLLOWS_PER_USER, 1.0)), len(popularity) - 1)
+            followed = set(rng.choices(popularity, cum_weights=weights, k=degree))
+            followed.discard(follower_id)
+            for followed_id in sorted(followed):
+                offset = rng.randrange(HISTORY_DAYS * 86400)
+                created_at = self._timestamp(offset)
+                friendships.append((follower_id, followed_id, created_at))
+                if rng.random() < FOLLOW_NOTIFICATION_RATIO:
+                    read = offset > unread_after or rng.random() < 0.5
+                    notifications.append((
+                        followed_id, follower_id, "zaczyna Cię obserwować", read, created_at, user_type_id, follower_id,
+                    ))
+
+        insert_rows(Friendship, FRIENDSHIP_FIELDS, friendships, self.batch_size)
+        insert_rows(Notification, NOTIFICATION_FIELDS, notifications, self.batch_size)
+        self.report(f'Obserwacje: {len(friendships)}, powiadomienia: {len(notifications)}')
+
+    def run(self):
+        self.create_users()
+        self.create_exercises()
+        self.create_progress()
+        self.create_friendships()
+        recompute_user_stats(self.user_ids, self.streaks, self.batch_size)
+        self.report('Przeliczono statystyki użytkowników.')
+
+
+def _streak_from_dates(dates):
+    """
+    (current_streak, max_streak, last_streak_date) dla posortowanych dni aktywności -
+    tak, jak zostawiłby je streak_logic po kolejnych zgłoszeniach (bieżąca seria
+    kończy się w dniu ostatniego treningu).
+    """
+    if not dates:
+        return 0, 0, None
+
+    best = run = 1
+    for previous, current in zip(dates, dates[1:]):
+        run = run + 1 if current - previous == timedelta(days=1) else 1
+        best = max(best, run)
+    return run, best, dates[-1]
+
+
+def recompute_user_stats(user_ids, streaks=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Przelicza zbiorczo zdenormalizowane pola podanych użytkowników: statystyki
+    rankingowe (jak stats_logic.compute_user_stats, ale jednym agregatem),
+    licznik nieprzeczytanych powiadomień i - jeśli podano - serie.
+    """
+    fields = list(stats_logic.STATS_FIELDS) + ['unread_notifications']
+    if streaks is not None:
+        fields += streak_logic.STREAK_FIELDS
+    quote = connection.ops.quote_name
+    sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+        quote(CustomUser._meta.db_table),
+        ', '.join(f'{quote(CustomUser._meta.get_field(name).column)} = %s' for name in fields),
+        quote(CustomUser._meta.pk.column),
+    )
+
+    user_ids = list(user_ids)
+    for chunk in _chunks(user_ids, batch_size):
+        ranked = dict.fromkeys(chunk)
+        rows = (
+            UserProgress.objects.filter(
+                user_id__in=chunk, exercise__is_ranked=True, counted_for_ranking=True,
+                accuracy__gte=MIN_PASS_ACCURACY,
+            )
+            .values('user_id')
+            .annotate(points=Sum('ranking_points'), count=Count('id'), wpm=Sum('wpm'), accuracy=Sum('accuracy'))
+        )
+        for row in rows:
+            ranked[row['user_id']] = row
+        unread = dict(
+            Notification.objects.filter(recipient_id__in=chunk, read=False)
+            .values('recipient_id').annotate(count=Count('id')).values_list('recipient_id', 'count')
+        )
+
+        values = []
+        for user_id in chunk:
+            row = ranked[user_id]
+            if row:
+                # Kolejność stats_logic.STATS_FIELDS.
+                stats = [
+                    row['points'] or 0, row['count'], row['wpm'] or 0, row['accuracy'] or 0,
+                    round((row['wpm'] or 0) / row['count'], 1), round((row['accuracy'] or 0) / row['count'], 1),
+                ]
+            else:
+                stats = [0] * len(stats_logic.STATS_FIELDS)
+            stats.append(unread.get(user_id, 0))
+            if streaks is not None:
+                current, best, last_date = streaks.get(user_id, (0, 0, None))
+                stats += [current, best, connection.ops.adapt_datefield_value(last_date)]
+            values.append(stats + [user_id])
+
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, values)
+
+    ranking_index.ranking_index.invalidate()
+
+
+def delete_seed_data():
+    """Usuwa dane z poprzedniego seedowania (kaskadowo próby, obserwacje, powiadomienia)."""
+    with transaction.atomic():
+        # Bez sygnałów per wiersz (powiadomienie o zakończeniu obserwacji, przeliczanie
+        # liczników nieprzeczytanych) - i tak usuwamy obie strony relacji.
+        for queryset in (
+            Friendship.objects.filter(follower__username__startswith=USERNAME_PREFIX),
+            Notification.objects.filter(recipient__username__startswith=USERNAME_PREFIX),
+        ):
+            queryset._raw_delete(queryset.db)
+        ReadingExercise.objects.filter(title__startswith=EXERCISE_TITLE_PREFIX).delete()
+        CustomUser.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+    ranking_index.ranking_index.invalidate()
+
+
+def generate(scale=0.01, seed=0, batch_size=DEFAULT_BATCH_SIZE, reset=False, progress=None):
+    """Generuje zbiór danych; zwraca liczby utworzonych użytkowników i ćwiczeń."""
+    if reset:
+        delete_seed_data()
+    elif CustomUser.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+        raise SeedDataExists("W bazie są już dane z seed_scale - uruchom z --reset, aby je zastąpić.")
+
+    generator = _Generator(scale, seed, batch_size, progress)
+    with transaction.atomic():
+        generator.run()
+    return {'users': generator.user_count, 'exercises': generator.exercise_count}
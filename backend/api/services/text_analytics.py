@@ -0,0 +1,114 @@
+"""
+Wspólna analiza tekstu: strumieniowy tokenizer i statystyki czytelności.
+
+Tokenizer idzie po tekście leniwie (re.finditer), więc wywołania, którym
+wystarczy N pierwszych słów (limit słów, walidacja długości), nie przetwarzają
+całego artykułu. Słowa są rozdzielane tak jak przez `str.split()`, żeby liczba
+słów zgadzała się z wcześniej zapisanymi `word_count`.
+
+Czytelność liczona jest wzorem FOG-PL (Gunning FOG w adaptacji Pisarka dla
+polszczyzny: trudne słowo ma co najmniej 4 sylaby). Wynik ~ liczba lat nauki
+potrzebnych do swobodnego zrozumienia tekstu.
+"""
+import hashlib
+import re
+from dataclasses import dataclass
+from itertools import islice
+
+_TOKEN_RE = re.compile(r'\S+')
+_NON_WORD_RE = re.compile(r'[^\w]', re.UNICODE)
+_SENTENCE_END_RE = re.compile(r'[.!?…]+["\'”»)\]]*$')
+_VOWEL_RE = re.compile(r'[aąeęioóuy]')
+_SOFTENING_I_RE = re.compile(r'i(?=[aąeęoóuy])')
+
+HARD_WORD_SYLLABLES = 4
+
+
+@dataclass(frozen=True)
+class TextStats:
+    word_count: int
+    sentence_count: int
+    avg_word_length: float
+    readability_score: float
+
+
+def content_hash(text):
+    """Skrót treści - statystyki przeliczamy tylko, gdy się zmieni."""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def iter_words(text):
+    """Leniwy generator słów (tokenów oddzielonych białymi znakami)."""
+    if not text:
+        return
+    for match in _TOKEN_RE.finditer(text):
+        yield match.group()
+
+
+def count_words(text, stop_after=None):
+    """
+    Liczy słowa; przy `stop_after` przerywa po tylu słowach
+    (wynik to wtedy min(liczba słów, stop_after)).
+    """
+    return sum(1 for _ in islice(iter_words(text), stop_after))
+
+
+def iter_clean_words(text):
+    """Słowa bez interpunkcji i znaków specjalnych; puste tokeny są pomijane."""
+    for word in iter_words(text):
+        cleaned = _NON_WORD_RE.sub('', word)
+        if cleaned:
+            yield cleaned
+
+
+def clean_text(text, limit=None):
+    """
+    Tekst bez interpunkcji, ze spacjami w miejsce białych znaków, przycięty
+    do `limit` słów. Przetwarza tylko tyle tekstu, ile potrzeba.
+    """
+    return " ".join(islice(iter_clean_words(text), limit))
+
+
+def count_syllables(word):
+    """Przybliżona liczba sylab: samogłoski, bez 'i' zmiękczającego (np. 'nie', 'siano')."""
+    word = word.lower()
+    return len(_VOWEL_RE.findall(word)) - len(_SOFTENING_I_RE.findall(word))
+
+
+def analyze(text):
+    """Statystyki tekstu w jednym przejściu tokenizera."""
+    tokens = 0
+    words = 0
+    letters = 0
+    sentences = 0
+    hard_words = 0
+    in_sentence = False
+
+    for token in iter_words(text):
+        tokens += 1
+        cleaned = _NON_WORD_RE.sub('', token)
+        if cleaned:
+            words += 1
+            letters += len(cleaned)
+            in_sentence = True
+            if count_syllables(cleaned) >= HARD_WORD_SYLLABLES:
+                hard_words += 1
+        if in_sentence and _SENTENCE_END_RE.search(token):
+            sentences += 1
+            in_sentence = False
+
+    if in_sentence:
+        sentences += 1
+
+    if not words:
+        return TextStats(word_count=tokens, sentence_count=0, avg_word_length=0.0, readability_score=0.0)
+
+    words_per_sentence = words / sentences
+    hard_word_percent = 100 * hard_words / words
+
+    return TextStats(
+        word_count=tokens,
+        sentence_count=sentences,
+        avg_word_length=round(letters / words, 2),
+        readability_score=round(0.4 * (words_per_sentence + hard_word_percent), 2),
+    )
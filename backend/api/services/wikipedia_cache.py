@@ -0,0 +1,164 @@
+"""
+Dwupoziomowy cache dla wyszukiwania w Wikipedii (api/services/wikipedia_service.py).
+
+- L1: LRU w pamięci procesu (ograniczony rozmiar + TTL) - trafienie bez I/O,
+- L2: wspólny cache Django (domyślnie FileBasedCache, CACHES w settings) -
+  przeżywa restart i jest współdzielony między workerami; rozmiar ogranicza
+  MAX_ENTRIES backendu.
+
+Trzymamy dwa rodzaje wpisów:
+- wyniki wyszukiwania: znormalizowane zapytanie + liczba wyników -> [(pageid, title)],
+- wyciągi: pageid -> tekst już oczyszczony i przycięty do MAX_CACHED_WORDS słów.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+SEARCH_TTL_SECONDS = 60 * 60 * 6
+EXTRACT_TTL_SECONDS = 60 * 60 * 24
+LOCAL_MAX_ENTRIES = 512
+
+# Największy limit słów, jaki przyjmuje SearchExercises - dłuższego tekstu nie trzymamy.
+MAX_CACHED_WORDS = 1000
+
+
+class LRUCache:
+    """Bezpieczny wątkowo LRU z TTL per wpis."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TwoLevelCache:
+    """L1 (LRU procesu) przed L2 (cache Django). Liczy trafienia na obu poziomach."""
+
+    def __init__(self, namespace, ttl_setting, default_ttl):
+        self.namespace = namespace
+        self.ttl_setting = ttl_setting
+        self.default_ttl = default_ttl
+        self.local = LRUCache(LOCAL_MAX_ENTRIES)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def ttl(self):
+        return getattr(settings, self.ttl_setting, self.default_ttl)
+
+    def _shared_key(self, key):
+        return f"wikipedia:{self.namespace}:{key}"
+
+    def _count(self, name, amount=1):
+        if amount:
+            with self._lock:
+                self.stats[name] += amount
+
+    def get_many(self, keys):
+        """Zwraca słownik key -> wartość dla znalezionych kluczy."""
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.local.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        self._count('local_hits', len(found))
+
+        if missing:
+            shared = cache.get_many([self._shared_key(key) for key in missing])
+            for key in missing:
+                value = shared.get(self._shared_key(key))
+                if value is not None:
+                    found[key] = value
+                    self.local.set(key, value, self.ttl)
+                    self._count('shared_hits')
+                else:
+                    self._count('misses')
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def set_many(self, mapping):
+        if not mapping:
+            return
+        ttl = self.ttl
+        for key, value in mapping.items():
+            self.local.set(key, value, ttl)
+        cache.set_many({self._shared_key(key): value for key, value in mapping.items()}, ttl)
+
+    def set(self, key, value):
+        self.set_many({key: value})
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+    def clear_local(self):
+        self.local.clear()
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = sum(stats.values())
+        hits = stats['local_hits'] + stats['shared_hits']
+        stats['hit_ratio'] = round(hits / lookups, 3) if lookups else None
+        stats['local_entries'] = len(self.local)
+        return stats
+
+
+search_cache = TwoLevelCache('search', 'WIKIPEDIA_SEARCH_CACHE_TTL', SEARCH_TTL_SECONDS)
+extract_cache = TwoLevelCache('extract', 'WIKIPEDIA_EXTRACT_CACHE_TTL', EXTRACT_TTL_SECONDS)
+
+
+def normalize_query(query):
+    """'  Kot  Domowy ' i 'kot domowy' to ten sam wpis."""
+    return " ".join(query.casefold().split())
+
+
+def search_key(query, num_results):
+    digest = hashlib.sha1(normalize_query(query).encode('utf-8')).hexdigest()
+    return f"{digest}:{num_results}"
+
+
+def stats():
+    """Liczniki trafień/chybień obu cache'y (w obrębie bieżącego procesu)."""
+    return {'search': search_cache.snapshot(), 'extracts': extract_cache.snapshot()}
+
+
+def clear_local():
+    """Czyści tylko L1 (np. w testach); wpisy w L2 wygasają po TTL."""
+    search_cache.clear_local()
+    extract_cache.clear_local()
@@ -0,0 +1,159 @@
+import logging
+import time
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from . import wikipedia_cache, text_analytics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://pl.wikipedia.org/w/api.php"
+USER_AGENT = 'SpeedReadingApp/1.0 (ziomekdfd@gmail.com)'
+
+DEFAULT_DEADLINE_SECONDS = 8.0
+REQUEST_TIMEOUT_SECONDS = 5.0
+MAX_CONCURRENCY = 8
+
+_session = requests.Session()
+_session.headers.update({'User-Agent': USER_AGENT})
+_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENCY))
+_session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENCY))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix='wikipedia')
+
+
+class Deadline:
+    """Wspólny budżet czasu dla wszystkich zapytań jednego wyszukiwania."""
+
+    def __init__(self, seconds):
+        self._ends_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(self._ends_at - time.monotonic(), 0.0)
+
+    def timeout(self):
+        """Timeout pojedynczego zapytania - nie dłuższy niż reszta budżetu."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise requests.exceptions.Timeout("Przekroczono budżet czasu zapytań do Wikipedii.")
+        return min(REQUEST_TIMEOUT_SECONDS, remaining)
+
+
+def _api_url():
+    return getattr(settings, 'WIKIPEDIA_API_URL', DEFAULT_API_URL)
+
+
+def _get(params, deadline: Deadline):
+    response = _session.get(_api_url(), params={**params, 'format': 'json', 'utf8': 1}, timeout=deadline.timeout())
+    response.raise_for_status()
+    return response.json()
+
+
+def clean_extract(full_text, limit):
+    """Usuwa interpunkcję/znaki specjalne i przycina tekst do `limit` słów (bez czytania reszty)."""
+    return text_analytics.clean_text(full_text, limit)
+
+
+def search_pages(query, num_results, deadline: Deadline):
+    """
+    Jedno zapytanie: wyniki wyszukiwania (generator=search) razem z wyciągami.
+    MediaWiki zwraca pełny wyciąg tylko dla części stron (bez exintro limit to 1),
+    więc reszta ma extract=None i trzeba ją dociągnąć osobno.
+
+    Zwraca listę (pageid, title, extract | None) w kolejności trafności.
+    """
+    data = _get({
+        'action': 'query',
+        'generator': 'search',
+        'gsrsearch': query,
+        'gsrlimit': num_results,
+        'prop': 'extracts',
+        'explaintext': 1,
+        'exlimit': 'max',
+    }, deadline)
+
+    pages = sorted(data.get('query', {}).get('pages', {}).values(), key=lambda page: page.get('index', 0))
+    return [(page['pageid'], page['title'], page.get('extract') or None) for page in pages]
+
+
+def fetch_extracts(pageids, deadline: Deadline):
+    """
+    Dociąga wyciągi równolegle po współdzielonej sesji (keep-alive).
+    Strony, które nie zdążą przed końcem budżetu albo zwrócą błąd, są pomijane.
+    Zwraca słownik pageid -> tekst.
+    """
+    def fetch(pageid):
+        data = _get({'action': 'query', 'prop': 'extracts', 'explaintext': 1, 'pageids': pageid}, deadline)
+        return data.get('query', {}).get('pages', {}).get(str(pageid), {}).get('extract', '')
+
+    futures = {_executor.submit(fetch, pageid): pageid for pageid in pageids}
+    done, not_done = wait(futures, timeout=deadline.remaining())
+
+    for future in not_done:
+        future.cancel()
+    if not_done:
+        logger.warning(f"Wikipedia: pominięto {len(not_done)} wyciągów po przekroczeniu budżetu czasu.")
+
+    extracts = {}
+    for future in done:
+        pageid = futures[future]
+        try:
+            extracts[pageid] = future.result()
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Wikipedia: nie udało się pobrać wyciągu {pageid}: {e}")
+    return extracts
+
+
+def search_extracts(query, num_results=5, limit=300, deadline_seconds=None):
+    """
+    Wyszukuje artykuły i zwraca listę {"title", "snippet"} (snippet = `limit` słów).
+
+    Wyniki wyszukiwania i oczyszczone wyciągi są w cache (wikipedia_cache),
+    więc powtórzone zapytanie nie wykonuje żadnego żądania HTTP. Przy braku
+    w cache: jedno zapytanie wyszukiwania z wyciągami + równoległe dociągnięcie
+    brakujących wyciągów, wszystko w jednym budżecie czasu. Błąd/timeout
+    samego wyszukiwania jest propagowany (requests.exceptions.*).
+    """
+    if deadline_seconds is None:
+        deadline_seconds = getattr(settings, 'WIKIPEDIA_DEADLINE_SECONDS', DEFAULT_DEADLINE_SECONDS)
+    deadline = Deadline(deadline_seconds)
+
+    key = wikipedia_cache.search_key(query, num_results)
+    listing = wikipedia_cache.search_cache.get(key)
+    cleaned = {}
+
+    if listing is None:
+        pages = search_pages(query, num_results, deadline)
+        listing = [(pageid, title) for pageid, title, _ in pages]
+        cleaned = {
+            pageid: clean_extract(extract, wikipedia_cache.MAX_CACHED_WORDS)
+            for pageid, _, extract in pages if extract is not None
+        }
+        wikipedia_cache.search_cache.set(key, listing)
+        wikipedia_cache.extract_cache.set_many(cleaned)
+
+    missing = [pageid for pageid, _ in listing if pageid not in cleaned]
+    if missing:
+        cleaned.update(wikipedia_cache.extract_cache.get_many(missing))
+        missing = [pageid for pageid in missing if pageid not in cleaned]
+
+    if missing:
+        fetched = {
+            pageid: clean_extract(text, wikipedia_cache.MAX_CACHED_WORDS)
+            for pageid, text in fetch_extracts(missing, deadline).items()
+        }
+        wikipedia_cache.extract_cache.set_many(fetched)
+        cleaned.update(fetched)
+
+    results = []
+    for pageid, title in listing:
+        text = cleaned.get(pageid)
+        if not text:
+            continue
+        results.append({"title": title, "snippet": " ".join(islice(text_analytics.iter_words(text), limit))})
+
+    return results
@@ -1,9 +1,9 @@
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
-from .models import Friendship, UserAchievement, Notification, CustomUser, UserProgress
-from django.db.models import F, Window
-from django.db.models.functions import Rank
+from .models import Achievement, DailyChallenge, Friendship, UserAchievement, Notification, CustomUser, UserProgress
+from .services import achievement_logic, notification_service
+from .services.challenge_service import invalidate_challenge_cache
 
 print("Plik signals.py został zaimportowany!")
 
@@ -68,58 +68,31 @@ def create_achievement_notification(sender, instance, created, **kwargs):
             print(f"[SIGNAL ERROR] {e}")
 
 
-@receiver(post_save, sender=CustomUser)
-def check_ranking_overtake(sender, instance, created, **kwargs):
-    """
-    Powiadomienie gdy ktoś przebija Cię w TOP 10 rankingu.
-    Odpala się PO zapisaniu CustomUser.
-    """
-    
-    update_fields = kwargs.get('update_fields', None)
+@receiver(post_save, sender=DailyChallenge)
+@receiver(post_delete, sender=DailyChallenge)
+def invalidate_daily_challenge_cache(sender, instance, **kwargs):
+    """Każda zmiana przypisania wyzwania unieważnia cache dla tej daty."""
+    invalidate_challenge_cache(instance.date)
 
-    if not update_fields or 'total_ranking_points' not in update_fields:
-        return
 
-    active_user = instance
-    if created or active_user.total_ranking_points == 0:
-        return
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Achievement)
+def invalidate_achievement_catalog(sender, instance, **kwargs):
+    achievement_logic.invalidate_catalog()
 
-    print(f"SIGNAL] Punkty {active_user.username} zaktualizowane. Sprawdzam TOP 10...")
 
-    try:
-        top_users_qs = CustomUser.objects.annotate(
-            rank=Window(
-                expression=Rank(),
-                order_by=F('total_ranking_points').desc()
-            )
-        ).filter(
-            total_ranking_points__gt=0,
-            rank__lte=10
-        ).order_by('rank')
+@receiver(post_save, sender=Notification)
+def increment_unread_counter(sender, instance, created, **kwargs):
+    """Pojedyncze Notification.objects.create(); bulk_create obsługuje notification_service."""
+    if created and not instance.read:
+        notification_service.increment_unread([instance.recipient_id])
+        notification_service.publish_created([instance])
 
-        top_users_map = {user.id: user for user in top_users_qs}
-        
-        if active_user.id in top_users_map:
-            user_content_type = ContentType.objects.get_for_model(CustomUser)
-            
-            for other_user_id, other_user in top_users_map.items():
-                if other_user_id == active_user.id:
-                    continue
-                    
-                if active_user.total_ranking_points > other_user.total_ranking_points:
-                    Notification.objects.create(
-                        recipient=other_user,
-                        actor=active_user,
-                        verb=f"awansował w rankingu TOP 10! ({active_user.total_ranking_points} pkt)",
-                        content_type=user_content_type,
-                        object_id=active_user.id
-                    )
-                    print(f"[SIGNAL] Powiadomiono {other_user.username} o awansie {active_user.username}")
-            
-            print(f"[SIGNAL] {active_user.username} jest w TOP 10!")
-        
-    except Exception as e:
-        print(f"[SIGNAL ERROR ranking] {e}")
+
+@receiver(post_delete, sender=Notification)
+def decrement_unread_counter(sender, instance, **kwargs):
+    if not instance.read:
+        notification_service.decrement_unread(instance.recipient_id)
 
 
 print("Sygnały zarejestrowane!")
\ No newline at end of file
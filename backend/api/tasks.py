@@ -0,0 +1,37 @@
+"""
+Zadania w tle wykonywane przez `manage.py run_workers` (services/job_queue.py).
+Każde zadanie musi być idempotentne - po awarii workera może wykonać się ponownie.
+"""
+from .models import CustomUser, UserProgress
+from .services import job_queue, achievement_logic, wpm_logic, overtake_logic, question_generation
+
+
+@job_queue.register('submission.achievements')
+def award_submission_achievements(progress_id):
+    progress = UserProgress.objects.select_related('user', 'exercise').filter(pk=progress_id).first()
+    if progress is None:
+        return
+    achievement_logic.check_for_new_achievements(progress.user, progress)
+
+
+@job_queue.register('submission.wpm_milestone')
+def unlock_wpm_milestone(progress_id):
+    progress = UserProgress.objects.select_related('exercise').filter(pk=progress_id).first()
+    if progress is None:
+        return
+    user = CustomUser.objects.select_for_update().get(pk=progress.user_id)
+    wpm_logic.check_and_update_wpm_milestone(user, progress)
+
+
+@job_queue.register('ranking.overtake')
+def notify_ranking_overtake(user_id, old_points, new_points):
+    user = CustomUser.objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    overtake_logic.notify_overtaken_users(user, old_points, new_points)
+
+
+@job_queue.register('ai.generate_questions', atomic=False, on_failure=question_generation.fail_job)
+def generate_questions(job_id):
+    # Poza transakcją: wywołanie modelu trwa sekundy, a nie może trzymać blokady zapisu bazy.
+    question_generation.run_job(job_id)
@@ -1,6 +1,8 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
-from ..models import CustomUser, ReadingExercise, UserProgress, Achievement, UserAchievement
+from ..models import CustomUser, ReadingExercise, UserProgress, Achievement, UserAchievement, Notification
 
 from ..services import achievement_logic
 
@@ -143,4 +145,63 @@ class AchievementLogicTests(TestCase):
         
         self.assertEqual(len(new_achievements), 0)
         self.assertEqual(UserAchievement.objects.filter(user=self.user).count(), 1)
-        self.assertEqual(UserAchievement.objects.get(user=self.user).achievement, ach_300)
\ No newline at end of file
+        self.assertEqual(UserAchievement.objects.get(user=self.user).achievement, ach_300)
+
+    def test_awarding_uses_constant_number_of_queries(self):
+        """
+        Test SCENARIUSZA 10: Katalog z pamięci + blokada użytkownika + 1 zapytanie
+        o posiadane + 2 bulk_create + licznik.
+        """
+        achievement_logic.catalog.get()
+        progress = self._create_test_progress(self.exercise_long, 900, 100, daily=True)
+
+        with self.assertNumQueries(5):
+            new_achievements = achievement_logic.check_for_new_achievements(self.user, progress)
+
+        self.assertEqual(len(new_achievements), 5)
+        self.assertEqual(UserAchievement.objects.filter(user=self.user).count(), 5)
+
+    def test_notifications_are_created_for_new_awards_only(self):
+        """
+        Test SCENARIUSZA 11: Powiadomienie powstaje tylko dla nowych osiągnięć.
+        """
+        UserAchievement.objects.create(user=self.user, achievement_id="wpm_300")
+        Notification.objects.all().delete()
+
+        progress = self._create_test_progress(self.exercise_normal, 850, 90)
+        achievement_logic.check_for_new_achievements(self.user, progress)
+
+        verbs = list(Notification.objects.filter(recipient=self.user).values_list('verb', flat=True))
+        self.assertEqual(verbs, ["odblokował osiągnięcie: WPM 800"])
+
+    def test_user_row_is_locked_before_reading_owned_achievements(self):
+        """
+        Test SCENARIUSZA 12: Najpierw blokada wiersza użytkownika, dopiero potem odczyt
+        posiadanych - równoległe sprawdzenie czeka i widzi już przyznane osiągnięcie.
+        """
+        achievement_logic.catalog.get()
+        progress = self._create_test_progress(self.exercise_normal, 301, 90)
+
+        with CaptureQueriesContext(connection) as ctx:
+            achievement_logic.check_for_new_achievements(self.user, progress)
+
+        tables = [query['sql'].split(' FROM ')[1].split()[0].strip('"') for query in ctx.captured_queries[:2]]
+        self.assertEqual(tables, ['api_customuser', 'api_userachievement'])
+
+        Notification.objects.all().delete()
+        self.assertEqual(achievement_logic.check_for_new_achievements(self.user, progress), [])
+        self.assertFalse(Notification.objects.exists())
+
+    def test_new_catalog_entry_is_picked_up_after_save(self):
+        """
+        Test SCENARIUSZA 13: Zmiana w tabeli Achievement unieważnia katalog w pamięci.
+        """
+        Achievement.objects.filter(slug="marathoner").delete()
+        achievement_logic.catalog.get()
+
+        Achievement.objects.create(slug="marathoner", title="Maratończyk")
+        progress = self._create_test_progress(self.exercise_long, 200, 90)
+
+        new_achievements = achievement_logic.check_for_new_achievements(self.user, progress)
+
+        self.assertEqual([ach.slug for ach in new_achievements], ["marathoner"])
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+
+from ..models import Question, ReadingExercise, UserProgress
+from ..services import benchmark
+
+
+class BenchmarkHelpersTests(SimpleTestCase):
+
+    def test_percentile_interpolates(self):
+        """
+        Test SCENARIUSZA 1: Percentyle z interpolacją liniową (jak numpy.percentile).
+        """
+        values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+        self.assertEqual(benchmark.percentile(values, 50), 5.5)
+        self.assertAlmostEqual(benchmark.percentile(values, 95), 9.55)
+        self.assertEqual(benchmark.percentile([7], 99), 7)
+        self.assertIsNone(benchmark.percentile([], 50))
+
+    def test_parse_mix_and_compare(self):
+        """
+        Test SCENARIUSZA 2: Parsowanie mieszanki endpointów i porównanie raportów.
+        """
+        self.assertEqual(benchmark.parse_mix('leaderboard=3,exercise_list'), {'leaderboard': 3.0, 'exercise_list': 1.0})
+        with self.assertRaises(ValueError):
+            benchmark.parse_mix('unknown=1')
+
+        baseline = {'endpoints': {'leaderboard': {'p95_ms': 10.0, 'queries_per_request': 4}}}
+        report = {'endpoints': {'leaderboard': {'p95_ms': 15.0, 'queries_per_request': 4}, 'exercise_list': {}}}
+        comparison = benchmark.compare(baseline, report)
+
+        self.assertEqual(list(comparison), ['leaderboard'])
+        self.assertEqual(comparison['leaderboard']['p95_ms'], (10.0, 15.0, 50.0))
+        self.assertEqual(comparison['leaderboard']['queries_per_request'], (4, 4, 0.0))
+
+
+class BenchCommandTests(TestCase):
+
+    def setUp(self):
+        exercise = ReadingExercise.objects.create(title="Ranking", text="słowo " * 300, is_ranked=True)
+        for i in range(3):
+            Question.objects.create(exercise=exercise, text=f"Pytanie {i}?", correct_answer="tak")
+
+    def test_bench_writes_json_report_per_endpoint(self):
+        """
+        Test SCENARIUSZA 3: `manage.py bench` wykonuje mieszankę wywołań i zapisuje raport
+        z percentylami, przepustowością i liczbą zapytań SQL dla każdego endpointu.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'report.json')
+            call_command('bench', requests=24, concurrency=1, users=2, output=path, stdout=StringIO())
+            with open(path, encoding='utf-8') as f:
+                report = json.load(f)
+
+        self.assertEqual(report['total']['count'], 24)
+        self.assertEqual(report['total']['errors'], 0)
+        self.assertEqual(set(report['endpoints']), set(benchmark.DEFAULT_MIX))
+        for stats in report['endpoints'].values():
+            self.assertLessEqual(stats['p50_ms'], stats['p95_ms'])
+            self.assertLessEqual(stats['p95_ms'], stats['p99_ms'])
+            self.assertGreater(stats['queries_per_request'], 0)
+            self.assertGreater(stats['throughput_rps'], 0)
+        self.assertEqual(report['endpoints']['submit_progress']['status_codes'], {'201': report['endpoints']['submit_progress']['count']})
+        self.assertTrue(UserProgress.objects.filter(user__username__startswith=benchmark.BENCH_USERNAME_PREFIX).exists())
+
+    def test_submit_progress_requires_ranked_exercises(self):
+        """
+        Test SCENARIUSZA 4: Bez ćwiczeń rankingowych z pytaniami komenda kończy się czytelnym błędem.
+        """
+        Question.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command('bench', requests=5, concurrency=1, stdout=StringIO())
+        call_command('bench', requests=5, concurrency=1, mix='leaderboard=1', stdout=StringIO())
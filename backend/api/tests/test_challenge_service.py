@@ -1,14 +1,17 @@
 from django.test import TestCase
+from django.db import transaction
+from django.core.cache import cache
 from django.utils import timezone
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest import mock
 
-from ..models import ReadingExercise
+from ..models import DailyChallenge, ReadingExercise
 from ..services import challenge_service
 
 class ChallengeServiceTests(TestCase):
 
     def setUp(self):
+        cache.clear()
         self.ex1 = ReadingExercise.objects.create(
             title="Wyzwanie 1", text="text", is_ranked=True, is_public=True
         )
@@ -78,4 +81,68 @@ class ChallengeServiceTests(TestCase):
 
         challenge = challenge_service.get_today_challenge()
         
-        self.assertIsNone(challenge)
\ No newline at end of file
+        self.assertIsNone(challenge)
+
+class ChallengeCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.now().date()
+        self.ex1 = ReadingExercise.objects.create(
+            title="Wyzwanie 1", text="text", is_ranked=True, is_public=True
+        )
+        self.ex2 = ReadingExercise.objects.create(
+            title="Wyzwanie 2", text="text", is_ranked=True, is_public=True
+        )
+        DailyChallenge.objects.create(date=self.today, exercise=self.ex1)
+
+    def test_second_read_hits_cache_without_queries(self):
+        """
+        Test SCENARIUSZA 1: Po pierwszym odczycie wyzwanie dnia nie wymaga zapytań.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(challenge_service.get_today_challenge(), self.ex1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(challenge_service.get_today_challenge(), self.ex1)
+
+    def test_reassigning_today_invalidates_cache(self):
+        """
+        Test SCENARIUSZA 2: Zmiana przypisania wyzwania na dziś unieważnia cache.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            challenge_service.get_today_challenge()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            DailyChallenge.objects.filter(date=self.today).delete()
+            DailyChallenge.objects.create(date=self.today, exercise=self.ex2)
+
+        self.assertEqual(challenge_service.get_today_challenge(), self.ex2)
+
+    def test_read_path_does_not_delete_old_challenges(self):
+        """
+        Test SCENARIUSZA 3: Odczyt nie usuwa starych wyzwań - robi to osobne zadanie.
+        """
+        DailyChallenge.objects.create(date=self.today - timedelta(days=2), exercise=self.ex2)
+
+        challenge_service.get_today_challenge()
+        self.assertEqual(DailyChallenge.objects.count(), 2)
+
+        deleted = challenge_service.purge_old_challenges()
+        self.assertEqual(deleted, 1)
+        self.assertEqual(DailyChallenge.objects.get().exercise, self.ex1)
+
+    def test_rolled_back_challenge_is_not_cached(self):
+        """
+        Test SCENARIUSZA 4: Wyzwanie wylosowane w transakcji, która została wycofana,
+        nie trafia do cache - kolejny odczyt losuje je od nowa z bazy.
+        """
+        DailyChallenge.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.assertIsNotNone(challenge_service.get_today_challenge())
+                transaction.set_rollback(True)
+
+        self.assertIsNone(cache.get(challenge_service._cache_key(self.today)))
+        self.assertFalse(DailyChallenge.objects.exists())
@@ -0,0 +1,148 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..models import BackgroundJob
+from ..services import heuristic_questions, question_generation, question_sections
+
+CustomUser = get_user_model()
+
+FACTS = [
+    "Kot domowy został udomowiony w Egipcie około 9500 lat temu.",
+    "Wisła jest najdłuższą rzeką Polski i wpada do Morza Bałtyckiego.",
+    "Mikołaj Kopernik opisał heliocentryczny model Układu Słonecznego w roku 1543.",
+    "Fotosynteza zachodzi w chloroplastach komórek roślinnych przy udziale światła.",
+    "Kraków był stolicą Polski aż do przeniesienia dworu do Warszawy w 1596 roku.",
+    "Tlen stanowi około dwudziestu jeden procent objętości powietrza atmosferycznego.",
+    "Maria Skłodowska-Curie otrzymała dwie Nagrody Nobla z fizyki i chemii.",
+    "Tatry są najwyższym pasmem górskim Karpat, a Rysy to szczyt graniczny.",
+    "Mitochondria nazywane są elektrowniami komórki, bo wytwarzają energię chemiczną.",
+    "Bitwa pod Grunwaldem rozegrała się w roku 1410 między Polską a zakonem krzyżackim.",
+]
+
+
+def long_text(words=1000):
+    sentences, count, i = [], 0, 0
+    while count < words:
+        sentence = FACTS[i % len(FACTS)].replace("Kot", f"Kot{i}")
+        sentences.append(sentence)
+        count += len(sentence.split())
+        i += 1
+    return " ".join(sentences)
+
+
+class HeuristicGeneratorTests(SimpleTestCase):
+
+    def test_cloze_and_choice_questions_have_ai_shape(self):
+        """
+        Test SCENARIUSZA 1: Pytania mają kształt jak z modelu AI: luka w zdaniu,
+        odpowiedź z tekstu, a w zamkniętych 4 różne opcje z poprawną odpowiedzią.
+        """
+        text = " ".join(FACTS)
+
+        questions = heuristic_questions.generate(text, open_count=4, choice_count=3)
+
+        self.assertEqual([q['question_type'] for q in questions], ['open'] * 4 + ['choice'] * 3)
+        for question in questions:
+            self.assertEqual(question_sections.normalize_question(question), question)
+            self.assertIn(heuristic_questions.BLANK, question['text'])
+            self.assertIn(question['correct_answer'], text)
+            self.assertNotIn(question['correct_answer'], question['text'].replace(heuristic_questions.BLANK, ' '))
+        for question in questions[4:]:
+            options = [question[f'option_{i}'] for i in range(1, 5)]
+            self.assertEqual(len(set(options)), 4)
+            self.assertIn(question['correct_answer'], options)
+
+    def test_distractors_match_answer_kind(self):
+        """
+        Test SCENARIUSZA 2: Dystraktory dla liczby są liczbami, a dla nazwy własnej - nazwami własnymi.
+        """
+        questions = heuristic_questions.generate(" ".join(FACTS), open_count=0, choice_count=8)
+
+        for question in questions:
+            options = [question[f'option_{i}'] for i in range(1, 5)]
+            if question['correct_answer'].isdigit():
+                self.assertTrue(all(option.isdigit() for option in options))
+
+    def test_output_is_deterministic(self):
+        """
+        Test SCENARIUSZA 3: Ten sam tekst daje te same pytania (wynik nadaje się do cache i testów).
+        """
+        text = " ".join(FACTS)
+        self.assertEqual(
+            heuristic_questions.generate(text, 5, 5),
+            heuristic_questions.generate(text, 5, 5),
+        )
+
+    def test_thousand_words_well_under_100ms(self):
+        """
+        Test SCENARIUSZA 4: Tekst 1000 słów i 50 pytań - wyraźnie poniżej 100 ms.
+        """
+        text = long_text(1000)
+        heuristic_questions.generate(text, 1, 1)
+
+        started = time.perf_counter()
+        questions = heuristic_questions.generate(text, open_count=30, choice_count=20)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(questions), 50)
+        self.assertLess(elapsed, 0.1)
+
+
+@override_settings(AI_QUESTION_MODEL='api.tests.test_heuristic_questions.BrokenModel', JOB_QUEUE_SYNC=False)
+class HeuristicEngineSelectionTests(TestCase):
+
+    def setUp(self):
+        question_generation.reset_model()
+        self.admin = CustomUser.objects.create_user(username="admin", email="admin@test.com", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        self.data = {'content': " ".join(FACTS), 'topic': 'Wiedza', 'total_count': 15,
+                     'open_count': 10, 'choice_count': 5, 'engine': 'heuristic'}
+
+    def tearDown(self):
+        question_generation.reset_model()
+
+    def test_choice_without_distractors_falls_back_to_open_cloze(self):
+        """
+        Test SCENARIUSZA 7: W krótkim tekście brak 3 dystraktorów - zamiast pytania
+        zamkniętego powstaje otwarte, więc liczba pytań się zgadza.
+        """
+        text = "Ala ma kota i psa od dawna. Ola ma dwa psy i rybki też."
+
+        questions = heuristic_questions.generate(text, open_count=0, choice_count=2)
+
+        self.assertEqual(len(questions), 2)
+        self.assertEqual({q['question_type'] for q in questions}, {'open'})
+        for question in questions:
+            self.assertIn(heuristic_questions.BLANK, question['text'])
+            self.assertIsNone(question['option_1'])
+
+    def test_heuristic_engine_skips_model_and_queue(self):
+        """
+        Test SCENARIUSZA 5: `engine=heuristic` - pytania od razu (synchronicznie i jako
+        zakończone zlecenie), bez modelu AI i bez workera.
+        """
+        response = self.client.post('/api/ai/generate-questions/', self.data, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 15)
+
+        response = self.client.post('/api/ai/question-jobs/', self.data, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'done')
+        self.assertFalse(BackgroundJob.objects.exists())
+
+    def test_unknown_engine_is_rejected(self):
+        """
+        Test SCENARIUSZA 6: Nieznany silnik to błąd walidacji (400).
+        """
+        self.data['engine'] = 'magic'
+        response = self.client.post('/api/ai/question-jobs/', self.data, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class BrokenModel:
+    def __init__(self):
+        raise RuntimeError("model nie powinien być tworzony")
@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from ..models import BackgroundJob
+from ..services import job_queue
+
+CustomUser = get_user_model()
+
+calls = []
+
+
+@job_queue.register('test.record')
+def record_call(value):
+    calls.append(value)
+    CustomUser.objects.create_user(username=f"job-{value}", email=f"{value}@test.com")
+
+
+@job_queue.register('test.fail')
+def always_fail():
+    CustomUser.objects.create_user(username="partial", email="partial@test.com")
+    raise RuntimeError("awaria")
+
+
+@override_settings(JOB_QUEUE_SYNC=False, JOB_RETRY_BACKOFF_SECONDS=10)
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_jobs_run_in_order_and_are_marked_done(self):
+        """
+        Test SCENARIUSZA 1: Worker wykonuje zadania i oznacza je jako 'done'.
+        """
+        job_queue.enqueue('test.record', {'value': 'a'})
+        job_queue.enqueue('test.record', {'value': 'b'})
+
+        processed = job_queue.run_worker(worker_id='w1', drain=True)
+
+        self.assertEqual(processed, 2)
+        self.assertEqual(calls, ['a', 'b'])
+        self.assertEqual(BackgroundJob.objects.filter(status=BackgroundJob.STATUS_DONE).count(), 2)
+
+    def test_idempotency_key_deduplicates(self):
+        """
+        Test SCENARIUSZA 2: Drugie zadanie z tym samym kluczem jest pomijane.
+        """
+        job_queue.enqueue('test.record', {'value': 'a'}, idempotency_key='once')
+        job_queue.enqueue('test.record', {'value': 'a'}, idempotency_key='once')
+
+        job_queue.run_worker(worker_id='w1', drain=True)
+
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+        self.assertEqual(calls, ['a'])
+
+    def test_failure_rolls_back_and_schedules_retry(self):
+        """
+        Test SCENARIUSZA 3: Błąd wycofuje zmiany zadania i planuje ponowienie z opóźnieniem.
+        """
+        job_queue.enqueue('test.fail', idempotency_key='fail')
+
+        job_queue.run_worker(worker_id='w1', drain=True)
+
+        job = BackgroundJob.objects.get(idempotency_key='fail')
+        self.assertEqual(job.status, BackgroundJob.STATUS_PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("awaria", job.last_error)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=5))
+        self.assertFalse(CustomUser.objects.filter(username="partial").exists())
+
+    def test_job_fails_permanently_after_max_attempts(self):
+        """
+        Test SCENARIUSZA 4: Po wyczerpaniu prób zadanie dostaje status 'failed'.
+        """
+        job_queue.enqueue('test.fail', idempotency_key='fail', max_attempts=2)
+
+        for _ in range(2):
+            BackgroundJob.objects.update(run_after=timezone.now())
+            job_queue.run_worker(worker_id='w1', drain=True)
+
+        job = BackgroundJob.objects.get(idempotency_key='fail')
+        self.assertEqual(job.status, BackgroundJob.STATUS_FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_expired_visibility_timeout_returns_job_to_pool(self):
+        """
+        Test SCENARIUSZA 5: Zadanie workera, który padł, wraca do puli po czasie widoczności.
+        """
+        job_queue.enqueue('test.record', {'value': 'a'})
+        self.assertEqual(len(job_queue.claim_batch('dead-worker')), 1)
+
+        self.assertEqual(job_queue.claim_batch('w2'), [])
+
+        BackgroundJob.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        reclaimed = job_queue.claim_batch('w2')
+
+        self.assertEqual(len(reclaimed), 1)
+        self.assertEqual(reclaimed[0].attempts, 2)
+
+    def test_lost_lease_rolls_back_handler_changes(self):
+        """
+        Test SCENARIUSZA 6: Worker, któremu przejęto zadanie, nie zapisuje swoich zmian.
+        """
+        job_queue.enqueue('test.record', {'value': 'a'})
+        [job] = job_queue.claim_batch('slow-worker')
+        BackgroundJob.objects.update(locked_by='other-worker')
+
+        self.assertFalse(job_queue.execute(job))
+        self.assertFalse(CustomUser.objects.filter(username="job-a").exists())
+
+    @override_settings(JOB_QUEUE_SYNC=True)
+    def test_sync_mode_runs_after_commit(self):
+        """
+        Test SCENARIUSZA 7: W trybie synchronicznym zadanie wykonuje się zaraz po commicie.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            job_queue.enqueue('test.record', {'value': 'a'})
+            self.assertEqual(calls, [])
+
+        self.assertEqual(calls, ['a'])
+        self.assertEqual(BackgroundJob.objects.get().status, BackgroundJob.STATUS_DONE)
+
+    def test_unknown_job_name_is_rejected(self):
+        """
+        Test SCENARIUSZA 8: Nie można dodać zadania bez zarejestrowanego handlera.
+        """
+        with self.assertRaises(job_queue.UnknownJob):
+            job_queue.enqueue('test.missing')
@@ -0,0 +1,78 @@
+import json
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from ..models import CustomUser, ReadingExercise, UserProgress
+from ..services import microbenchmarks
+
+SIZES = (5, 300)
+
+
+class ServiceMicrobenchmarkTests(TestCase):
+
+    def test_hot_path_query_count_does_not_depend_on_history(self):
+        """
+        Test SCENARIUSZA 1: Funkcje ze ścieżki zgłoszenia wyniku wykonują tyle samo zapytań
+        SQL przy 5 i 300 próbach w historii, a dane pomocnicze są wycofywane.
+        """
+        report = microbenchmarks.run(sizes=SIZES, repeat=3, progress=lambda message: None)
+
+        self.assertEqual(set(report['cases']), {case.name for case in microbenchmarks.CASES})
+        for name, case in report['cases'].items():
+            self.assertEqual(set(case['results']), {'5', '300'}, name)
+            for result in case['results'].values():
+                self.assertGreaterEqual(result['p95_ms'], result['p50_ms'])
+                self.assertGreaterEqual(result['queries_max'], result['queries'])
+            if case['hot_path']:
+                self.assertEqual(case['scaling']['query_growth'], 0, name)
+
+        self.assertGreater(report['cases']['submission_service.process_exercise_submission']['results']['5']['queries'], 0)
+        self.assertFalse(CustomUser.objects.filter(username__startswith=microbenchmarks.USERNAME_PREFIX).exists())
+        self.assertFalse(ReadingExercise.objects.exists())
+        self.assertFalse(UserProgress.objects.exists())
+
+    def test_scaling_flags_only_hot_path_growth(self):
+        """
+        Test SCENARIUSZA 2: Wzrost zapytań albo czasu z historią jest podejrzeniem O(historii)
+        tylko dla funkcji ze ścieżki zgłoszenia - pełne przeliczenie statystyk może rosnąć.
+        """
+        hot, repair = microbenchmarks.CASES[0], microbenchmarks.CASES[-1]
+        growing = {
+            '10': {'p50_ms': 1.0, 'queries': 2},
+            '1000': {'p50_ms': 100.0, 'queries': 3},
+        }
+        constant = {
+            '10': {'p50_ms': 1.0, 'queries': 2},
+            '1000': {'p50_ms': 1.1, 'queries': 2},
+        }
+
+        self.assertEqual(microbenchmarks.scaling(hot, growing)['latency_exponent'], 1.0)
+        self.assertTrue(microbenchmarks.scaling(hot, growing)['suspect_o_history'])
+        self.assertFalse(microbenchmarks.scaling(hot, constant)['suspect_o_history'])
+        self.assertFalse(microbenchmarks.scaling(repair, growing)['suspect_o_history'])
+
+    def test_command_writes_report_and_validates_arguments(self):
+        """
+        Test SCENARIUSZA 3: `bench_services` drukuje tabelę, zapisuje raport JSON i odrzuca
+        nieznane funkcje.
+        """
+        with TemporaryDirectory() as tmp:
+            output = Path(tmp) / 'services.json'
+            stdout = StringIO()
+            call_command('bench_services', sizes='5,50', repeat=2, case=['ranking_logic.determine_ranking_eligibility'],
+                         output=str(output), stdout=stdout)
+            report = json.loads(output.read_text(encoding='utf-8'))
+
+        self.assertEqual(list(report['cases']), ['ranking_logic.determine_ranking_eligibility'])
+        self.assertEqual(report['config'], {'sizes': [5, 50], 'repeat': 2})
+        self.assertIn('ranking_logic.determine_ranking_eligibility', stdout.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('bench_services', case=['nie_ma_takiej'], stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('bench_services', sizes='0,10', stdout=StringIO())
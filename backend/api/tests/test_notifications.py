@@ -0,0 +1,320 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..models import Notification
+from ..services import notification_bus, notification_service
+
+CustomUser = get_user_model()
+
+
+class UnreadCounterTests(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="reader", email="reader@test.com")
+        self.other = CustomUser.objects.create_user(username="other", email="other@test.com")
+        self.actor = CustomUser.objects.create_user(username="actor", email="actor@test.com")
+
+    def _unread(self, user):
+        user.refresh_from_db(fields=['unread_notifications'])
+        return user.unread_notifications
+
+    def test_single_create_increments_counter(self):
+        """
+        Test SCENARIUSZA 1: Notification.objects.create() podbija licznik (sygnał).
+        """
+        Notification.objects.create(recipient=self.user, actor=self.actor, verb="test")
+        Notification.objects.create(recipient=self.user, actor=self.actor, verb="test", read=True)
+
+        self.assertEqual(self._unread(self.user), 1)
+
+    def test_bulk_notify_increments_every_recipient(self):
+        """
+        Test SCENARIUSZA 2: bulk_notify aktualizuje liczniki wszystkich odbiorców.
+        """
+        notification_service.bulk_notify([
+            Notification(recipient=self.user, actor=self.actor, verb="a"),
+            Notification(recipient=self.user, actor=self.actor, verb="b"),
+            Notification(recipient=self.other, actor=self.actor, verb="c"),
+        ])
+
+        self.assertEqual(self._unread(self.user), 2)
+        self.assertEqual(self._unread(self.other), 1)
+
+    def test_mark_all_as_read_resets_counter(self):
+        """
+        Test SCENARIUSZA 3: Oznaczenie wszystkich jako przeczytane zeruje licznik.
+        """
+        for _ in range(3):
+            Notification.objects.create(recipient=self.user, actor=self.actor, verb="test")
+
+        self.assertEqual(notification_service.mark_all_as_read(self.user), 3)
+        self.assertEqual(self._unread(self.user), 0)
+        self.assertFalse(Notification.objects.filter(recipient=self.user, read=False).exists())
+
+    def test_deleting_unread_notification_decrements_counter(self):
+        """
+        Test SCENARIUSZA 4: Usunięcie nieprzeczytanego powiadomienia zmniejsza licznik.
+        """
+        notification = Notification.objects.create(recipient=self.user, actor=self.actor, verb="test")
+        notification.delete()
+
+        self.assertEqual(self._unread(self.user), 0)
+
+
+class NotificationEndpointTests(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="reader", email="reader@test.com")
+        self.actor = CustomUser.objects.create_user(username="actor", email="actor@test.com")
+        notification_service.bulk_notify([
+            Notification(recipient=self.user, actor=self.actor, verb=f"powiadomienie {i}")
+            for i in range(25)
+        ])
+        self.user.refresh_from_db()
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_unread_count_reads_only_the_user_row(self):
+        """
+        Test SCENARIUSZA 1: Licznik nie wykonuje zapytań do tabeli powiadomień.
+        """
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/notifications/unread-count/')
+
+        self.assertEqual(response.json(), {"unread_count": 25})
+
+    def test_list_is_cursor_paginated(self):
+        """
+        Test SCENARIUSZA 2: Lista zwraca stronę + kursor do starszych powiadomień.
+        """
+        first = self.client.get('/api/notifications/').json()
+        self.assertEqual(len(first['results']), 20)
+        self.assertIsNotNone(first['next'])
+
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(second['results']), 5)
+        self.assertIsNone(second['next'])
+
+        ids = [n['id'] for n in first['results'] + second['results']]
+        self.assertEqual(len(set(ids)), 25)
+
+
+class NotificationStreamTests(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="reader", email="reader@test.com")
+        self.actor = CustomUser.objects.create_user(username="actor", email="actor@test.com")
+        self.token = str(AccessToken.for_user(self.user))
+
+    def _notify_and_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(recipient=self.user, actor=self.actor, verb="zaczyna Cię obserwować")
+
+    def test_stream_requires_asgi(self):
+        """
+        Test SCENARIUSZA 1: Pod WSGI strumień odmawia (503), zamiast blokować wątek.
+        """
+        response = self.client.get('/api/notifications/stream/', {'token': self.token})
+        self.assertEqual(response.status_code, 503)
+
+    async def test_stream_rejects_invalid_token(self):
+        """
+        Test SCENARIUSZA 2: Bez poprawnego tokenu strumień zwraca 401.
+        """
+        response = await self.async_client.get('/api/notifications/stream/', {'token': 'zły-token'})
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(NOTIFICATION_STREAM_KEEPALIVE_SECONDS=0.05)
+    async def test_stream_pushes_new_notifications(self):
+        """
+        Test SCENARIUSZA 3: Nowe powiadomienie trafia do otwartego strumienia, bezczynność = keepalive.
+        """
+        response = await self.async_client.get('/api/notifications/stream/', {'token': self.token})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        stream = response.streaming_content.__aiter__()
+        self.assertTrue((await stream.__anext__()).startswith(b"retry:"))
+        self.assertEqual(await stream.__anext__(), b": keepalive\n\n")
+
+        await sync_to_async(self._notify_and_commit)()
+
+        chunk = await stream.__anext__()
+        self.assertTrue(chunk.startswith(b"event: notification\n"))
+        self.assertIn("zaczyna Cię obserwować", chunk.decode())
+
+        # Rozłączenie klienta pod ASGI = anulowanie zadania czytającego strumień.
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertFalse(notification_bus.broker.has_subscribers(self.user.id))
+
+
+class RecordingBroker:
+    """Broker zastępczy: stała lista subskrybentów, dostarczone zdarzenia w liście."""
+
+    def __init__(self, user_ids):
+        self.user_ids = set(user_ids)
+        self.delivered = []
+        self.event = threading.Event()
+
+    def subscribed_user_ids(self):
+        return list(self.user_ids)
+
+    def has_subscribers(self, user_id):
+        return user_id in self.user_ids
+
+    def deliver(self, user_id, event):
+        self.delivered.append((user_id, event['id']))
+        self.event.set()
+
+
+class DatabasePollingCursorTests(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="reader", email="reader@test.com")
+        self.actor = CustomUser.objects.create_user(username="actor", email="actor@test.com")
+        self.broker = RecordingBroker([self.user.id])
+        self.backend = notification_bus.DatabasePollingBackend(self.broker)
+        # Kursor ustawia sama subskrypcja; wątek odpytujący zastępujemy pustym.
+        with mock.patch.object(self.backend, '_run'):
+            self.backend.on_subscribe()
+
+    def _notify(self, **kwargs):
+        return Notification.objects.create(recipient=self.user, actor=self.actor, verb="zaczyna Cię obserwować", **kwargs)
+
+    def test_late_committed_row_is_not_skipped(self):
+        """
+        Test SCENARIUSZA 1: Wiersz o mniejszym id zatwierdzony po wierszu o większym id
+        (symulowany usunięciem i ponownym wstawieniem) i tak zostaje dostarczony, raz.
+        """
+        first, late, last = self._notify(), self._notify(), self._notify()
+        late_id = late.id
+        late.delete()
+
+        self.assertEqual(self.backend.poll_once(), 2)
+        self._notify(id=late_id)
+        self.assertEqual(self.backend.poll_once(), 1)
+        self.assertEqual(self.backend.poll_once(), 0)
+
+        self.assertEqual([notification_id for _, notification_id in self.broker.delivered], [first.id, last.id, late_id])
+        self.assertEqual(self.backend._last_id, last.id)
+
+    def test_gap_expires_after_grace_period(self):
+        """
+        Test SCENARIUSZA 2: Luka, która nie zapełni się w GAP_GRACE_SECONDS (wycofana
+        transakcja), przestaje wstrzymywać kursor.
+        """
+        self._notify()
+        missing = self._notify()
+        last = self._notify()
+        missing.delete()
+
+        self.backend.poll_once()
+        self.assertLess(self.backend._last_id, last.id)
+
+        with mock.patch.object(notification_bus, 'GAP_GRACE_SECONDS', 0):
+            self.backend.poll_once()
+        self.assertEqual(self.backend._last_id, last.id)
+        self.assertEqual(self.backend._seen, set())
+
+    def test_notification_before_first_poll_is_delivered(self):
+        """
+        Test SCENARIUSZA 3: Powiadomienie utworzone po subskrypcji, a przed pierwszym
+        cyklem odpytywania, zostaje dostarczone (kursor ustawia on_subscribe).
+        """
+        notification = self._notify()
+
+        self.assertEqual(self.backend.poll_once(), 1)
+        self.assertEqual(self.broker.delivered, [(self.user.id, notification.id)])
+
+    def test_publish_delivers_at_once_and_poller_skips_it(self):
+        """
+        Test SCENARIUSZA 4: Powiadomienie z tego procesu trafia do subskrybenta w publish(),
+        a poller nie wysyła go drugi raz, choć przesuwa za nie kursor.
+        """
+        notification = self._notify()
+
+        self.backend.publish(notification)
+        self.assertEqual(self.broker.delivered, [(self.user.id, notification.id)])
+
+        self.assertEqual(self.backend.poll_once(), 0)
+        self.assertEqual(self.broker.delivered, [(self.user.id, notification.id)])
+        self.assertEqual(self.backend._last_id, notification.id)
+
+
+@override_settings(NOTIFICATION_BUS_POLL_SECONDS=0.01)
+class DatabasePollingThreadTests(TransactionTestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="reader", email="reader@test.com")
+        self.actor = CustomUser.objects.create_user(username="actor", email="actor@test.com")
+        self.broker = RecordingBroker([self.user.id])
+        self.backend = notification_bus.DatabasePollingBackend(self.broker)
+
+    def tearDown(self):
+        self.backend.stop(timeout=2)
+
+    def test_poller_delivers_committed_notifications(self):
+        """
+        Test SCENARIUSZA 1: Wątek odpytujący dostarcza powiadomienia prosto z bazy
+        (bez publish), tylko subskrybentom.
+        """
+        # Wiersze zapisane przed startem wątku, z kursorem tuż przed nimi - w testowej
+        # bazie SQLite w pamięci równoległy zapis i odczyt kończą się "table is locked".
+        skipped = Notification.objects.create(recipient=self.actor, actor=self.user, verb="pomija")
+        notification = Notification.objects.create(recipient=self.user, actor=self.actor, verb="zaczyna Cię obserwować")
+        self.backend._last_id = skipped.id - 1
+
+        self.backend.on_subscribe()
+
+        self.assertTrue(self.broker.event.wait(2))
+        self.assertEqual(self.broker.delivered, [(self.user.id, notification.id)])
+
+    @override_settings(NOTIFICATION_BUS_POLL_SECONDS=0.2)
+    def test_poller_delivers_notification_created_right_after_subscribe(self):
+        """
+        Test SCENARIUSZA 2: Powiadomienie zapisane przed pierwszym cyklem wątku
+        (zaraz po subskrypcji) nie przepada.
+        """
+        backend = notification_bus.DatabasePollingBackend(self.broker)
+        backend.on_subscribe()
+        try:
+            notification = Notification.objects.create(recipient=self.user, actor=self.actor, verb="zaczyna Cię obserwować")
+
+            self.assertTrue(self.broker.event.wait(2))
+            self.assertEqual(self.broker.delivered, [(self.user.id, notification.id)])
+        finally:
+            backend.stop(timeout=2)
+
+    def test_poller_stops_on_shutdown_and_without_subscribers(self):
+        """
+        Test SCENARIUSZA 3: stop() kończy wątek, a bez subskrybentów wątek kończy się sam
+        i startuje ponownie przy następnej subskrypcji.
+        """
+        self.backend.on_subscribe()
+        self.assertTrue(self.backend.is_running())
+        self.backend.stop(timeout=2)
+        self.assertFalse(self.backend.is_running())
+
+        self.backend.on_subscribe()
+        self.broker.user_ids.clear()
+        deadline = time.monotonic() + 2
+        while self.backend.is_running() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(self.backend.is_running())
+        self.assertIsNone(self.backend._last_id)
+
+        self.broker.user_ids.add(self.user.id)
+        self.backend.on_subscribe()
+        self.assertTrue(self.backend.is_running())
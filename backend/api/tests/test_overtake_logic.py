@@ -0,0 +1,86 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+
+from ..models import Notification
+from ..services import overtake_logic, ranking_index
+
+CustomUser = get_user_model()
+
+
+class OvertakeLogicTests(TestCase):
+
+    def setUp(self):
+        self.leader = CustomUser.objects.create_user(username="leader", email="l@test.com", total_ranking_points=500)
+        self.second = CustomUser.objects.create_user(username="second", email="s@test.com", total_ranking_points=300)
+        self.third = CustomUser.objects.create_user(username="third", email="t@test.com", total_ranking_points=200)
+        self.behind = CustomUser.objects.create_user(username="behind", email="b@test.com", total_ranking_points=100)
+        self.active = CustomUser.objects.create_user(username="active", email="a@test.com", total_ranking_points=150)
+        ranking_index.ranking_index.invalidate()
+
+    def _gain_points(self, new_points):
+        old_points = self.active.total_ranking_points
+        CustomUser.objects.filter(pk=self.active.pk).update(total_ranking_points=new_points)
+        self.active.total_ranking_points = new_points
+        return overtake_logic.notify_overtaken_users(self.active, old_points, new_points)
+
+    def test_only_users_between_old_and_new_points_are_notified(self):
+        """
+        Test SCENARIUSZA 1: Powiadomienie dostają tylko osoby z przedziału [stare, nowe).
+        """
+        overtaken = self._gain_points(350)
+
+        self.assertEqual({u.username for u in overtaken}, {"second", "third"})
+        self.assertEqual(
+            set(Notification.objects.values_list('recipient__username', flat=True)),
+            {"second", "third"}
+        )
+
+    def test_losing_points_notifies_nobody(self):
+        """
+        Test SCENARIUSZA 2: Spadek punktów nikogo nie wyprzedza.
+        """
+        self.assertEqual(self._gain_points(50), [])
+        self.assertFalse(Notification.objects.exists())
+
+    def test_users_outside_top_10_are_not_notified(self):
+        """
+        Test SCENARIUSZA 3: Wyprzedzenie kogoś spoza TOP 10 nie generuje powiadomień.
+        """
+        for i in range(10):
+            CustomUser.objects.create_user(username=f"top{i}", email=f"top{i}@test.com", total_ranking_points=1000 + i)
+        ranking_index.ranking_index.invalidate()
+
+        self.assertEqual(self._gain_points(350), [])
+        self.assertFalse(Notification.objects.exists())
+
+    def test_cost_does_not_depend_on_table_size(self):
+        """
+        Test SCENARIUSZA 4: Jedno zapytanie zakresowe + jeden bulk_create + licznik.
+        """
+        ranking_index.ranking_index.top()
+        ContentType.objects.get_for_model(CustomUser)
+        CustomUser.objects.filter(pk=self.active.pk).update(total_ranking_points=350)
+        self.active.total_ranking_points = 350
+
+        with self.assertNumQueries(3):
+            overtaken = overtake_logic.notify_overtaken_users(self.active, 150, 350)
+
+        self.assertEqual(len(overtaken), 2)
+
+    def test_user_pushed_out_of_top_10_is_notified(self):
+        """
+        Test SCENARIUSZA 5: Osoba zepchnięta z 10. na 11. miejsce została wyprzedzona
+        w TOP 10 - liczy się jej miejsce sprzed awansu.
+        """
+        for i in range(6):
+            CustomUser.objects.create_user(username=f"top{i}", email=f"top{i}@test.com", total_ranking_points=1000 + i)
+        # Przed awansem: 6 x top, leader, second, third, tenth (10.), active (11.), behind.
+        CustomUser.objects.create_user(username="tenth", email="tenth@test.com", total_ranking_points=160)
+        ranking_index.ranking_index.invalidate()
+        self.assertEqual(ranking_index.ranking_index.rank_for_points(160), 10)
+
+        overtaken = self._gain_points(170)
+
+        self.assertEqual([u.username for u in overtaken], ["tenth"])
+        self.assertEqual(ranking_index.ranking_index.rank_of(self.active.pk), 10)
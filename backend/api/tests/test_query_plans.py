@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+from ..models import Friendship, Notification, ReadingExercise, UserProgress
+from ..services import overtake_logic, ranking_logic
+from ..views import FriendActivityFeedView, NotificationListView
+
+CustomUser = get_user_model()
+
+
+class HotQueryPlanTests(TestCase):
+    """
+    Sprawdza plany zapytań (EXPLAIN) dla gorących ścieżek.
+    Test nie przechodzi, jeśli któreś zapytanie skanuje całą tabelę.
+    """
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SET enable_seqscan = off")
+
+        self.user = CustomUser.objects.create_user(username="reader", email="reader@test.com")
+        self.friend = CustomUser.objects.create_user(username="friend", email="friend@test.com")
+        Friendship.objects.create(follower=self.user, followed=self.friend)
+
+        self.exercise = ReadingExercise.objects.create(title="Tekst", text="słowo " * 50, is_ranked=True)
+        for user in (self.user, self.friend):
+            UserProgress.objects.create(
+                user=user, exercise=self.exercise, wpm=300, accuracy=100,
+                counted_for_ranking=True, ranking_points=240
+            )
+
+    def _as_view(self, view_class):
+        view = view_class()
+        view.request = SimpleNamespace(user=self.user, query_params={})
+        view.kwargs = {}
+        return view
+
+    def assertNoTableScan(self, queryset, table):
+        plan = queryset.explain()
+
+        if connection.vendor == 'postgresql':
+            bad_lines = [line for line in plan.splitlines() if f"Seq Scan on {table}" in line]
+        else:
+            bad_lines = [line for line in plan.splitlines() if f"SCAN {table}" in line]
+
+        self.assertFalse(bad_lines, f"Pełny skan tabeli {table}:\n{plan}")
+
+    def test_last_ranked_attempt_uses_index(self):
+        queryset = ranking_logic.get_last_ranked_attempt_queryset(self.user, self.exercise)[:1]
+        self.assertNoTableScan(queryset, 'api_userprogress')
+
+    def test_daily_completion_check_uses_index(self):
+        today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        queryset = ranking_logic.get_daily_completion_queryset(self.user, self.exercise, today_start)
+        self.assertNoTableScan(queryset, 'api_userprogress')
+
+    def test_overtake_range_query_uses_index(self):
+        queryset = overtake_logic.get_overtaken_candidates_queryset(self.user, 100, 300)[:10]
+        self.assertNoTableScan(queryset, 'api_customuser')
+
+    def test_friend_feed_uses_index(self):
+        queryset = self._as_view(FriendActivityFeedView).get_queryset()
+        self.assertNoTableScan(queryset, 'api_userprogress')
+        self.assertNoTableScan(queryset, 'api_friendship')
+
+    def test_notification_list_uses_index(self):
+        Notification.objects.create(recipient=self.user, actor=self.friend, verb="test")
+        queryset = self._as_view(NotificationListView).get_queryset()
+        self.assertNoTableScan(queryset, 'api_notification')
+
+    def test_unread_notifications_use_index(self):
+        queryset = Notification.objects.filter(recipient=self.user, read=False)
+        self.assertNoTableScan(queryset, 'api_notification')
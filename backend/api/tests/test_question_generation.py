@@ -0,0 +1,330 @@
+import json
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from ..models import BackgroundJob, QuestionGenerationJob
+from ..services import job_queue, question_generation, rate_limiter
+
+CustomUser = get_user_model()
+
+CONTENT = "Kot domowy to udomowiony ssak z rodziny kotowatych, towarzyszący człowiekowi od tysięcy lat."
+
+
+def fake_questions(open_count, choice_count):
+    questions = [
+        {"question_type": "open", "text": f"Pytanie {i}?", "correct_answer": "kot",
+         "option_1": None, "option_2": None, "option_3": None, "option_4": None}
+        for i in range(open_count)
+    ]
+    questions += [
+        {"question_type": "choice", "text": f"Wybór {i}?", "correct_answer": "ssak",
+         "option_1": "ssak", "option_2": "ptak", "option_3": "ryba", "option_4": "płaz"}
+        for i in range(choice_count)
+    ]
+    return questions
+
+
+class FakeModel:
+    """Lokalny model zastępczy: odczytuje liczby pytań z promptu i zwraca JSON w ogrodzeniu Markdown."""
+    prompts = []
+    reply = None
+    error = None
+    delay = 0
+
+    def generate(self, prompt):
+        FakeModel.prompts.append(prompt)
+        time.sleep(FakeModel.delay)
+        if FakeModel.error is not None:
+            raise FakeModel.error
+        if FakeModel.reply is not None:
+            return FakeModel.reply
+        open_count = int(prompt.split("- ")[1].split(" ")[0])
+        choice_count = int(prompt.split("- ")[2].split(" ")[0])
+        return "```json\n" + json.dumps(fake_questions(open_count, choice_count)) + "\n```"
+
+
+@override_settings(AI_QUESTION_MODEL='api.tests.test_question_generation.FakeModel', JOB_QUEUE_SYNC=False)
+class QuestionGenerationJobTests(TestCase):
+
+    def setUp(self):
+        question_generation.reset_model()
+        FakeModel.prompts = []
+        FakeModel.reply = None
+        FakeModel.error = None
+        FakeModel.delay = 0
+        cache.clear()
+        self.admin = CustomUser.objects.create_user(username="admin", email="admin@test.com", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def tearDown(self):
+        question_generation.reset_model()
+
+    def submit(self, **overrides):
+        data = {'content': CONTENT, 'topic': 'Koty', 'total_count': 15, 'open_count': 10, 'choice_count': 5}
+        data.update(overrides)
+        return self.client.post('/api/ai/question-jobs/', data, format='json')
+
+    def test_submit_returns_job_id_without_calling_model(self):
+        """
+        Test SCENARIUSZA 1: Zlecenie zwraca id od razu (202), a model nie jest
+        wywoływany w żądaniu HTTP - dopiero przez workera.
+        """
+        response = self.submit()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertEqual(FakeModel.prompts, [])
+        self.assertTrue(BackgroundJob.objects.filter(name='ai.generate_questions').exists())
+
+    def test_worker_persists_result_for_polling(self):
+        """
+        Test SCENARIUSZA 2: Worker wykonuje zlecenie, a endpoint statusu zwraca pytania.
+        """
+        job_id = self.submit().data['job_id']
+
+        job_queue.run_worker(worker_id='w1', drain=True)
+
+        response = self.client.get(f'/api/ai/question-jobs/{job_id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(len(response.data['result']), 15)
+        self.assertEqual(response.data['result'][-1]['question_type'], 'choice')
+        self.assertEqual(len(FakeModel.prompts), 1)
+
+    def test_invalid_model_response_marks_job_failed(self):
+        """
+        Test SCENARIUSZA 3: Niepoprawny JSON z modelu kończy zlecenie błędem
+        (bez ponawiania), z komunikatem dla administratora.
+        """
+        FakeModel.reply = "to nie jest JSON"
+        job_id = self.submit().data['job_id']
+
+        job_queue.run_worker(worker_id='w1', drain=True)
+
+        job = QuestionGenerationJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, 'failed')
+        self.assertIn("niepoprawny format", job.error)
+        self.assertEqual(BackgroundJob.objects.get(name='ai.generate_questions').status, 'done')
+
+    def test_validation_and_permissions(self):
+        """
+        Test SCENARIUSZA 4: Walidacja parametrów, tylko administratorzy, a status
+        zlecenia widzi tylko jego autor.
+        """
+        self.assertEqual(self.submit(open_count=3, choice_count=3, total_count=6).status_code, 400)
+
+        job_id = self.submit().data['job_id']
+        other = CustomUser.objects.create_user(username="user", email="user@test.com")
+        self.client.force_authenticate(user=other)
+
+        self.assertEqual(self.submit().status_code, 403)
+        self.assertEqual(self.client.get(f'/api/ai/question-jobs/{job_id}/').status_code, 404)
+
+    def test_identical_request_is_served_from_cache(self):
+        """
+        Test SCENARIUSZA 5: Ten sam materiał (inne białe znaki, wielkość liter
+        tematu) drugi raz - zlecenie od razu zakończone, bez wywołania modelu.
+        """
+        self.submit()
+        job_queue.run_worker(worker_id='w1', drain=True)
+
+        response = self.submit(content="  " + CONTENT.replace(" ", "\n  "), topic="KOTY")
+
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(len(FakeModel.prompts), 1)
+        job = QuestionGenerationJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(len(job.result), 15)
+
+    def test_concurrent_identical_jobs_share_one_upstream_call(self):
+        """
+        Test SCENARIUSZA 6: Identyczne zlecenia w toku są łączone w jedno,
+        także gdy zleca je inny administrator.
+        """
+        first = self.submit().data['job_id']
+        other_admin = CustomUser.objects.create_user(username="admin2", email="admin2@test.com", is_staff=True)
+        self.client.force_authenticate(user=other_admin)
+        second = self.submit().data['job_id']
+
+        self.assertEqual(first, second)
+        self.assertEqual(BackgroundJob.objects.filter(name='ai.generate_questions').count(), 1)
+
+        job_queue.run_worker(worker_id='w1', drain=True)
+        self.assertEqual(len(FakeModel.prompts), 1)
+        self.assertEqual(self.client.get(f'/api/ai/question-jobs/{second}/').data['status'], 'done')
+
+    def test_force_refresh_bypasses_cache(self):
+        """
+        Test SCENARIUSZA 7: `force_refresh` wymusza nowe wywołanie modelu i odświeża cache.
+        """
+        self.submit()
+        job_queue.run_worker(worker_id='w1', drain=True)
+
+        response = self.submit(force_refresh=True)
+        self.assertEqual(response.data['status'], 'pending')
+
+        job_queue.run_worker(worker_id='w1', drain=True)
+        self.assertEqual(len(FakeModel.prompts), 2)
+
+    def test_single_flight_collapses_parallel_calls_in_process(self):
+        """
+        Test SCENARIUSZA 8: Równoległe identyczne wywołania w jednym procesie
+        czekają na wynik jednego zapytania do modelu.
+        """
+        FakeModel.delay = 0.2
+        params = question_generation.parse_params({'content': CONTENT, 'topic': 'Koty'})
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(question_generation.get_or_generate_questions(params, force_refresh=True)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(FakeModel.prompts), 1)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(result == results[0] for result in results))
+
+    @override_settings(JOB_MAX_ATTEMPTS=2)
+    def test_transient_errors_are_retried_by_the_queue(self):
+        """
+        Test SCENARIUSZA 11: Przekroczony limit AI (błąd przejściowy) nie kończy zlecenia -
+        kolejka ponawia zadanie, a zlecenie jest nieudane dopiero po ostatniej próbie.
+        """
+        FakeModel.error = rate_limiter.RateLimitTimeout("brak slotu")
+        job_id = self.submit().data['job_id']
+
+        job_queue.run_worker(worker_id='w1', drain=True)
+
+        background_job = BackgroundJob.objects.get(name='ai.generate_questions')
+        self.assertEqual(background_job.status, 'pending')
+        self.assertEqual(QuestionGenerationJob.objects.get(pk=job_id).status, 'running')
+
+        BackgroundJob.objects.update(run_after=timezone.now())
+        job_queue.run_worker(worker_id='w1', drain=True)
+
+        job = QuestionGenerationJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, 'failed')
+        self.assertIn("brak slotu", job.error)
+        self.assertEqual(BackgroundJob.objects.get(name='ai.generate_questions').status, 'failed')
+        self.assertEqual(len(FakeModel.prompts), 2)
+
+    def test_transient_error_then_success(self):
+        """
+        Test SCENARIUSZA 12: Po chwilowym błędzie ponowione zadanie kończy zlecenie wynikiem.
+        """
+        FakeModel.error = rate_limiter.RateLimitTimeout("brak slotu")
+        job_id = self.submit().data['job_id']
+        job_queue.run_worker(worker_id='w1', drain=True)
+
+        FakeModel.error = None
+        BackgroundJob.objects.update(run_after=timezone.now())
+        job_queue.run_worker(worker_id='w1', drain=True)
+
+        job = QuestionGenerationJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(len(job.result), 15)
+
+
+@override_settings(AI_QUESTION_MODEL='api.tests.test_question_generation.SectionModel', AI_SECTION_WORDS=40)
+class SectionedGenerationTests(TestCase):
+
+    def setUp(self):
+        question_generation.reset_model()
+        SectionModel.prompts = []
+        SectionModel.top_up_error = None
+
+    def tearDown(self):
+        question_generation.reset_model()
+
+    def test_long_content_is_generated_in_parallel_sections(self):
+        """
+        Test SCENARIUSZA 9: Długi materiał - sekcje generowane równolegle (czas jak
+        dla jednej sekcji), duplikaty między sekcjami usunięte, podział dokładny.
+        """
+        paragraph = " ".join(f"Zdanie {i} o kotach domowych." for i in range(8))
+        params = question_generation.GenerationParams(
+            content="\n\n".join([paragraph] * 3), topic="Koty", open_count=10, choice_count=5
+        )
+
+        started = time.monotonic()
+        questions = question_generation.generate_questions(params)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(len(SectionModel.prompts), 3)
+        self.assertLess(elapsed, 2 * SectionModel.delay)
+        self.assertEqual([q['question_type'] for q in questions], ['open'] * 10 + ['choice'] * 5)
+        self.assertEqual(len({q['text'] for q in questions}), 15)
+
+    def test_missing_questions_are_topped_up(self):
+        """
+        Test SCENARIUSZA 10: Gdy model zwróci za mało pytań, brakujące są
+        dogenerowane jednym dodatkowym wywołaniem.
+        """
+        SectionModel.shortfall = 3
+        params = question_generation.GenerationParams(content=CONTENT, topic="Koty", open_count=10, choice_count=5)
+
+        questions = question_generation.generate_questions(params)
+
+        self.assertEqual(len(SectionModel.prompts), 2)
+        self.assertEqual(len(questions), 15)
+        SectionModel.shortfall = 0
+
+    def test_failed_top_up_keeps_partial_result(self):
+        """
+        Test SCENARIUSZA 13: Przejściowy błąd dogenerowania (limit AI) nie wyrzuca
+        gotowych pytań - wynik jest częściowy, a błąd tylko logowany.
+        """
+        SectionModel.shortfall = 3
+        SectionModel.top_up_error = rate_limiter.RateLimitTimeout("brak slotu")
+        params = question_generation.GenerationParams(content=CONTENT, topic="Koty", open_count=10, choice_count=5)
+
+        with self.assertLogs('api.services.question_generation', level='WARNING') as logs:
+            questions = question_generation.generate_questions(params)
+
+        self.assertEqual(len(SectionModel.prompts), 2)
+        self.assertEqual(len(questions), 12)
+        self.assertIn("brak slotu", "\n".join(logs.output))
+        SectionModel.shortfall = 0
+
+
+class SectionModel:
+    """Model zastępczy dla sekcji: każda sekcja zwraca pytania częściowo identyczne z innymi sekcjami."""
+    prompts = []
+    delay = 0.3
+    shortfall = 0
+    top_up_error = None
+
+    def generate(self, prompt):
+        call = len(SectionModel.prompts)
+        SectionModel.prompts.append(prompt)
+        time.sleep(SectionModel.delay)
+        if call > 0 and SectionModel.top_up_error is not None:
+            raise SectionModel.top_up_error
+        open_count = int(prompt.split("- ")[1].split(" ")[0])
+        choice_count = int(prompt.split("- ")[2].split(" ")[0])
+        if call == 0 and SectionModel.shortfall:
+            open_count -= SectionModel.shortfall
+
+        questions = [open_question_for("Wspólne pytanie otwarte o kotach?")]
+        questions += [open_question_for(f"Pytanie otwarte {call}-{i} o kotach w sekcji?") for i in range(open_count - 1)]
+        questions += [
+            {"question_type": "choice", "text": f"Pytanie zamknięte {call}-{i} o kotach?", "correct_answer": "ssak",
+             "option_1": "ssak", "option_2": "ptak", "option_3": "ryba", "option_4": "płaz"}
+            for i in range(choice_count)
+        ]
+        return json.dumps(questions)
+
+
+def open_question_for(text):
+    return {"question_type": "open", "text": text, "correct_answer": "kot",
+            "option_1": None, "option_2": None, "option_3": None, "option_4": None}
@@ -0,0 +1,73 @@
+from django.test import SimpleTestCase
+
+from ..services import question_sections
+
+
+def open_question(text, answer="kot"):
+    return {"question_type": "open", "text": text, "correct_answer": answer,
+            "option_1": None, "option_2": None, "option_3": None, "option_4": None}
+
+
+def choice_question(text, answer="ssak"):
+    return {"question_type": "choice", "text": text, "correct_answer": answer,
+            "option_1": "ssak", "option_2": "ptak", "option_3": "ryba", "option_4": "płaz"}
+
+
+class SplitSectionsTests(SimpleTestCase):
+
+    def test_short_content_is_one_section(self):
+        """
+        Test SCENARIUSZA 1: Materiał mieszczący się w limicie nie jest dzielony.
+        """
+        content = "Krótki tekst o kotach."
+        self.assertEqual(question_sections.split_sections(content, max_words=100), [content])
+
+    def test_long_content_is_split_on_paragraphs_and_sentences(self):
+        """
+        Test SCENARIUSZA 2: Sekcje nie przekraczają limitu słów, a zdania nie są cięte.
+        """
+        paragraph = " ".join(f"Zdanie numer {i} jest tutaj." for i in range(10))
+        content = "\n\n".join([paragraph, "Krótki akapit.", paragraph])
+
+        sections = question_sections.split_sections(content, max_words=20)
+
+        self.assertGreater(len(sections), 3)
+        for section in sections:
+            self.assertLessEqual(len(section.split()), 20)
+        self.assertEqual(sum(len(s.split()) for s in sections), len(content.split()))
+        self.assertTrue(all(section.rstrip().endswith('.') for section in sections))
+
+    def test_allocate_is_proportional_and_exact(self):
+        """
+        Test SCENARIUSZA 3: Rozdział pytań proporcjonalny do długości sekcji, suma dokładna.
+        """
+        self.assertEqual(question_sections.allocate(10, [100, 100, 50]), [4, 4, 2])
+        self.assertEqual(sum(question_sections.allocate(7, [3, 3, 3])), 7)
+        self.assertEqual(question_sections.allocate(0, [1, 2]), [0, 0])
+
+
+class MergeQuestionsTests(SimpleTestCase):
+
+    def test_merge_drops_near_duplicates_invalid_and_extras(self):
+        """
+        Test SCENARIUSZA 4: Scalanie usuwa prawie-duplikaty, pytania o złym kształcie
+        i nadmiarowe pytania, zachowując kolejność: najpierw otwarte.
+        """
+        questions = [
+            choice_question("Do jakiej gromady należy kot?"),
+            open_question("Jak nazywa się zwierzę domowe?"),
+            open_question("Jak nazywa się  zwierzę domowe?!"),
+            open_question("Gdzie żyją koty?"),
+            choice_question("Jaki jest kot?", answer="niebieski"),
+            {"question_type": "essay", "text": "?", "correct_answer": "x"},
+            open_question("Ile lat żyje kot?"),
+        ]
+
+        merged = question_sections.merge_questions(questions, open_count=2, choice_count=1)
+
+        self.assertEqual([q['text'] for q in merged], [
+            "Jak nazywa się zwierzę domowe?",
+            "Gdzie żyją koty?",
+            "Do jakiej gromady należy kot?",
+        ])
+        self.assertEqual(question_sections.missing_counts(merged, 2, 2), (0, 1))
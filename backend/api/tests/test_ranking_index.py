@@ -0,0 +1,183 @@
+import random
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from ..services import ranking_index
+from ..services.ranking_index import RankingIndex
+
+CustomUser = get_user_model()
+
+
+class RankingIndexTests(TestCase):
+
+    def setUp(self):
+        self.alice = CustomUser.objects.create_user(username="alice", email="a@test.com", total_ranking_points=500)
+        self.bob = CustomUser.objects.create_user(username="bob", email="b@test.com", total_ranking_points=300)
+        self.carol = CustomUser.objects.create_user(username="carol", email="c@test.com", total_ranking_points=300)
+        self.dave = CustomUser.objects.create_user(username="dave", email="d@test.com", total_ranking_points=100)
+        self.newbie = CustomUser.objects.create_user(username="newbie", email="n@test.com")
+
+        self.index = RankingIndex(ttl=3600)
+
+    def test_rank_of_handles_ties_like_sql_rank(self):
+        """
+        Test SCENARIUSZA 1: Remis dzieli miejsce, kolejna osoba przeskakuje rangę.
+        """
+        self.assertEqual(self.index.rank_of(self.alice.id), 1)
+        self.assertEqual(self.index.rank_of(self.bob.id), 2)
+        self.assertEqual(self.index.rank_of(self.carol.id), 2)
+        self.assertEqual(self.index.rank_of(self.dave.id), 4)
+
+    def test_user_without_points_is_not_ranked(self):
+        """
+        Test SCENARIUSZA 2: Użytkownik z 0 punktów nie ma rangi.
+        """
+        self.assertIsNone(self.index.rank_of(self.newbie.id))
+
+    def test_top_limit_keeps_tied_entries(self):
+        """
+        Test SCENARIUSZA 3: Limit dotyczy rangi, więc remis na granicy zostaje.
+        """
+        top = self.index.top(limit=2)
+
+        self.assertEqual(
+            [(rank, user_id) for rank, user_id, _ in top],
+            [(1, self.alice.id), (2, self.bob.id), (2, self.carol.id)]
+        )
+
+    def test_update_moves_user_without_reloading(self):
+        """
+        Test SCENARIUSZA 4: Aktualizacja przyrostowa zmienia pozycję bez zapytań do bazy.
+        """
+        self.index.top()
+
+        with self.assertNumQueries(0):
+            self.index.update(self.dave.id, 600)
+            self.assertEqual(self.index.rank_of(self.dave.id), 1)
+            self.assertEqual(self.index.rank_of(self.alice.id), 2)
+
+            self.index.update(self.newbie.id, 50)
+            self.assertEqual(self.index.rank_of(self.newbie.id), 5)
+
+            self.index.update(self.bob.id, 0)
+            self.assertIsNone(self.index.rank_of(self.bob.id))
+
+    def test_rank_subset_ranks_within_the_subset(self):
+        """
+        Test SCENARIUSZA 5: Ranking znajomych liczy rangi tylko w obrębie zbioru.
+        """
+        subset = self.index.rank_subset([self.carol.id, self.dave.id, self.newbie.id])
+
+        self.assertEqual(
+            [(rank, user_id) for rank, user_id, _ in subset],
+            [(1, self.carol.id), (2, self.dave.id)]
+        )
+
+    def test_invalidate_reloads_from_database(self):
+        """
+        Test SCENARIUSZA 6: Po invalidate() indeks widzi zmiany zrobione poza nim.
+        """
+        self.index.top()
+        CustomUser.objects.filter(id=self.dave.id).update(total_ranking_points=1000)
+
+        self.assertEqual(self.index.rank_of(self.dave.id), 4)
+
+        self.index.invalidate()
+        self.assertEqual(self.index.rank_of(self.dave.id), 1)
+
+    def test_incremental_updates_match_full_sort(self):
+        """
+        Test SCENARIUSZA 7: Po wielu losowych aktualizacjach (także remisach i zerach)
+        rangi, czołówka, okno i strony zgadzają się z rankingiem liczonym od zera.
+        """
+        rng = random.Random(7)
+        index = RankingIndex(ttl=3600)
+        index.top()
+        points = {user.id: user.total_ranking_points for user in CustomUser.objects.all() if user.total_ranking_points}
+
+        for _ in range(500):
+            user_id, new_points = rng.randint(1, 60), rng.choice([0, rng.randint(1, 20)])
+            index.update(user_id, new_points)
+            if new_points:
+                points[user_id] = new_points
+            else:
+                points.pop(user_id, None)
+
+        ordered = sorted(points, key=lambda user_id: (-points[user_id], user_id))
+        expected = [(1 + sum(p > points[user_id] for p in points.values()), user_id, points[user_id]) for user_id in ordered]
+
+        self.assertEqual(index.top(), expected)
+        self.assertEqual(index.page(after=(expected[9][2], expected[9][1]), limit=5), expected[10:15])
+        self.assertEqual(index.around(ordered[20], radius=2), expected[18:23])
+        for rank, user_id, user_points in expected:
+            self.assertEqual(index.rank_of(user_id), rank)
+
+
+class LeaderboardPaginationTests(TestCase):
+
+    def setUp(self):
+        self.users = [
+            CustomUser.objects.create_user(
+                username=f"user{i}", email=f"u{i}@test.com", total_ranking_points=points
+            )
+            for i, points in enumerate([900, 800, 800, 700, 600, 500, 400])
+        ]
+        ranking_index.ranking_index.invalidate()
+
+    def test_pages_cover_every_user_once_in_rank_order(self):
+        """
+        Test SCENARIUSZA 1: Kolejne strony z kursorem dają pełny ranking bez duplikatów.
+        """
+        collected = []
+        cursor = None
+        while True:
+            rows, cursor = ranking_index.get_leaderboard_page(cursor=cursor, page_size=3)
+            collected.extend(rows)
+            if not cursor:
+                break
+
+        self.assertEqual([row['id'] for row in collected], [user.id for user in self.users])
+        self.assertEqual([row['rank'] for row in collected], [1, 2, 2, 4, 5, 6, 7])
+
+    def test_invalid_cursor_raises(self):
+        """
+        Test SCENARIUSZA 2: Uszkodzony kursor zgłasza InvalidCursor.
+        """
+        with self.assertRaises(ranking_index.InvalidCursor):
+            ranking_index.get_leaderboard_page(cursor="nie-kursor")
+
+    def test_around_me_returns_neighbours_only(self):
+        """
+        Test SCENARIUSZA 3: Tryb around=me zwraca tylko sąsiadów użytkownika.
+        """
+        rows = ranking_index.get_leaderboard_around(self.users[3], radius=1)
+
+        self.assertEqual([row['id'] for row in rows], [u.id for u in self.users[2:5]])
+        self.assertEqual([row['rank'] for row in rows], [2, 4, 5])
+
+    def test_around_me_for_unranked_user_is_empty(self):
+        """
+        Test SCENARIUSZA 4: Użytkownik bez punktów nie ma okna rankingu.
+        """
+        newbie = CustomUser.objects.create_user(username="newbie", email="n@test.com")
+
+        self.assertEqual(ranking_index.get_leaderboard_around(newbie, radius=3), [])
+
+    def test_page_ranks_and_points_come_from_one_snapshot(self):
+        """
+        Test SCENARIUSZA 5: Zmiana punktów w innym procesie (tu: update z pominięciem
+        indeksu) nie rozjeżdża rang i punktów na stronie - do przeładowania strona
+        pokazuje poprzedni stan, po przeładowaniu nowy, zawsze spójny.
+        """
+        ranking_index.get_leaderboard_page()
+        CustomUser.objects.filter(id=self.users[6].id).update(total_ranking_points=1000)
+
+        for reload in (False, True):
+            if reload:
+                ranking_index.ranking_index.invalidate()
+            rows, _ = ranking_index.get_leaderboard_page(page_size=10)
+
+            for row in rows:
+                self.assertEqual(row['rank'], 1 + sum(other['total_points'] > row['total_points'] for other in rows))
+            self.assertEqual(rows[0]['id'] == self.users[6].id, reload)
@@ -1,4 +1,5 @@
 from django.test import TestCase
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
@@ -17,6 +18,7 @@ class RankingLogicTests(TestCase):
         """
         Przygotuj wspólne obiekty dla wszystkich testów.
         """
+        cache.clear()
         self.user = CustomUser.objects.create_user(username="testuser", email="test@test.com")
         
         self.exercise_short = ReadingExercise.objects.create(
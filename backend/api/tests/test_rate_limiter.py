@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from ..services.rate_limiter import RateLimiter, RateLimitTimeout, get_ai_limiter
+
+
+def _acquire_in_child(path, rpm, burst, results):
+    limiter = RateLimiter('ai', path, rpm=rpm, burst=burst, concurrency=10)
+    limiter.release(limiter.acquire(timeout=5))
+    results.put(time.time())
+
+
+class RateLimiterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'limits.sqlite3')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def limiter(self, **kwargs):
+        config = {'rpm': 600, 'burst': 2, 'concurrency': 5}
+        config.update(kwargs)
+        return RateLimiter('ai', self.path, **config)
+
+    def test_burst_then_refill_rate(self):
+        """
+        Test SCENARIUSZA 1: Pierwsze `burst` zapytań przechodzi od razu,
+        kolejne czekają na uzupełnienie żetonów (600 rpm = 1 żeton na 0.1s).
+        """
+        limiter = self.limiter()
+
+        started = time.time()
+        for _ in range(2):
+            limiter.release(limiter.acquire())
+        self.assertLess(time.time() - started, 0.05)
+
+        limiter.release(limiter.acquire())
+        self.assertGreaterEqual(time.time() - started, 0.08)
+
+        metrics = limiter.metrics()
+        self.assertEqual(metrics['acquired'], 3)
+        self.assertGreater(metrics['max_wait_ms'], 50)
+
+    def test_state_is_shared_between_instances(self):
+        """
+        Test SCENARIUSZA 2: Dwa niezależne obiekty (jak dwa procesy) korzystają
+        z jednego kubełka w pliku.
+        """
+        first = self.limiter(rpm=6, burst=1)
+        second = self.limiter(rpm=6, burst=1)
+
+        first.release(first.acquire())
+
+        with self.assertRaises(RateLimitTimeout):
+            second.acquire(timeout=0.2)
+        self.assertEqual(second.metrics()['timeouts'], 1)
+
+    def test_concurrency_limit_and_queue_depth(self):
+        """
+        Test SCENARIUSZA 3: Przy zajętych slotach kolejne wywołanie czeka,
+        a metryki pokazują długość kolejki.
+        """
+        limiter = self.limiter(burst=10, concurrency=1)
+        lease = limiter.acquire()
+
+        acquired = threading.Event()
+
+        def waiter():
+            with limiter.slot(timeout=5):
+                acquired.set()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.2)
+
+        metrics = limiter.metrics()
+        self.assertEqual(metrics['in_flight'], 1)
+        self.assertEqual(metrics['queue_depth'], 1)
+        self.assertFalse(acquired.is_set())
+
+        limiter.release(lease)
+        thread.join(timeout=5)
+        self.assertTrue(acquired.is_set())
+        self.assertEqual(limiter.metrics()['queue_depth'], 0)
+
+    def test_expired_lease_frees_slot(self):
+        """
+        Test SCENARIUSZA 4: Slot procesu, który padł (brak release), wygasa po czasie lease.
+        """
+        limiter = RateLimiter('ai', self.path, rpm=600, burst=5, concurrency=1, lease_seconds=0.1)
+        limiter.acquire()
+
+        limiter.release(limiter.acquire(timeout=2))
+
+    def test_limit_is_enforced_across_processes(self):
+        """
+        Test SCENARIUSZA 5: Procesy potomne dzielą jeden limit - 4 zapytania przy
+        burst=2 i 600 rpm nie zmieszczą się w czasie krótszym niż ~2 żetony.
+        """
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        started = time.time()
+
+        processes = [
+            context.Process(target=_acquire_in_child, args=(self.path, 600, 2, results))
+            for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=10)
+
+        finished = sorted(results.get(timeout=1) for _ in processes)
+        self.assertGreaterEqual(finished[-1] - started, 0.18)
+        self.assertEqual(self.limiter().metrics()['acquired'], 4)
+
+    def test_ai_limiter_reads_settings(self):
+        """
+        Test SCENARIUSZA 6: Limiter AI jest konfigurowany z settings.
+        """
+        with override_settings(AI_RATE_LIMIT_DB=self.path, AI_RATE_LIMIT_RPM=42,
+                               AI_RATE_LIMIT_BURST=4, AI_RATE_LIMIT_CONCURRENCY=3):
+            limiter = get_ai_limiter()
+
+        self.assertEqual((limiter.rpm, limiter.burst, limiter.concurrency), (42, 4, 3))
+        self.assertEqual(limiter.path, self.path)
@@ -0,0 +1,150 @@
+import re
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..middleware import RequestProfilingMiddleware
+from ..models import ReadingExercise
+from ..services import request_profiler
+
+CustomUser = get_user_model()
+
+SERVER_TIMING_RE = re.compile(r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="SQL \((\d+)\)", app;dur=[\d.]+$')
+
+
+@override_settings(REQUEST_PROFILING_SAMPLE_RATE=1.0, REQUEST_PROFILING_SLOWEST_PER_VIEW=3)
+class RequestProfilingTests(TestCase):
+
+    def setUp(self):
+        request_profiler.profile_store.reset()
+        self.user = CustomUser.objects.create_user(username="czytelnik", email="czytelnik@test.com")
+        self.admin = CustomUser.objects.create_user(username="admin", email="admin@test.com", is_staff=True)
+        ReadingExercise.objects.create(title="Tekst", text="słowo " * 50)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def tearDown(self):
+        request_profiler.profile_store.reset()
+
+    def test_server_timing_header_and_profile(self):
+        """
+        Test SCENARIUSZA 1: Zmierzone żądanie ma nagłówek Server-Timing z czasem SQL
+        i liczbą zapytań, a profil trafia do widoku rozpoznanego po nazwie adresu.
+        """
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get('/api/exercises/')
+        self.assertEqual(response.status_code, 200)
+
+        match = SERVER_TIMING_RE.match(response['Server-Timing'])
+        self.assertIsNotNone(match, response['Server-Timing'])
+        queries = int(match.group(1))
+        self.assertGreater(queries, 0)
+
+        profile = request_profiler.profile_store.snapshot()['views']['exercise-list']
+        self.assertEqual(profile['count'], 1)
+        self.assertEqual(profile['avg_queries'], queries)
+        self.assertEqual(profile['slowest'][0]['path'], '/api/exercises/')
+        self.assertEqual(profile['slowest'][0]['status'], 200)
+
+        self.client.get('/api/nie-ma-takiego-adresu/')
+        self.assertIn(request_profiler.UNRESOLVED_VIEW, request_profiler.profile_store.snapshot()['views'])
+
+    def test_sampling_disabled(self):
+        """
+        Test SCENARIUSZA 2: Przy REQUEST_PROFILING_SAMPLE_RATE=0 żądania nie są mierzone
+        ani nie dostają nagłówka.
+        """
+        with self.settings(REQUEST_PROFILING_SAMPLE_RATE=0):
+            response = self.client.get('/api/exercises/')
+
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(request_profiler.profile_store.snapshot()['views'], {})
+
+    def test_slowest_requests_are_bounded_per_view(self):
+        """
+        Test SCENARIUSZA 3: Per widok pamiętamy tylko N najwolniejszych żądań (malejąco),
+        a agregaty obejmują wszystkie; liczba widoków też jest ograniczona.
+        """
+        store = request_profiler.RequestProfileStore(slowest_per_view=3, max_views=2)
+        for total_ms in [5, 50, 1, 30, 40, 2]:
+            store.record('widok', 'GET', f'/{total_ms}/', 200, total_ms, 0.5, 2)
+        store.record('drugi', 'GET', '/', 200, 1, 0, 0)
+        store.record('trzeci', 'GET', '/', 200, 1, 0, 0)
+
+        views = store.snapshot()['views']
+        self.assertEqual([entry['total_ms'] for entry in views['widok']['slowest']], [50, 40, 30])
+        self.assertEqual(views['widok']['count'], 6)
+        self.assertEqual(views['widok']['max_ms'], 50)
+        self.assertEqual(views['widok']['avg_queries'], 2)
+        self.assertEqual(set(views), {'widok', 'drugi', request_profiler.OTHER_VIEWS})
+
+    def test_profiles_endpoint_is_staff_only(self):
+        """
+        Test SCENARIUSZA 4: Profile żądań widzi tylko obsługa.
+        """
+        self.client.get('/api/exercises/')
+        self.assertEqual(self.client.get('/api/metrics/requests/').status_code, 403)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get('/api/metrics/requests/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['sample_rate'], 1.0)
+        self.assertIn('exercise-list', response.data['views'])
+
+    def test_server_timing_only_for_staff_or_debug(self):
+        """
+        Test SCENARIUSZA 5: Zwykły użytkownik nie dostaje nagłówka Server-Timing (profil
+        i tak jest zapisany), chyba że działa DEBUG.
+        """
+        response = self.client.get('/api/exercises/')
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(request_profiler.profile_store.snapshot()['views']['exercise-list']['count'], 1)
+
+        with self.settings(DEBUG=True):
+            response = self.client.get('/api/exercises/')
+        self.assertTrue(response.has_header('Server-Timing'))
+
+    def test_async_chain_and_streaming_responses(self):
+        """
+        Test SCENARIUSZA 6: Pod ASGI middleware jest korutyną i mierzy żądanie bez
+        przełączania na tryb synchroniczny; odpowiedzi strumieniowe są pomijane.
+        """
+        async def view(request):
+            return HttpResponse('ok')
+
+        async def stream(request):
+            return StreamingHttpResponse(iter(['dane']))
+
+        request = RequestFactory().get('/async/')
+        request.user = self.admin
+
+        middleware = RequestProfilingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = async_to_sync(middleware)(request)
+        self.assertTrue(response.has_header('Server-Timing'))
+        self.assertIn(request_profiler.UNRESOLVED_VIEW, request_profiler.profile_store.snapshot()['views'])
+
+        request_profiler.profile_store.reset()
+        response = async_to_sync(RequestProfilingMiddleware(stream))(request)
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(request_profiler.profile_store.snapshot()['views'], {})
+
+    async def test_asgi_counts_queries_of_sync_views(self):
+        """
+        Test SCENARIUSZA 7: Pod ASGI widok synchroniczny wykonuje zapytania w wątku
+        sync_to_async - licznik SQL musi je widzieć, a nie zwracać 0.
+        """
+        response = await AsyncClient().get(
+            '/api/ranking/leaderboard/', headers={'Authorization': f'Bearer {AccessToken.for_user(self.admin)}'},
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+        match = SERVER_TIMING_RE.match(response['Server-Timing'])
+        self.assertIsNotNone(match, response['Server-Timing'])
+        self.assertGreater(int(match.group(1)), 0)
+        profile = request_profiler.profile_store.snapshot()['views']['ranking-leaderboard']
+        self.assertGreater(profile['avg_queries'], 0)
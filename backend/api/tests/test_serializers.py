@@ -1,6 +1,14 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
-from ..serializers import UserSettingsSerializer
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
+from rest_framework.test import APIClient
+from ..models import DailyChallenge, ReadingExercise, Question, UserProgress
+from ..serializers import ReadingExerciseSummarySerializer, UserSettingsSerializer
+from ..views import ReadingExerciseList
 from ..wpm_milestones import DEFAULT_WPM_LIMIT
 from rest_framework.exceptions import ValidationError
 
@@ -62,4 +70,114 @@ class UserSettingsSerializerTests(TestCase):
             serializer_ok.is_valid(raise_exception=True)
             self.assertEqual(serializer_ok.validated_data['speed'], 40)
         except ValidationError:
-            self.fail("Serializer nie pozwolił na 40ms przy limicie 1500 WPM.")
\ No newline at end of file
+            self.fail("Serializer nie pozwolił na 40ms przy limicie 1500 WPM.")
+
+
+class ReadingExerciseListQueryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username="reader", email="reader@test.com")
+        self.admin = CustomUser.objects.create_user(username="admin", email="admin@test.com", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _create_exercises(self, count, with_challenges=True):
+        for i in range(count):
+            exercise = ReadingExercise.objects.create(
+                title=f"Tekst {i}", text="słowo " * 50,
+                is_public=True, is_ranked=True, created_by=self.admin
+            )
+            Question.objects.create(exercise=exercise, text="Pytanie?", correct_answer="tak")
+            if i % 2:
+                exercise.favorited_by.add(self.user)
+            if i % 3 == 0:
+                UserProgress.objects.create(
+                    user=self.user, exercise=exercise, wpm=300, accuracy=100, counted_for_ranking=True
+                )
+            if with_challenges and i == 1:
+                DailyChallenge.objects.create(date=timezone.now().date(), exercise=exercise)
+            if with_challenges and i == 2:
+                DailyChallenge.objects.create(date=timezone.now().date() + timedelta(days=3), exercise=exercise)
+
+    def _count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/exercises/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_list_query_count_does_not_grow_with_page_size(self):
+        self._create_exercises(3)
+        small_count, _ = self._count_list_queries()
+
+        self._create_exercises(30, with_challenges=False)
+        large_count, _ = self._count_list_queries()
+
+        self.assertEqual(small_count, large_count)
+        self.assertLessEqual(large_count, 6)
+
+    def test_preloaded_fields_match_per_object_values(self):
+        self._create_exercises(4)
+        _, response = self._count_list_queries()
+
+        by_title = {item['title']: item for item in response.json()['results']}
+        self.assertFalse(by_title['Tekst 0']['is_favorite'])
+        self.assertTrue(by_title['Tekst 1']['is_favorite'])
+        self.assertTrue(by_title['Tekst 1']['is_today_daily'])
+        self.assertFalse(by_title['Tekst 2']['is_today_daily'])
+        self.assertEqual(
+            by_title['Tekst 2']['scheduled_date'],
+            (timezone.now().date() + timedelta(days=3)).isoformat()
+        )
+        self.assertEqual(by_title['Tekst 0']['user_attempt_status'], 'training_cooldown')
+        self.assertEqual(by_title['Tekst 1']['user_attempt_status'], 'rankable')
+        self.assertTrue(by_title['Tekst 0']['created_by_is_admin'])
+
+    def test_list_returns_excerpt_instead_of_full_text(self):
+        ReadingExercise.objects.create(
+            title="Długi", text="słowo " * 500, is_public=True, created_by=self.admin
+        )
+
+        item = self.client.get('/api/exercises/').json()['results'][0]
+
+        self.assertNotIn('text', item)
+        self.assertNotIn('questions', item)
+        self.assertTrue(item['excerpt'].endswith('…'))
+        self.assertLessEqual(len(item['excerpt']), 301)
+        self.assertEqual(item['word_count'], 500)
+
+    def test_excerpt_is_marked_only_when_text_was_cut(self):
+        exact = "słowo " * 49 + "koniec"
+        at_word_boundary = exact + " dalej"
+        ReadingExercise.objects.create(title="Dokładnie", text=exact, is_public=True, created_by=self.admin)
+        ReadingExercise.objects.create(title="Granica", text=at_word_boundary, is_public=True, created_by=self.admin)
+
+        by_title = {item['title']: item for item in self.client.get('/api/exercises/').json()['results']}
+
+        self.assertEqual(len(exact), ReadingExerciseSummarySerializer.EXCERPT_CHARS)
+        self.assertEqual(by_title['Dokładnie']['excerpt'], exact)
+        self.assertEqual(by_title['Granica']['excerpt'], exact + '…')
+
+    def test_cursor_pagination_works_for_every_sort_option(self):
+        for i in range(7):
+            ReadingExercise.objects.create(
+                title=f"Tekst {i % 3}-{i}", text="słowo " * (10 + i % 2),
+                is_public=True, created_by=self.admin, is_daily_candidate=(i % 3 == 0),
+            )
+        # Remisy po pierwszym polu sortowania (także created_at) rozstrzyga id.
+        ReadingExercise.objects.update(created_at=timezone.now())
+        self.client.force_authenticate(self.admin)
+
+        for sort_by in ['title_asc', 'title_desc', 'word_count_asc', 'word_count_desc', 'created_at_asc', '',
+                        'daily_priority']:
+            seen = []
+            url = f'/api/exercises/?page_size=2&sort_by={sort_by}'
+            while url:
+                data = self.client.get(url).json()
+                seen.extend(item['id'] for item in data['results'])
+                url = data['next']
+
+            ordering = (ReadingExerciseList.SORT_ORDERINGS.get(sort_by, ReadingExerciseList.DEFAULT_ORDERING)
+                        if sort_by != 'daily_priority' else ('-is_daily_candidate', '-created_at', '-id'))
+            expected = list(ReadingExercise.objects.order_by(*ordering).values_list('id', flat=True))
+            self.assertEqual(seen, expected, sort_by)
@@ -92,4 +92,74 @@ class StatsLogicTests(TestCase):
         self.assertEqual(self.user.total_ranking_points, 100)
         self.assertEqual(self.user.ranking_exercises_completed, 1)
         self.assertEqual(self.user.current_streak, 5)
-        self.assertEqual(self.user.max_streak, 10)
\ No newline at end of file
+        self.assertEqual(self.user.max_streak, 10)
+
+class IncrementalStatsTests(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="testuser", email="test@test.com")
+        self.exercise = ReadingExercise.objects.create(title="Test", text="test", is_ranked=True)
+
+    def _create_progress(self, wpm, accuracy, points, counted=True):
+        return UserProgress.objects.create(
+            user=self.user,
+            exercise=self.exercise,
+            wpm=wpm,
+            accuracy=accuracy,
+            ranking_points=points,
+            counted_for_ranking=counted
+        )
+
+    def test_record_attempt_updates_running_sums_and_averages(self):
+        stats_logic.record_attempt(self.user, self._create_progress(100, 100, 100))
+        stats_logic.record_attempt(self.user, self._create_progress(201, 70, 50))
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.total_ranking_points, 150)
+        self.assertEqual(self.user.ranking_exercises_completed, 2)
+        self.assertEqual(self.user.ranking_wpm_sum, 301)
+        self.assertEqual(self.user.average_wpm, 150.5)
+        self.assertEqual(self.user.average_accuracy, 85.0)
+
+    def test_record_attempt_ignores_failed_and_non_counted(self):
+        self.assertFalse(stats_logic.record_attempt(self.user, self._create_progress(300, 40, 0)))
+        self.assertFalse(stats_logic.record_attempt(self.user, self._create_progress(300, 100, 0, counted=False)))
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.ranking_exercises_completed, 0)
+        self.assertEqual(self.user.average_wpm, 0)
+
+    def test_record_attempt_does_not_aggregate_history(self):
+        for _ in range(5):
+            self._create_progress(100, 100, 100)
+
+        progress = self._create_progress(100, 100, 100)
+
+        with self.assertNumQueries(2):
+            stats_logic.record_attempt(self.user, progress)
+
+    def test_revert_attempt_restores_previous_state(self):
+        first = self._create_progress(100, 100, 100)
+        second = self._create_progress(300, 80, 240)
+        stats_logic.record_attempt(self.user, first)
+        stats_logic.record_attempt(self.user, second)
+
+        stats_logic.revert_attempt(self.user, first)
+
+        self.assertEqual(self.user.total_ranking_points, 240)
+        self.assertEqual(self.user.ranking_exercises_completed, 1)
+        self.assertEqual(self.user.average_wpm, 300.0)
+        self.assertEqual(self.user.average_accuracy, 80.0)
+
+        stats_logic.revert_attempt(self.user, second)
+        self.assertEqual(self.user.ranking_exercises_completed, 0)
+        self.assertEqual(self.user.average_wpm, 0)
+
+    def test_running_sums_match_full_recompute(self):
+        for wpm, accuracy, points in [(120, 100, 96), (340, 75, 255), (500, 60, 300)]:
+            stats_logic.record_attempt(self.user, self._create_progress(wpm, accuracy, points))
+
+        self.user.refresh_from_db()
+        expected = stats_logic.compute_user_stats(self.user)
+        for field, value in expected.items():
+            self.assertAlmostEqual(getattr(self.user, field), value, places=1)
@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import Achievement, BackgroundJob, DailyChallenge, Notification, ReadingExercise, UserProgress
+from ..services import ranking_index, submission_service
+from ..services.challenge_service import get_today_challenge
+
+CustomUser = get_user_model()
+
+# Maksymalna liczba zapytań SQL (łącznie z SAVEPOINT/RELEASE) na jedno zgłoszenie.
+# Osiągnięcia, limit WPM i powiadomienia idą do kolejki zadań (jeden INSERT).
+QUERY_BUDGET = {
+    'first_ranked': 10,
+    'cooldown': 7,
+    'daily_challenge': 9,
+    'failed_accuracy': 7,
+}
+
+
+class SubmissionPipelineTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        ranking_index.ranking_index.invalidate()
+
+        self.user = CustomUser.objects.create_user(username="reader", email="reader@test.com")
+        self.exercise = ReadingExercise.objects.create(title="Tekst", text="słowo " * 400, is_ranked=True)
+        self.daily_exercise = ReadingExercise.objects.create(title="Wyzwanie", text="słowo " * 400, is_ranked=True)
+        DailyChallenge.objects.create(date=timezone.now().date(), exercise=self.daily_exercise)
+
+        # Rozgrzewka cache wyzwania dnia i indeksu rankingu - mierzymy sam potok.
+        with self.captureOnCommitCallbacks(execute=True):
+            get_today_challenge()
+        ranking_index.ranking_index.top()
+
+    def _submit(self, exercise, accuracy=100, reading_time_ms=60000):
+        return submission_service.process_exercise_submission(self.user, exercise, reading_time_ms, accuracy)
+
+    def _submit_within_budget(self, scenario, exercise, **kwargs):
+        with CaptureQueriesContext(connection) as ctx:
+            result = self._submit(exercise, **kwargs)
+        self.assertLessEqual(
+            len(ctx), QUERY_BUDGET[scenario],
+            f"Scenariusz '{scenario}' przekroczył budżet zapytań:\n" +
+            "\n".join(query['sql'] for query in ctx.captured_queries)
+        )
+        return result
+
+    def test_first_ranked_attempt_within_budget(self):
+        """
+        Test SCENARIUSZA 1: Pierwsza próba rankingowa mieści się w budżecie zapytań.
+        """
+        result = self._submit_within_budget('first_ranked', self.exercise)
+
+        self.assertTrue(result.progress.counted_for_ranking)
+        self.assertEqual(result.progress.attempt_number, 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.total_ranking_points, result.progress.ranking_points)
+
+    def test_attempt_within_cooldown_within_budget(self):
+        """
+        Test SCENARIUSZA 2: Próba w okresie karencji nie liczy się do rankingu.
+        """
+        self._submit(self.exercise)
+
+        result = self._submit_within_budget('cooldown', self.exercise)
+
+        self.assertFalse(result.progress.counted_for_ranking)
+        self.assertEqual(result.progress.attempt_number, 2)
+        self.assertEqual(UserProgress.objects.filter(user=self.user, counted_for_ranking=True).count(), 1)
+
+    def test_daily_challenge_within_budget_and_bonus_added_once(self):
+        """
+        Test SCENARIUSZA 3: Wyzwanie dnia dostaje bonus +50 dokładnie raz.
+        """
+        regular = self._submit(self.exercise)
+        daily = self._submit_within_budget('daily_challenge', self.daily_exercise)
+
+        self.assertTrue(daily.progress.completed_daily_challenge)
+        self.assertEqual(daily.progress.ranking_points, regular.progress.ranking_points + 50)
+
+    def test_failed_accuracy_within_budget(self):
+        """
+        Test SCENARIUSZA 4: Niezaliczona próba nie zmienia punktów.
+        """
+        result = self._submit_within_budget('failed_accuracy', self.exercise, accuracy=40)
+
+        self.assertEqual(result.progress.ranking_points, 0)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.total_ranking_points, 0)
+
+    def test_repeated_daily_challenge_is_training_only(self):
+        """
+        Test SCENARIUSZA 5: Drugie zaliczenie wyzwania tego samego dnia nie daje punktów.
+        """
+        self._submit(self.daily_exercise)
+        second = self._submit(self.daily_exercise)
+
+        self.assertFalse(second.progress.counted_for_ranking)
+        self.assertFalse(second.progress.completed_daily_challenge)
+        self.assertEqual(second.progress.ranking_points, 0)
+
+    def test_streak_is_persisted(self):
+        """
+        Test SCENARIUSZA 6: Seria jest zapisywana w bazie w tej samej transakcji.
+        """
+        self.user.last_streak_date = timezone.now().date() - timedelta(days=1)
+        self.user.current_streak = 4
+        self.user.save()
+
+        self._submit(self.exercise)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.current_streak, 5)
+        self.assertEqual(self.user.last_streak_date, timezone.now().date())
+
+    def test_side_effects_run_after_commit(self):
+        """
+        Test SCENARIUSZA 7: Osiągnięcia i limit WPM są przyznawane dopiero po commicie.
+        """
+        Achievement.objects.create(slug='accuracy_100', title='Snajper', description='100%')
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self._submit(self.exercise)
+
+        self.assertFalse(self.user.achievements.exists())
+        self.assertEqual(BackgroundJob.objects.filter(status=BackgroundJob.STATUS_PENDING).count(), 3)
+
+        for callback in callbacks:
+            callback()
+
+        self.assertTrue(self.user.achievements.filter(achievement__slug='accuracy_100').exists())
+        self.assertFalse(BackgroundJob.objects.exclude(status=BackgroundJob.STATUS_DONE).exists())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.max_wpm_limit, 500)
+        self.assertTrue(Notification.objects.filter(recipient=self.user, verb__contains="500 WPM").exists())
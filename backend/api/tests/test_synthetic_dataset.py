@@ -0,0 +1,76 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, F
+from django.test import TestCase
+
+from ..models import CustomUser, Friendship, Notification, Question, ReadingExercise, UserProgress
+from ..services import stats_logic, synthetic_dataset
+
+SCALE = 0.0005  # 50 użytkowników, 5 ćwiczeń
+
+
+def snapshot():
+    users = list(CustomUser.objects.filter(username__startswith=synthetic_dataset.USERNAME_PREFIX)
+                 .order_by('username').values_list('username', 'total_ranking_points', 'current_streak', 'unread_notifications'))
+    progress = list(UserProgress.objects.order_by('user__username', 'completed_at', 'exercise__title')
+                    .values_list('user__username', 'exercise__title', 'wpm', 'accuracy', 'counted_for_ranking', 'ranking_points'))
+    return users, progress
+
+
+class SeedScaleTests(TestCase):
+
+    def test_generates_consistent_dataset(self):
+        """
+        Test SCENARIUSZA 1: Wygenerowane dane mają zależności jak z aplikacji: pytania
+        tylko w ćwiczeniach rankingowych, zdenormalizowane statystyki zgodne z historią,
+        licznik nieprzeczytanych zgodny z powiadomieniami.
+        """
+        call_command('seed_scale', scale=SCALE, seed=7, stdout=StringIO())
+
+        self.assertEqual(CustomUser.objects.filter(username__startswith='seed_').count(), 50)
+        self.assertEqual(ReadingExercise.objects.count(), 5)
+        self.assertFalse(Question.objects.filter(exercise__is_ranked=False).exists())
+        self.assertGreater(UserProgress.objects.count(), 200)
+        self.assertGreater(Friendship.objects.count(), 0)
+        self.assertFalse(Friendship.objects.filter(follower=F('followed')).exists())
+
+        for user in CustomUser.objects.filter(username__startswith='seed_'):
+            expected = stats_logic.compute_user_stats(user)
+            for field, value in expected.items():
+                self.assertAlmostEqual(getattr(user, field), value, places=1, msg=f'{user.username}.{field}')
+            self.assertEqual(user.unread_notifications, Notification.objects.filter(recipient=user, read=False).count())
+            self.assertLessEqual(user.current_streak, user.max_streak)
+
+    def test_ranking_rules_and_timestamps(self):
+        """
+        Test SCENARIUSZA 2: Daty prób pochodzą z generatora (nie z auto_now_add), a dla pary
+        użytkownik-ćwiczenie do rankingu liczy się najwyżej jedna próba, z kolejnym numerem.
+        """
+        call_command('seed_scale', scale=SCALE, seed=3, stdout=StringIO())
+
+        self.assertGreater(UserProgress.objects.dates('completed_at', 'day').count(), 30)
+        duplicated = (UserProgress.objects.filter(counted_for_ranking=True)
+                      .values('user', 'exercise').annotate(n=Count('id')).filter(n__gt=1))
+        self.assertFalse(duplicated.exists())
+        self.assertFalse(UserProgress.objects.filter(counted_for_ranking=False, exercise__is_ranked=False,
+                                                     ranking_points__gt=0).exists())
+        self.assertTrue(UserProgress._meta.get_field('completed_at').auto_now_add)
+
+    def test_same_seed_gives_same_data(self):
+        """
+        Test SCENARIUSZA 3: To samo ziarno daje te same dane; ponowne uruchomienie
+        wymaga --reset i zastępuje poprzednie dane.
+        """
+        call_command('seed_scale', scale=SCALE, seed=11, stdout=StringIO())
+        first = snapshot()
+
+        with self.assertRaises(CommandError):
+            call_command('seed_scale', scale=SCALE, seed=11, stdout=StringIO())
+
+        call_command('seed_scale', scale=SCALE, seed=11, reset=True, stdout=StringIO())
+        self.assertEqual(snapshot(), first)
+
+        call_command('seed_scale', scale=SCALE, seed=12, reset=True, stdout=StringIO())
+        self.assertNotEqual(snapshot(), first)
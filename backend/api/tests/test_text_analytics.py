@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from ..models import ReadingExercise
+from ..services import text_analytics
+
+
+class TextAnalyticsTests(SimpleTestCase):
+
+    def test_word_count_matches_str_split_and_stops_early(self):
+        """
+        Test SCENARIUSZA 1: Liczba słów zgadza się z str.split(), a `stop_after`
+        przerywa liczenie po podanej liczbie słów.
+        """
+        text = "  Ala\tma\nkota ,  a kot ma Alę.  "
+
+        self.assertEqual(text_analytics.count_words(text), len(text.split()))
+        self.assertEqual(text_analytics.count_words(text, stop_after=3), 3)
+        self.assertEqual(text_analytics.count_words(""), 0)
+
+    def test_clean_text_matches_previous_regex_cleaning(self):
+        """
+        Test SCENARIUSZA 2: Czyszczenie tekstu daje ten sam wynik co wcześniejsze
+        dwa przebiegi wyrażeń regularnych, ale czyta tylko potrzebne słowa.
+        """
+        text = "Kot (łac. Felis) - ssak, żyjący; «domowo» 100% czasu!"
+
+        self.assertEqual(text_analytics.clean_text(text), "Kot łac Felis ssak żyjący domowo 100 czasu")
+        self.assertEqual(text_analytics.clean_text(text, 3), "Kot łac Felis")
+
+    def test_analyze_counts_sentences_and_readability(self):
+        """
+        Test SCENARIUSZA 3: Zdania, średnia długość słowa i indeks FOG-PL.
+        """
+        stats = text_analytics.analyze("Ala ma kota. Kot ma Alę! Niepodległościowy tekst")
+
+        self.assertEqual(stats.word_count, 8)
+        self.assertEqual(stats.sentence_count, 3)
+        self.assertEqual(stats.avg_word_length, round(39 / 8, 2))
+        # 8/3 słowa na zdanie + 12.5% trudnych słów (1 z 8 ma >= 4 sylaby)
+        self.assertEqual(stats.readability_score, round(0.4 * (8 / 3 + 12.5), 2))
+
+    def test_syllables_ignore_softening_i(self):
+        """
+        Test SCENARIUSZA 4: 'i' przed samogłoską nie tworzy osobnej sylaby.
+        """
+        self.assertEqual(text_analytics.count_syllables("nie"), 1)
+        self.assertEqual(text_analytics.count_syllables("siano"), 2)
+        self.assertEqual(text_analytics.count_syllables("Polska"), 2)
+
+
+class ReadingExerciseTextStatsTests(TestCase):
+
+    def test_stats_recomputed_only_when_text_changes(self):
+        """
+        Test SCENARIUSZA 5: Statystyki liczone przy utworzeniu i zmianie tekstu,
+        ale nie przy zapisie samej flagi.
+        """
+        exercise = ReadingExercise.objects.create(title="T", text="Ala ma kota. Kot ma Alę.")
+        self.assertEqual(exercise.word_count, 6)
+        self.assertEqual(exercise.sentence_count, 2)
+        self.assertEqual(exercise.text_hash, text_analytics.content_hash(exercise.text))
+
+        with mock.patch.object(text_analytics, 'analyze', wraps=text_analytics.analyze) as analyze:
+            exercise.is_public = True
+            exercise.save()
+            exercise.save(update_fields=['is_public'])
+            self.assertEqual(analyze.call_count, 0)
+
+            exercise.text = "Jedno zdanie."
+            exercise.save(update_fields=['text'])
+            self.assertEqual(analyze.call_count, 1)
+
+        exercise.refresh_from_db()
+        self.assertEqual(exercise.word_count, 2)
+        self.assertEqual(exercise.sentence_count, 1)
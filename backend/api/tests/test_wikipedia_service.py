@@ -0,0 +1,203 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from ..services import wikipedia_service, wikipedia_cache
+
+CustomUser = get_user_model()
+
+PAGES = {
+    101: ("Kot", "Kot domowy, to ssak z rodziny kotowatych."),
+    102: ("Pies", "Pies domowy; udomowiony ssak drapieżny."),
+    103: ("Koń", "Koń (łac. Equus) to duże zwierzę."),
+}
+
+
+class FakeWikipedia(BaseHTTPRequestHandler):
+    """
+    Zastępczy serwer API MediaWiki: generator=search zwraca wyciąg tylko dla
+    pierwszej strony (jak prawdziwe API bez exintro), reszta przez pageids.
+    """
+    requests_seen = []
+    delays = {}
+
+    def do_GET(self):
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        FakeWikipedia.requests_seen.append(params)
+
+        if params.get('generator') == 'search':
+            pages = {}
+            for index, (pageid, (title, text)) in enumerate(PAGES.items(), start=1):
+                page = {'pageid': pageid, 'title': title, 'index': index}
+                if index == 1:
+                    page['extract'] = text
+                pages[str(pageid)] = page
+            # Kolejność słownika celowo odwrócona - liczy się pole 'index'.
+            body = {'query': {'pages': dict(reversed(list(pages.items())))}}
+        else:
+            pageid = int(params['pageids'])
+            time.sleep(FakeWikipedia.delays.get(pageid, 0))
+            title, text = PAGES[pageid]
+            body = {'query': {'pages': {str(pageid): {'pageid': pageid, 'title': title, 'extract': text}}}}
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeWikipediaMixin:
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeWikipedia)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.api_url = f"http://127.0.0.1:{cls.server.server_port}/w/api.php"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        FakeWikipedia.requests_seen = []
+        FakeWikipedia.delays = {}
+        cache.clear()
+        wikipedia_cache.clear_local()
+        wikipedia_cache.search_cache.reset_stats()
+        wikipedia_cache.extract_cache.reset_stats()
+
+
+class WikipediaServiceTests(FakeWikipediaMixin, SimpleTestCase):
+
+    def test_search_uses_one_search_call_and_fetches_missing_extracts(self):
+        """
+        Test SCENARIUSZA 1: Jedno zapytanie wyszukiwania z wyciągami,
+        brakujące wyciągi dociągnięte osobno, kolejność wg trafności.
+        """
+        with override_settings(WIKIPEDIA_API_URL=self.api_url):
+            results = wikipedia_service.search_extracts("zwierzęta", num_results=3, limit=3)
+
+        self.assertEqual([r['title'] for r in results], ["Kot", "Pies", "Koń"])
+        self.assertEqual(results[0]['snippet'], "Kot domowy to")
+        self.assertEqual(results[2]['snippet'], "Koń łac Equus")
+
+        search_calls = [p for p in FakeWikipedia.requests_seen if p.get('generator') == 'search']
+        extract_calls = sorted(p['pageids'] for p in FakeWikipedia.requests_seen if 'pageids' in p)
+        self.assertEqual(len(search_calls), 1)
+        self.assertEqual(extract_calls, ['102', '103'])
+
+    def test_slow_extracts_run_concurrently(self):
+        """
+        Test SCENARIUSZA 2: Wyciągi pobierane są równolegle - dwa wolne
+        zapytania trwają tyle co jedno.
+        """
+        FakeWikipedia.delays = {102: 0.5, 103: 0.5}
+
+        started = time.monotonic()
+        with override_settings(WIKIPEDIA_API_URL=self.api_url):
+            results = wikipedia_service.search_extracts("zwierzęta", num_results=3)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(len(results), 3)
+        self.assertLess(elapsed, 0.95)
+
+    def test_deadline_skips_pages_that_did_not_arrive_in_time(self):
+        """
+        Test SCENARIUSZA 3: Po przekroczeniu budżetu czasu zwracamy to, co
+        zdążyło przyjść, zamiast czekać na wolną stronę.
+        """
+        FakeWikipedia.delays = {103: 2}
+
+        started = time.monotonic()
+        with override_settings(WIKIPEDIA_API_URL=self.api_url):
+            results = wikipedia_service.search_extracts("zwierzęta", num_results=3, deadline_seconds=0.5)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual([r['title'] for r in results], ["Kot", "Pies"])
+        self.assertLess(elapsed, 1.5)
+
+
+class WikipediaCacheTests(FakeWikipediaMixin, SimpleTestCase):
+
+    def test_repeated_query_is_served_without_http(self):
+        """
+        Test SCENARIUSZA 4: Powtórzone (znormalizowane) zapytanie nie wykonuje
+        żadnego żądania HTTP; liczniki odnotowują chybienia i trafienia.
+        """
+        with override_settings(WIKIPEDIA_API_URL=self.api_url):
+            first = wikipedia_service.search_extracts("Zwierzęta", num_results=3, limit=3)
+            requests_after_first = len(FakeWikipedia.requests_seen)
+            second = wikipedia_service.search_extracts("  zwierzęta ", num_results=3, limit=3)
+
+        self.assertEqual(first, second)
+        self.assertEqual(requests_after_first, 3)
+        self.assertEqual(len(FakeWikipedia.requests_seen), 3)
+
+        stats = wikipedia_cache.stats()
+        self.assertEqual(stats['search']['misses'], 1)
+        self.assertEqual(stats['search']['local_hits'], 1)
+        self.assertEqual(stats['extracts']['local_hits'], 3)
+
+    def test_shared_cache_survives_loss_of_local_cache(self):
+        """
+        Test SCENARIUSZA 5: Po wyczyszczeniu L1 (np. nowy proces) dane są
+        czytane z L2, a limit słów jest stosowany do oczyszczonego tekstu z cache.
+        """
+        with override_settings(WIKIPEDIA_API_URL=self.api_url):
+            wikipedia_service.search_extracts("zwierzęta", num_results=3, limit=3)
+            wikipedia_cache.clear_local()
+            results = wikipedia_service.search_extracts("zwierzęta", num_results=3, limit=5)
+
+        self.assertEqual(len(FakeWikipedia.requests_seen), 3)
+        self.assertEqual(results[0]['snippet'], "Kot domowy to ssak z")
+        self.assertEqual(wikipedia_cache.stats()['search']['shared_hits'], 1)
+
+    def test_lru_evicts_least_recently_used_and_expires_entries(self):
+        """
+        Test SCENARIUSZA 6: LRU usuwa najdawniej używany wpis i wygasza wpisy po TTL.
+        """
+        lru = wikipedia_cache.LRUCache(max_entries=2)
+        lru.set('a', 1, ttl=60)
+        lru.set('b', 2, ttl=60)
+        lru.get('a')
+        lru.set('c', 3, ttl=60)
+
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+
+        lru.set('d', 4, ttl=-1)
+        self.assertIsNone(lru.get('d'))
+
+
+class SearchExercisesViewTests(FakeWikipediaMixin, TestCase):
+
+    def test_view_returns_results_from_service(self):
+        """
+        Test SCENARIUSZA 7: Endpoint wyszukiwania zwraca wyniki w dotychczasowym formacie.
+        """
+        user = CustomUser.objects.create_user(username="reader", email="reader@test.com", password="pass")
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        with override_settings(WIKIPEDIA_API_URL=self.api_url):
+            response = client.get('/api/exercises/search/', {'query': 'zwierzęta', 'num_results': 3})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(response.data['results'][1], {"title": "Pies", "snippet": "Pies domowy udomowiony ssak drapieżny"})
@@ -1,9 +1,9 @@
 from django.urls import path
 from .views import ( 
-    NotificationListView,
-    MarkAllNotificationsAsReadView, GoogleLoginView, MyStatsView, QuestionListView, ReadingExerciseRetrieveUpdateDestroyView, FriendActivityFeedView, UserSearchView, FollowingListView, FollowView, UnfollowView, FriendsLeaderboardView, generate_ai_questions, ExerciseAttemptStatusView, UserProgressHistoryView, TodayChallengeView, 
+    NotificationListView, NotificationUnreadCountView, notification_stream,
+    MarkAllNotificationsAsReadView, GoogleLoginView, MyStatsView, QuestionListView, ReadingExerciseRetrieveUpdateDestroyView, FriendActivityFeedView, UserSearchView, FollowingListView, FollowView, UnfollowView, FriendsLeaderboardView, generate_ai_questions, QuestionGenerationJobCreateView, QuestionGenerationJobDetailView, AiMetricsView, RequestProfilesView, ExerciseAttemptStatusView, UserProgressHistoryView, TodayChallengeView, 
     UserAchievementsView, UserStatusView, toggle_favorite, LeaderboardView, 
-    ReadingExerciseCreate, SearchExercises, UserSettingsView, RegisterView, 
+    ReadingExerciseCreate, SearchExercises, WikipediaCacheStatsView, UserSettingsView, RegisterView, 
     ReadingExerciseList, SubmitProgress, CollectionListView, CollectionDetailView
 )
 from .views import MyTokenObtainPairView  
@@ -18,11 +18,14 @@ urlpatterns = [
     
     path('auth/google/', GoogleLoginView.as_view(), name='google_login'),
     path('notifications/', NotificationListView.as_view(), name='notification-list'),
+    path('notifications/unread-count/', NotificationUnreadCountView.as_view(), name='notifications-unread-count'),
+    path('notifications/stream/', notification_stream, name='notifications-stream'),
     path('notifications/mark-all-as-read/', MarkAllNotificationsAsReadView.as_view(), name='notifications-mark-all-read'),
     path('exercises/', ReadingExerciseList.as_view(), name='exercise-list'),
     path('exercises/create/', ReadingExerciseCreate.as_view(), name='exercise-create'),
     path('exercises/<int:pk>/', ReadingExerciseRetrieveUpdateDestroyView.as_view(), name='exercise-detail-update-delete'),
     path('exercises/search/', SearchExercises.as_view(), name='exercise-search'),
+    path('exercises/search/cache-stats/', WikipediaCacheStatsView.as_view(), name='exercise-search-cache-stats'),
     path('submit-progress/', SubmitProgress.as_view(), name='submit-progress'),   
     path('exercises/<int:exercise_id>/questions/', QuestionListView.as_view(), name='exercise-questions'),
     
@@ -43,6 +46,10 @@ urlpatterns = [
     path('user/progress-history/', UserProgressHistoryView.as_view(), name='user-progress-history'),
 
     path('ai/generate-questions/', generate_ai_questions, name='ai-generate-questions'),
+    path('ai/question-jobs/', QuestionGenerationJobCreateView.as_view(), name='ai-question-jobs'),
+    path('ai/question-jobs/<uuid:pk>/', QuestionGenerationJobDetailView.as_view(), name='ai-question-job-detail'),
+    path('ai/metrics/', AiMetricsView.as_view(), name='ai-metrics'),
+    path('metrics/requests/', RequestProfilesView.as_view(), name='request-profiles'),
 
     path('collections/', CollectionListView.as_view(), name='collection-list'),
     path('collections/<slug:slug>/', CollectionDetailView.as_view(), name='collection-detail'),
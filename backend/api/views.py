@@ -4,10 +4,10 @@ from rest_framework import generics, permissions
 from .permissions import IsOwnerOrAdminOrReadOnly
 from django.contrib.auth import get_user_model
 from .serializers import RegisterSerializer
-from .models import DailyChallenge, Notification, Friendship, ReadingExercise, Question, UserProgress, UserAchievement, ExerciseCollection
+from .models import DailyChallenge, Notification, Friendship, ReadingExercise, Question, UserProgress, UserAchievement, ExerciseCollection, QuestionGenerationJob
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status, serializers
 from rest_framework_simplejwt.views import TokenObtainPairView
@@ -16,43 +16,41 @@ from .services.challenge_service import get_today_challenge
 from .serializers import (
     NotificationSerializer, FriendActivitySerializer, BasicUserSerializer,
     ExerciseCollectionSerializer, UserStatusSerializer, UserAchievementSerializer,
-    QuestionSerializer, ReadingExerciseSerializer, UserSettingsSerializer,
-    UserProgressSerializer
+    QuestionSerializer, ReadingExerciseSerializer, ReadingExerciseSummarySerializer,
+    UserSettingsSerializer, UserProgressSerializer, QuestionGenerationJobSerializer
 )
 import requests
-import re
-from .utils.ai_queue import gemini_queue
 import os
 import json
 import random
-import google.generativeai as genai
 from dj_rest_auth.registration.views import SocialLoginView
 from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
 from allauth.socialaccount.providers.oauth2.client import OAuth2Client
 from rest_framework.exceptions import PermissionDenied
 from dotenv import load_dotenv
-from django.db.models import F, Window, Q
-from django.db.models.functions import Rank
+from django.db.models import F, Q
+from django.db.models.functions import Substr
+from .pagination import ExerciseCursorPagination, NotificationCursorPagination
 from .models import CustomUser
 from django.utils import timezone
 from datetime import timedelta
-from .services import submission_service
+from .services import submission_service, ranking_index, notification_service, notification_bus, wikipedia_service, wikipedia_cache, question_generation, rate_limiter, request_profiler
+import asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
 from .services.submission_service import SubmissionResult
 from django.shortcuts import get_object_or_404
-import threading
 
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
-try:
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-    gemini_model = genai.GenerativeModel('gemini-2.5-flash-lite')
-except Exception as e:
-    gemini_model = None
-
-gemini_api_lock = threading.Lock()
-
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
@@ -62,8 +60,27 @@ class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
 
 class ReadingExerciseList(generics.ListAPIView):
-    serializer_class = ReadingExerciseSerializer
+    serializer_class = ReadingExerciseSummarySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ExerciseCursorPagination
+
+    # Każde sortowanie kończy się unikalnym id: kursor przesuwa się po pierwszym polu
+    # z offsetem w obrębie remisów, więc kolejność remisów musi być stała między stronami.
+    SORT_ORDERINGS = {
+        'title_asc': ('title', 'id'),
+        'title_desc': ('-title', '-id'),
+        'word_count_asc': ('word_count', 'id'),
+        'word_count_desc': ('-word_count', '-id'),
+        'created_at_asc': ('created_at', 'id'),
+    }
+    DEFAULT_ORDERING = ('-created_at', '-id')
+
+    def get_ordering(self):
+        sort_by = self.request.query_params.get('sort_by')
+
+        if sort_by == 'daily_priority' and self.request.user.is_staff:
+            return ('-is_daily_candidate', '-created_at', '-id')
+        return self.SORT_ORDERINGS.get(sort_by, self.DEFAULT_ORDERING)
 
     def get_queryset(self):
         user = self.request.user
@@ -76,6 +93,9 @@ class ReadingExerciseList(generics.ListAPIView):
                 Q(created_by=user)
             )
 
+        queryset = queryset.select_related('created_by').defer('text').annotate(
+            text_head=Substr('text', 1, ReadingExerciseSummarySerializer.EXCERPT_CHARS + 1)
+        )
 
         show_only_my_private = self.request.query_params.get('my_private')
         if show_only_my_private == 'true':
@@ -97,24 +117,7 @@ class ReadingExerciseList(generics.ListAPIView):
         if user.is_staff and show_daily_candidates == 'true':
             queryset = queryset.filter(is_daily_candidate=True)
 
-        sort_by = self.request.query_params.get('sort_by')
-
-        if sort_by == 'title_asc':
-            queryset = queryset.order_by('title')
-        elif sort_by == 'title_desc':
-            queryset = queryset.order_by('-title')
-        elif sort_by == 'word_count_asc':
-            queryset = queryset.order_by('word_count')
-        elif sort_by == 'word_count_desc':
-            queryset = queryset.order_by('-word_count')
-        elif sort_by == 'created_at_asc':
-            queryset = queryset.order_by('created_at')
-        elif sort_by == 'daily_priority' and user.is_staff:
-            queryset = queryset.order_by('-is_daily_candidate', '-created_at')
-        else:
-            queryset = queryset.order_by('-created_at')
-
-        return queryset.distinct()
+        return queryset.order_by(*self.get_ordering())
 
 class ReadingExerciseCreate(generics.CreateAPIView):
     queryset = ReadingExercise.objects.all()
@@ -290,57 +293,12 @@ class SearchExercises(APIView):
         except ValueError:
             limit = 300
 
-        headers = { 'User-Agent': 'SpeedReadingApp/1.0 (ziomekdfd@gmail.com)' }
-
         try:
-            search_url = "https://pl.wikipedia.org/w/api.php"
-            
-            search_params = {
-                'action': 'query', 'format': 'json', 'list': 'search',
-                'srsearch': query, 'utf8': 1, 'srlimit': num_results,
-            }
+            results = wikipedia_service.search_extracts(query, num_results=num_results, limit=limit)
 
-            search_response = requests.get(search_url, params=search_params, headers=headers, timeout=15)
-            search_response.raise_for_status()
-            search_data = search_response.json()
-
-            results = []
-            wiki_search_results = search_data.get('query', {}).get('search', [])
-
-            if not wiki_search_results:
+            if not results:
                 return Response({"results": [], "message": "Wikipedia nie znalazła wyników dla tego zapytania."})
 
-            for item in wiki_search_results:
-                pageid = item['pageid']
-                title = item['title']
-
-                extract_params = {
-                    'action': 'query', 'format': 'json', 'prop': 'extracts',
-                    'explaintext': 1, 'pageids': pageid, 'utf8': 1,
-                }
-
-                extract_response = requests.get(search_url, params=extract_params, headers=headers, timeout=15)
-                extract_response.raise_for_status()
-                extract_data = extract_response.json()
-
-                page = extract_data.get('query', {}).get('pages', {}).get(str(pageid), {})
-                full_text = page.get('extract', '')
-
-                if not full_text: continue
-
-                cleaned_text = re.sub(r'[^\w\sąćęłńóśźżĄĆĘŁŃÓŚŹŻ]', '', full_text, flags=re.UNICODE)
-                cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
-
-                if not cleaned_text: continue
-
-                words = cleaned_text.split()
-                truncated_text = " ".join(words[:limit])
-
-                results.append({
-                    "title": title,
-                    "snippet": truncated_text,
-                })
-
             return Response({"results": results})
 
         except requests.exceptions.Timeout:
@@ -351,6 +309,14 @@ class SearchExercises(APIView):
             return Response({"error": "Wystąpił nieoczekiwany błąd serwera."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+
+class WikipediaCacheStatsView(APIView):
+    """Liczniki trafień cache wyszukiwania Wikipedii (tylko dla obsługi)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(wikipedia_cache.stats())
+
 class ReadingExerciseDetail(generics.RetrieveAPIView):
     serializer_class = ReadingExerciseSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -424,52 +390,39 @@ class LeaderboardView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        from django.db.models import Window
-        from django.db.models.functions import Rank
-        
-        ranked_users_query = CustomUser.objects.filter(
-            total_ranking_points__gt=0
-        ).annotate(
-            rank=Window(
-                expression=Rank(),
-                order_by=F('total_ranking_points').desc()
-            )
-        ).order_by('rank')
+        if request.query_params.get('around') == 'me':
+            try:
+                radius = int(request.query_params.get('radius', 5))
+            except ValueError:
+                radius = 5
+            radius = min(max(radius, 0), ranking_index.MAX_RADIUS)
 
-        leaderboard_data = []
-        for user in ranked_users_query:
-            leaderboard_data.append({
-                'id': user.id,
-                'rank': user.rank,
-                'username': user.username,
-                'total_points': user.total_ranking_points,
-                'average_wpm': round(user.average_wpm) if user.average_wpm else 0,
-                'average_accuracy': round(user.average_accuracy, 1) if user.average_accuracy else 0,
-                'exercises_completed': user.ranking_exercises_completed,
-            })
+            leaderboard_data = ranking_index.get_leaderboard_around(request.user, radius)
+            return Response({"leaderboard": leaderboard_data, "next_cursor": None})
 
-        return Response({"leaderboard": leaderboard_data})
+        try:
+            page_size = int(request.query_params.get('page_size', ranking_index.DEFAULT_PAGE_SIZE))
+        except ValueError:
+            page_size = ranking_index.DEFAULT_PAGE_SIZE
+        page_size = min(max(page_size, 1), ranking_index.MAX_PAGE_SIZE)
+
+        try:
+            leaderboard_data, next_cursor = ranking_index.get_leaderboard_page(
+                cursor=request.query_params.get('cursor'),
+                page_size=page_size
+            )
+        except ranking_index.InvalidCursor:
+            return Response({"error": "Nieprawidłowy kursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"leaderboard": leaderboard_data, "next_cursor": next_cursor})
 
 class MyStatsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         user = request.user
-        from django.db.models import Window
-        from django.db.models.functions import Rank
-
-        all_users_with_rank = CustomUser.objects.filter(
-            total_ranking_points__gt=0
-        ).annotate(
-            rank=Window(
-                expression=Rank(),
-                order_by=F('total_ranking_points').desc()
-            )
-        )
-        
-        user_rank_data = all_users_with_rank.filter(id=user.id).first()
-        
-        user_rank = user_rank_data.rank if user_rank_data else "N/A"
+
+        user_rank = ranking_index.get_user_rank(user) or "N/A"
 
         recent_results_query = UserProgress.objects.filter(
             user=user,
@@ -630,7 +583,9 @@ class CollectionListView(generics.ListCreateAPIView):
         user = self.request.user
         return ExerciseCollection.objects.filter(
             Q(is_public=True) | Q(created_by=user)
-        ).distinct().prefetch_related('exercises')
+        ).distinct().prefetch_related(
+            'exercises', 'exercises__questions', 'exercises__created_by'
+        )
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -647,7 +602,9 @@ class CollectionDetailView(generics.RetrieveUpdateDestroyAPIView):
         user = self.request.user
         return ExerciseCollection.objects.filter(
             Q(is_public=True) | Q(created_by=user)
-        ).distinct().prefetch_related('exercises')
+        ).distinct().prefetch_related(
+            'exercises', 'exercises__questions', 'exercises__created_by'
+        )
     
     def get_serializer_context(self):
         return {'request': self.request}
@@ -663,126 +620,92 @@ class CollectionDetailView(generics.RetrieveUpdateDestroyAPIView):
             raise PermissionDenied("Możesz usuwać tylko własne kolekcje.")
         instance.delete()
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def generate_ai_questions(request):
-    if not gemini_model:
-        return Response(
-            {"error": "Model AI nie jest dostępny lub nie został poprawnie skonfigurowany (brak klucza API?)."},
-            status=status.HTTP_503_SERVICE_UNAVAILABLE
-        )
-    
+def _ai_staff_only(request):
     if not request.user.is_staff:
         return Response(
             {"error": "Tylko administratorzy mogą generować pytania AI."},
             status=status.HTTP_403_FORBIDDEN
         )
+    return None
 
-    try:
-        content = request.data.get('content', '')
-        topic = request.data.get('topic', 'Temat ogólny')
-        
-        try:
-            total_count = int(request.data.get('total_count', 15))
-            open_count = int(request.data.get('open_count', 10))
-            choice_count = int(request.data.get('choice_count', 5))
-        except (ValueError, TypeError):
-            return Response({"error": "Liczba pytań musi być liczbą całkowitą."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        MIN_TOTAL_QUESTIONS = 15 
-        
-        if total_count < MIN_TOTAL_QUESTIONS:
-            return Response({"error": f"Minimalna łączna liczba pytań to {MIN_TOTAL_QUESTIONS}."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        if open_count + choice_count != total_count:
-            return Response({
-                "error": f"Suma pytań ({open_count} otwartych + {choice_count} zamkniętych) nie zgadza się z sumą całkowitą ({total_count})."
-            }, status=status.HTTP_400_BAD_REQUEST)
-            
-        if open_count < 0 or choice_count < 0:
-            return Response({"error": "Liczba pytań nie może być ujemna."}, status=status.HTTP_400_BAD_REQUEST)
-
-        if not content or len(content) < 50:
-            return Response(
-                {"error": "Materiał źródłowy (content) jest wymagany i musi mieć co najmniej 50 znaków."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
 
-        prompt = f"""
-        Jesteś asystentem edukacyjnym. Twoim zadaniem jest wygenerowanie DOKŁADNIE:
-        - {open_count} pytań otwartych ('open')
-        - {choice_count} pytań zamkniętych ('choice')
-        
-        ...razem {total_count} pytań z podanego materiału źródłowego.
-        Pytania mają dotyczyć tematu: "{topic}".
-        
-        Zawsze zwracaj odpowiedź wyłącznie jako JEDNĄ tablicę obiektów JSON, bez żadnego dodatkowego tekstu (Markdown itp).
-        Użyj DOKŁADNIE tych kluczy: "question_type", "text", "correct_answer", "option_1", "option_2", "option_3", "option_4".
-
-        Format JSON:
-        [
-            {{
-                "question_type": "open",
-                "text": "Przykładowe pytanie otwarte?",
-                "correct_answer": "Krótka odpowiedź",
-                "option_1": null, "option_2": null, "option_3": null, "option_4": null
-            }},
-            {{
-                "question_type": "choice",
-                "text": "Przykładowe pytanie zamknięte?",
-                "correct_answer": "Opcja 1",
-                "option_1": "Opcja 1", "option_2": "Opcja 2", "option_3": "Opcja 3", "option_4": "Opcja 4"
-            }}
-        ]
-
-        Wymogi:
-        - Dla pytań 'open', odpowiedzi (correct_answer) muszą być BARDZO KRÓTKIE (1-3 słowa). Pola opcji muszą być null.
-        - Dla pytań 'choice', MUSISZ podać 4 opcje. Jedna z nich MUSI być identyczna z correct_answer.
-        - Zachowaj kolejność: najpierw wszystkie pytania otwarte, potem wszystkie zamknięte.
-
-        Oto materiał źródłowy:
-        ---
-        {content}
-        ---
-        """
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def generate_ai_questions(request):
+    """Wersja synchroniczna (czeka na model w wątku serwera) - preferowane są zlecenia: ai/question-jobs/."""
+    if denied := _ai_staff_only(request):
+        return denied
 
+    try:
+        params = question_generation.parse_params(request.data)
         logger.info(f"AI: Użytkownik {request.user.username} dodaje zapytanie do kolejki...")
-
-        response = gemini_queue.process_request(gemini_model.generate_content, prompt)
-
+        force_refresh = question_generation.parse_force_refresh(request.data)
+        engine = question_generation.parse_engine(request.data)
+        questions_json = question_generation.get_or_generate_questions(params, force_refresh=force_refresh, engine=engine)
         logger.info(f"AI: Otrzymano odpowiedź dla {request.user.username}.")
-        ai_response_text = response.text
-
-        cleaned_text = ai_response_text.strip()
-        
-        if cleaned_text.startswith('```json'):
-            cleaned_text = cleaned_text[7:]
-        if cleaned_text.startswith('```'):
-            cleaned_text = cleaned_text[3:]
-        if cleaned_text.endswith('```'):
-            cleaned_text = cleaned_text[:-3]
-            
-        cleaned_text = cleaned_text.strip()
-        
-        questions_json = json.loads(cleaned_text)
-        
-        if len(questions_json) != total_count:
-            logger.warning(f"AI WARNING: Zaządano {total_count} pytań, otrzymano {len(questions_json)}")
-
         return Response(questions_json, status=status.HTTP_200_OK)
 
-    except json.JSONDecodeError:
-        logger.error(f"AI ERROR: Błąd dekodowania JSON. Otrzymano: {ai_response_text}")
-        return Response(
-            {"error": "AI zwróciło niepoprawny format danych. Spróbuj ponownie (zmniejsz ilość pytań lub zmień tekst)."}, 
-            status=status.HTTP_502_BAD_GATEWAY
-        )
+    except question_generation.InvalidRequest as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except question_generation.ModelUnavailable as e:
+        return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    except question_generation.InvalidModelResponse as e:
+        return Response({"error": str(e)}, status=status.HTTP_502_BAD_GATEWAY)
     except Exception as e:
         logger.error(f"AI CRITICAL ERROR: {str(e)}")
         return Response(
             {"error": f"Wystąpił błąd podczas komunikacji z AI: {str(e)}"}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+class QuestionGenerationJobCreateView(APIView):
+    """Zakłada zlecenie generowania pytań i od razu zwraca jego id (202)."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if denied := _ai_staff_only(request):
+            return denied
+
+        try:
+            params = question_generation.parse_params(request.data)
+            engine = question_generation.parse_engine(request.data)
+        except question_generation.InvalidRequest as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        force_refresh = question_generation.parse_force_refresh(request.data)
+        job = question_generation.submit_job(request.user, params, force_refresh=force_refresh, engine=engine)
+        logger.info(f"AI: Użytkownik {request.user.username} zlecił generowanie pytań ({job.id}).")
+        return Response({"job_id": job.id, "status": job.status}, status=status.HTTP_202_ACCEPTED)
+
+
+class QuestionGenerationJobDetailView(generics.RetrieveAPIView):
+    """Stan zlecenia; po zakończeniu zawiera pytania (`result`) albo komunikat błędu."""
+    serializer_class = QuestionGenerationJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        # Identyczne zlecenia są łączone, więc administrator może czekać na zlecenie innego administratora.
+        if self.request.user.is_staff:
+            return QuestionGenerationJob.objects.all()
+        return QuestionGenerationJob.objects.filter(requested_by=self.request.user)
+
+
+class AiMetricsView(APIView):
+    """Przepustowość AI: stan wspólnego limitu, długość kolejki i czasy oczekiwania."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(rate_limiter.get_ai_limiter().metrics())
+
+
+class RequestProfilesView(APIView):
+    """Profile żądań per widok z najwolniejszymi wywołaniami (w obrębie bieżącego procesu)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(request_profiler.profile_store.snapshot())
+
     
 class UserSearchView(generics.ListAPIView):
     serializer_class = BasicUserSerializer
@@ -885,9 +808,6 @@ class FriendsLeaderboardView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        from django.db.models import Window
-        from django.db.models.functions import Rank
-        
         user = request.user
         
         following_ids = list(Friendship.objects.filter(
@@ -896,21 +816,11 @@ class FriendsLeaderboardView(APIView):
         
         following_ids.append(user.id)
         
-        ranked_users_query = CustomUser.objects.annotate(
-            rank=Window(
-                expression=Rank(),
-                order_by=F('total_ranking_points').desc()
-            )
-        ).filter(
-            total_ranking_points__gt=0,
-            id__in=following_ids
-        ).order_by('rank')
-        
         leaderboard_data = []
-        for user_data in ranked_users_query:
+        for rank, user_data in ranking_index.get_ranked_subset(following_ids):
             leaderboard_data.append({
                 'id': user_data.id,
-                'rank': user_data.rank,
+                'rank': rank,
                 'username': user_data.username,
                 'total_points': user_data.total_ranking_points,
                 'average_wpm': round(user_data.average_wpm),
@@ -955,6 +865,7 @@ class GoogleLoginView(SocialLoginView):
 class NotificationListView(generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -962,14 +873,67 @@ class NotificationListView(generics.ListAPIView):
         return notifications
 
 
+class NotificationUnreadCountView(APIView):
+    """Licznik do plakietki dzwonka - czyta jedno pole użytkownika, bez skanowania historii."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        return Response({"unread_count": request.user.unread_notifications})
+
+
+@sync_to_async
+def _authenticate_stream(request):
+    """EventSource nie wysyła nagłówków, więc token JWT przychodzi w ?token=."""
+    raw_token = request.GET.get('token')
+    if not raw_token:
+        return None
+    authenticator = JWTAuthentication()
+    try:
+        return authenticator.get_user(authenticator.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def notification_stream(request):
+    """
+    Strumień SSE z nowymi powiadomieniami (wymaga serwera ASGI).
+    Jedno zapytanie przy połączeniu (uwierzytelnienie), potem tylko
+    zdarzenia z notification_bus i co jakiś czas komentarz keepalive.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"error": "Strumień powiadomień wymaga serwera ASGI."}, status=503)
+
+    user = await _authenticate_stream(request)
+    if user is None:
+        return JsonResponse({"error": "Nieprawidłowy lub brakujący token."}, status=401)
+
+    keepalive = getattr(settings, 'NOTIFICATION_STREAM_KEEPALIVE_SECONDS', 25)
+
+    async def events():
+        subscription = await notification_bus.broker.subscribe(user.id)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: notification\ndata: {json.dumps(event, cls=DjangoJSONEncoder, ensure_ascii=False)}\n\n"
+        finally:
+            notification_bus.broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 class MarkAllNotificationsAsReadView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
-        updated = Notification.objects.filter(
-            recipient=request.user,
-            read=False
-        ).update(read=True)
+        updated = notification_service.mark_all_as_read(request.user)
         
         return Response({
             "updated": updated,
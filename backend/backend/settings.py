@@ -40,6 +40,7 @@ INSTALLED_APPS = [
 SITE_ID = 1
 
 MIDDLEWARE = [
+    "api.middleware.RequestProfilingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -83,7 +84,20 @@ WSGI_APPLICATION = "backend.wsgi.application"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.getenv("DJANGO_SQLITE_PATH", str(BASE_DIR / "db.sqlite3")),
+        # IMMEDIATE: transakcja od razu bierze blokadę zapisu, więc workery kolejki
+        # i równoległe zgłoszenia czekają (timeout) zamiast dostać "database is locked".
+        "OPTIONS": {"transaction_mode": "IMMEDIATE", "timeout": 20},
+    }
+}
+
+
+# Cache współdzielony przez workery gunicorna (wyzwanie dnia itp.).
+# Na produkcji można podmienić backend/lokalizację zmiennymi środowiskowymi.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("DJANGO_CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", str(BASE_DIR / ".django_cache")),
     }
 }
 
@@ -166,4 +180,52 @@ SOCIALACCOUNT_PROVIDERS = {
         },
         'VERIFIED_EMAIL': True, 
     }
-}
\ No newline at end of file
+}
+
+# Indeks rankingu jest per proces: zmiany punktów z innych workerów widać najpóźniej po
+# tylu sekundach (rangi i punkty na jednej stronie rankingu są zawsze z jednego stanu).
+RANKING_INDEX_TTL_SECONDS = 30
+
+# Kolejka zadań w tle (api/services/job_queue.py, `manage.py run_workers`).
+# W trybie synchronicznym zadania wykonują się w tym samym procesie zaraz po commicie
+# (testy: backend/settings_test.py; lokalnie bez workerów: JOB_QUEUE_SYNC=1).
+JOB_QUEUE_SYNC = os.getenv("JOB_QUEUE_SYNC", "0") == "1"
+JOB_VISIBILITY_TIMEOUT_SECONDS = 300
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BACKOFF_SECONDS = 10
+
+# Strumień SSE powiadomień (api/services/notification_bus.py). LocalBackend działa
+# tylko w obrębie procesu; DatabasePollingBackend widzi też powiadomienia z run_workers.
+NOTIFICATION_BUS_BACKEND = os.getenv(
+    "NOTIFICATION_BUS_BACKEND", "api.services.notification_bus.DatabasePollingBackend"
+)
+NOTIFICATION_BUS_POLL_SECONDS = 2
+NOTIFICATION_STREAM_KEEPALIVE_SECONDS = 25
+
+# Wikipedia (api/services/wikipedia_service.py): wspólny budżet czasu na całe wyszukiwanie.
+WIKIPEDIA_API_URL = os.getenv("WIKIPEDIA_API_URL", "https://pl.wikipedia.org/w/api.php")
+WIKIPEDIA_DEADLINE_SECONDS = 8
+# Cache wyników i oczyszczonych wyciągów (api/services/wikipedia_cache.py): L1 w procesie + CACHES.
+WIKIPEDIA_SEARCH_CACHE_TTL = 60 * 60 * 6
+WIKIPEDIA_EXTRACT_CACHE_TTL = 60 * 60 * 24
+
+# Generowanie pytań AI (api/services/question_generation.py). Model to klasa
+# z metodą generate(prompt) -> str; zlecenia wykonuje run_workers.
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+AI_QUESTION_MODEL = os.getenv("AI_QUESTION_MODEL", "api.services.question_generation.GeminiModel")
+
+# Limit wywołań modelu AI wspólny dla wszystkich procesów (api/services/rate_limiter.py).
+AI_RATE_LIMIT_DB = os.getenv("AI_RATE_LIMIT_DB", str(BASE_DIR / ".ai_rate_limit.sqlite3"))
+AI_RATE_LIMIT_RPM = int(os.getenv("AI_RATE_LIMIT_RPM", "15"))
+AI_RATE_LIMIT_BURST = int(os.getenv("AI_RATE_LIMIT_BURST", "3"))
+AI_RATE_LIMIT_CONCURRENCY = int(os.getenv("AI_RATE_LIMIT_CONCURRENCY", "2"))
+# Długi materiał jest dzielony na sekcje generowane równolegle (w ramach limitu powyżej).
+AI_SECTION_WORDS = 1500
+AI_MAX_PARALLEL_SECTIONS = 4
+
+# Profilowanie żądań (api/middleware.py): ułamek mierzonych żądań (0 - wyłączone),
+# nagłówek Server-Timing (wysyłany tylko przy DEBUG i obsłudze) i liczba najwolniejszych
+# żądań pamiętanych per widok.
+REQUEST_PROFILING_SAMPLE_RATE = float(os.getenv("REQUEST_PROFILING_SAMPLE_RATE", "1.0" if DEBUG else "0.01"))
+REQUEST_PROFILING_SERVER_TIMING = True
+REQUEST_PROFILING_SLOWEST_PER_VIEW = 20
@@ -0,0 +1,14 @@
+"""
+Ustawienia dla testów (`manage.py test` wybiera je sam, inne narzędzia przez
+DJANGO_SETTINGS_MODULE=backend.settings_test).
+"""
+from .settings import *  # noqa: F401,F403
+
+# Izolowany cache w pamięci zamiast wspólnego cache plikowego.
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Zadania w tle wykonują się zaraz po commicie, bez `run_workers`.
+JOB_QUEUE_SYNC = True
+
+# Strumień SSE w obrębie procesu - bez wątku odpytującego bazę.
+NOTIFICATION_BUS_BACKEND = "api.services.notification_bus.LocalBackend"
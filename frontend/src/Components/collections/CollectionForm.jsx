@@ -38,10 +38,15 @@ export default function CollectionForm({ api }) {
         }
         setIsAdmin(true);
 
-        const exercisesRes = await api.get("exercises/", {
-          params: { sort_by: 'title_asc' }
+        let exercisesRes = await api.get("exercises/", {
+          params: { sort_by: 'title_asc', page_size: 200 }
         });
-        setAllExercises(exercisesRes.data);
+        const loadedExercises = [...exercisesRes.data.results];
+        while (exercisesRes.data.next) {
+          exercisesRes = await api.get(exercisesRes.data.next);
+          loadedExercises.push(...exercisesRes.data.results);
+        }
+        setAllExercises(loadedExercises);
 
         if (isEditMode) {
           const collectionRes = await api.get(`collections/${slug}/`);
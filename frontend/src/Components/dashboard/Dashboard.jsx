@@ -19,6 +19,9 @@ export default function Dashboard({ api }) {
   const {
     exercises,
     loading: exercisesLoading,
+    hasMore,
+    loadingMore,
+    loadMore,
     filterOptions,
     sortBy,
     toggleFavorite,
@@ -83,15 +86,29 @@ export default function Dashboard({ api }) {
             />
           </aside>
 
-          <ExerciseList
-            loading={exercisesLoading}
-            exercises={exercises}
-            loggedInUserId={loggedInUserId}
-            onStartExercise={handleStartExercise}
-            onToggleFavorite={toggleFavorite}
-            onDeleteExercise={deleteExercise}
-            isAdmin={userStatus?.is_admin || false}
-          />
+          <div>
+            <ExerciseList
+              loading={exercisesLoading}
+              exercises={exercises}
+              loggedInUserId={loggedInUserId}
+              onStartExercise={handleStartExercise}
+              onToggleFavorite={toggleFavorite}
+              onDeleteExercise={deleteExercise}
+              isAdmin={userStatus?.is_admin || false}
+            />
+
+            {hasMore && !exercisesLoading && (
+              <div className="flex justify-center mt-8">
+                <button
+                  className="inline-flex items-center justify-center gap-2 px-6 py-3 rounded-lg font-semibold transition-all bg-transparent text-primary border-2 border-primary hover:bg-primary hover:text-white disabled:opacity-50"
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                >
+                  {loadingMore ? "Ładowanie..." : "Załaduj więcej"}
+                </button>
+              </div>
+            )}
+          </div>
         </div>
       </div>
 
@@ -6,15 +6,31 @@ function AiGeneratorButton({ api, text, topic, onQuestionsGenerated, onError })
 
   const [openCount, setOpenCount] = useState(10);
   const [choiceCount, setChoiceCount] = useState(5);
+  const [forceRefresh, setForceRefresh] = useState(false);
+  const [engine, setEngine] = useState("ai");
   
   const MIN_TOTAL = 15;
   const MAX_TOTAL = 50;
+  const JOB_POLL_INTERVAL_MS = 1500;
+  const JOB_MAX_POLLS = 120;
 
   const totalCount = openCount + choiceCount;
 
   const maxOpen = MAX_TOTAL - choiceCount;
   const maxChoice = MAX_TOTAL - openCount;
 
+  // Generowanie trwa w tle po stronie serwera - odpytujemy stan zlecenia.
+  const waitForJob = async (jobId) => {
+    for (let attempt = 0; attempt < JOB_MAX_POLLS; attempt++) {
+      const res = await api.get(`ai/question-jobs/${jobId}/`);
+      if (res.data.status === "done" || res.data.status === "failed") {
+        return res.data;
+      }
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    }
+    return { status: "failed", error: "Generowanie trwa zbyt długo. Spróbuj ponownie później." };
+  };
+
   const handleGenerateAiQuestions = async () => {
     if (!text.trim() || text.trim().length < 50) {
       onError("Wklej najpierw tekst źródłowy (minimum 50 znaków).");
@@ -30,15 +46,23 @@ function AiGeneratorButton({ api, text, topic, onQuestionsGenerated, onError })
     onError(null);
 
     try {
-      const res = await api.post("ai/generate-questions/", {
+      const submitRes = await api.post("ai/question-jobs/", {
         content: text,
         topic: topic || "Ogólny temat",
         total_count: totalCount,
         open_count: openCount,
-        choice_count: choiceCount
+        choice_count: choiceCount,
+        force_refresh: forceRefresh,
+        engine: engine
       });
 
-      onQuestionsGenerated(res.data);
+      const job = await waitForJob(submitRes.data.job_id);
+      if (job.status === "failed") {
+        onError(job.error || "Nie udało się wygenerować pytań.");
+        return;
+      }
+
+      onQuestionsGenerated(job.result);
       setIsModalOpen(false);
 
     } catch (err) {
@@ -162,6 +186,29 @@ function AiGeneratorButton({ api, text, topic, onQuestionsGenerated, onError })
               </div>
             </div>
 
+            <div className="flex items-center justify-between mb-4 text-sm">
+              <label htmlFor="question-engine" className="font-semibold text-text-primary">Silnik</label>
+              <select
+                id="question-engine"
+                value={engine}
+                onChange={(e) => setEngine(e.target.value)}
+                className="px-3 py-2 rounded-md bg-background-surface text-text-primary border border-border-light"
+              >
+                <option value="ai">AI (Gemini)</option>
+                <option value="heuristic">Lokalny (luki z tekstu, natychmiast)</option>
+              </select>
+            </div>
+
+            <label className="flex items-center gap-2 mb-6 text-sm text-text-secondary cursor-pointer">
+              <input
+                type="checkbox"
+                checked={forceRefresh}
+                disabled={engine !== "ai"}
+                onChange={(e) => setForceRefresh(e.target.checked)}
+              />
+              Wygeneruj od nowa (pomiń zapisane wcześniej pytania dla tego tekstu)
+            </label>
+
             <div className={`text-center text-lg font-semibold mb-6 p-4 rounded-md transition-colors ${
               totalCount >= MIN_TOTAL && totalCount <= MAX_TOTAL 
                 ? 'bg-success/10 text-success border-2 border-success' 
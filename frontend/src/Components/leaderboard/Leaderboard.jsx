@@ -9,6 +9,8 @@ import LeaderboardTable from "./LeaderboardTable.jsx";
 
 export default function Leaderboard({ api }) {
   const [leaderboard, setLeaderboard] = useState([]);
+  const [leaderboardCursor, setLeaderboardCursor] = useState(null);
+  const [loadingMoreLeaderboard, setLoadingMoreLeaderboard] = useState(false);
   const [myStats, setMyStats] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -68,6 +70,21 @@ export default function Leaderboard({ api }) {
     }
   };
 
+  const loadMoreLeaderboard = async () => {
+    if (!api || !leaderboardCursor || loadingMoreLeaderboard) return;
+
+    setLoadingMoreLeaderboard(true);
+    try {
+      const res = await api.get("ranking/leaderboard/", { params: { cursor: leaderboardCursor } });
+      setLeaderboard(prev => [...prev, ...res.data.leaderboard]);
+      setLeaderboardCursor(res.data.next_cursor);
+    } catch (err) {
+      console.error("Błąd pobierania kolejnej strony rankingu:", err);
+    } finally {
+      setLoadingMoreLeaderboard(false);
+    }
+  };
+
   const fetchFriendsLeaderboard = useCallback(async () => {
     if (!api) return;
     setLoading(true);
@@ -106,6 +123,7 @@ export default function Leaderboard({ api }) {
 
         setMyStats(statsRes.data);
         setLeaderboard(leaderboardRes.data.leaderboard);
+        setLeaderboardCursor(leaderboardRes.data.next_cursor);
         setFollowingIds(followingRes.data);
 
       } catch (err) {
@@ -249,12 +267,26 @@ export default function Leaderboard({ api }) {
           )}
 
           {activeTab === "global" && (
-            <LeaderboardTable
-              users={leaderboard}
-              onFollowToggle={handleFollowToggle}
-              followingIds={followingIds}
-              currentUserId={currentUserId}
-            />
+            <div>
+              <LeaderboardTable
+                users={leaderboard}
+                onFollowToggle={handleFollowToggle}
+                followingIds={followingIds}
+                currentUserId={currentUserId}
+              />
+
+              {leaderboardCursor && (
+                <div className="flex justify-center mt-8">
+                  <button
+                    className="inline-flex items-center justify-center gap-2 px-6 py-3 rounded-lg font-semibold transition-all bg-transparent text-primary border-2 border-primary hover:bg-primary hover:text-white disabled:opacity-50"
+                    onClick={loadMoreLeaderboard}
+                    disabled={loadingMoreLeaderboard}
+                  >
+                    {loadingMoreLeaderboard ? "Ładowanie..." : "Załaduj więcej"}
+                  </button>
+                </div>
+              )}
+            </div>
           )}
 
           {activeTab === "friends" && (
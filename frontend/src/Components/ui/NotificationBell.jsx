@@ -22,9 +22,12 @@ export default function NotificationBell({ api }) {
   const [isOpen, setIsOpen] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [nextUrl, setNextUrl] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const dropdownRef = useRef(null);
   const audioRef = useRef(null);
   const previousCountRef = useRef(0);
+  const streamConnectedRef = useRef(false);
   const API_BASE_URL = "http://127.0.0.1:8000";
 
   const playNotificationSound = () => {
@@ -54,37 +57,95 @@ export default function NotificationBell({ api }) {
     }
   };
 
-  const fetchNotifications = async () => {
+  const fetchUnreadCount = async () => {
     try {
-      setLoading(true);
-      setError(null);
-
-      const res = await api.get('/notifications/');
-
-      const newUnreadCount = res.data.filter(n => !n.read).length;
+      const res = await api.get('/notifications/unread-count/');
+      const newUnreadCount = res.data.unread_count;
 
       if (previousCountRef.current < newUnreadCount && previousCountRef.current !== 0) {
         playNotificationSound();
       }
 
       previousCountRef.current = newUnreadCount;
-      setNotifications(res.data);
       setUnreadCount(newUnreadCount);
+    } catch (err) {
+      console.error("Błąd pobierania licznika powiadomień:", err);
+    }
+  };
+
+  const fetchNotifications = async (url = '/notifications/') => {
+    const isFirstPage = url === '/notifications/';
+    try {
+      if (isFirstPage) {
+        setLoading(true);
+      } else {
+        setLoadingMore(true);
+      }
+      setError(null);
+
+      const res = await api.get(url);
+
+      setNotifications(prev => isFirstPage ? res.data.results : [...prev, ...res.data.results]);
+      setNextUrl(res.data.next);
     } catch (err) {
       console.error("Błąd pobierania powiadomień:", err);
       setError("Nie udało się pobrać powiadomień");
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
+  const handleStreamNotification = (event) => {
+    const notification = JSON.parse(event.data);
+
+    setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)]);
+    setUnreadCount(prev => {
+      const next = prev + 1;
+      previousCountRef.current = next;
+      return next;
+    });
+    playNotificationSound();
+  };
+
   useEffect(() => {
-    if (api) {
-      fetchNotifications();
+    if (!api) return;
 
-      const interval = setInterval(fetchNotifications, 30000);
-      return () => clearInterval(interval);
-    }
+    let stream = null;
+    let reconnectTimer = null;
+
+    // SSE: nowe powiadomienia przychodzą od razu; polling licznika zostaje jako zapas.
+    const connectStream = () => {
+      const token = localStorage.getItem("access");
+      if (!token || typeof EventSource === 'undefined') return;
+
+      stream = new EventSource(`${API_BASE_URL}/api/notifications/stream/?token=${encodeURIComponent(token)}`);
+      stream.onopen = () => {
+        streamConnectedRef.current = true;
+      };
+      stream.addEventListener('notification', handleStreamNotification);
+      stream.onerror = () => {
+        streamConnectedRef.current = false;
+        stream.close();
+        reconnectTimer = setTimeout(connectStream, 30000);
+      };
+    };
+
+    fetchUnreadCount();
+    connectStream();
+
+    const interval = setInterval(() => {
+      if (!streamConnectedRef.current) {
+        fetchUnreadCount();
+      }
+    }, 30000);
+
+    return () => {
+      clearInterval(interval);
+      clearTimeout(reconnectTimer);
+      streamConnectedRef.current = false;
+      if (stream) stream.close();
+    };
   }, [api]);
 
   useEffect(() => {
@@ -114,8 +175,11 @@ export default function NotificationBell({ api }) {
 
   const handleToggle = () => {
     setIsOpen(prev => !prev);
-    if (!isOpen && unreadCount > 0) {
-      markAllAsRead();
+    if (!isOpen) {
+      fetchNotifications();
+      if (unreadCount > 0) {
+        markAllAsRead();
+      }
     }
   };
 
@@ -153,7 +217,7 @@ export default function NotificationBell({ api }) {
               <div className="p-4 text-center text-danger">
                 {error}
                 <button
-                  onClick={fetchNotifications}
+                  onClick={() => fetchNotifications()}
                   className="inline-flex items-center justify-center gap-2 px-4 py-2 rounded-md font-semibold transition-all text-sm bg-transparent text-text-secondary hover:bg-background-surface hover:text-text-primary mt-2"
                 >
                   Spróbuj ponownie
@@ -186,6 +250,15 @@ export default function NotificationBell({ api }) {
                 </div>
               ))
             )}
+            {!loading && !error && nextUrl && (
+              <button
+                onClick={() => fetchNotifications(nextUrl)}
+                disabled={loadingMore}
+                className="inline-flex items-center justify-center gap-2 w-full px-4 py-2 font-semibold transition-all text-sm bg-transparent text-text-secondary hover:bg-background-surface hover:text-text-primary disabled:opacity-50"
+              >
+                {loadingMore ? 'Ładowanie...' : 'Pokaż starsze'}
+              </button>
+            )}
           </div>
 
           {notifications.length > 0 && (
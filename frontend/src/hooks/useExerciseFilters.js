@@ -10,6 +10,8 @@ export function useExerciseFilters(api, initialSort = '-created_at') {
     my_private: false,
   });
   const [sortBy, setSortBy] = useState(initialSort);
+  const [nextPageUrl, setNextPageUrl] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     if (!api) {
@@ -29,7 +31,8 @@ export function useExerciseFilters(api, initialSort = '-created_at') {
 
       try {
         const res = await api.get("exercises/", { params });
-        setExercises(res.data);
+        setExercises(res.data.results);
+        setNextPageUrl(res.data.next);
       } catch (err) {
         console.error("Błąd pobierania ćwiczeń:", err);
       } finally {
@@ -39,6 +42,20 @@ export function useExerciseFilters(api, initialSort = '-created_at') {
     fetchExercises();
   }, [api, filterOptions, sortBy]); 
 
+  const loadMore = async () => {
+    if (!api || !nextPageUrl || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const res = await api.get(nextPageUrl);
+      setExercises(prev => [...prev, ...res.data.results]);
+      setNextPageUrl(res.data.next);
+    } catch (err) {
+      console.error("Błąd pobierania kolejnych ćwiczeń:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const toggleFavorite = async (id) => {
     if (!api) return;
     try {
@@ -74,6 +91,9 @@ export function useExerciseFilters(api, initialSort = '-created_at') {
   return {
     exercises,
     loading: loading,
+    hasMore: Boolean(nextPageUrl),
+    loadingMore,
+    loadMore,
     filterOptions,
     sortBy,
     toggleFavorite,